@@ -1,4 +1,7 @@
-import requests
+import threading
+from gemini_transport import get_transport
+from response_cache import get_response_cache
+from intent_router import IntentRouter, INTENTS
 
 # ------------------ GEMINI CONFIG ------------------
 GEMINI_API_KEY = "YOUR_ACTUAL_GEMINI_API_KEY_HERE"
@@ -19,12 +22,17 @@ extract_intent_tool = {
     "parameters": {
         "type": "object",
         "properties": {
+            "intent": {
+                "type": "string",
+                "enum": INTENTS,
+                "description": "The detected intent category"
+            },
             "user_message": {
                 "type": "string",
                 "description": "The full message from the user"
             }
         },
-        "required": ["user_message"]
+        "required": ["intent", "user_message"]
     }
 }
 intent_tools = [extract_intent_tool]
@@ -35,8 +43,6 @@ def detect_intent(user_input: str) -> str:
     Sends the user message to Gemini with the extract_intent tool schema.
     Returns one of: 'trend_analysis', 'forecasting', 'product_bundling', 'performance_metrics'
     """
-    headers = {"Content-Type": "application/json"}
-
     body = {
         "contents": [{"role": "user", "parts": [{"text": user_input}]}],
         "tools": intent_tools,
@@ -48,16 +54,14 @@ def detect_intent(user_input: str) -> str:
     }
 
     try:
-        response = requests.post(GEMINI_URL, headers=headers, json=body)
-        response.raise_for_status()
-        result = response.json()
+        result = get_transport().post_json(GEMINI_URL, body, cache=get_response_cache())
 
         candidate = result.get("candidates", [])[0]
         parts = candidate.get("content", {}).get("parts", [])
 
         if parts and "functionCall" in parts[0]:
             tool_call = parts[0]["functionCall"]
-            intent = tool_call["args"]["user_message"]
+            intent = tool_call["args"].get("intent", "unknown")
             return intent.strip()
 
         elif parts and "text" in parts[0]:
@@ -69,3 +73,26 @@ def detect_intent(user_input: str) -> str:
         print(f"❌ Error detecting intent: {e}")
 
     return "unknown"
+
+
+# ------------------ INTENT ROUTER ------------------
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_intent_router() -> IntentRouter:
+    """Shared local router; Gemini's detect_intent is only its low-confidence fallback."""
+    global _router
+    if _router is None:
+        with _router_lock:  # trained once, even when a background warm-up races the first message
+            if _router is None:
+                _router = IntentRouter(fallback=detect_intent)
+    return _router
+
+
+def route_intent(user_input: str) -> str:
+    """
+    Same contract as detect_intent, but obvious messages are classified locally
+    (keyword rules / small classifier) without a Gemini round-trip.
+    """
+    return get_intent_router().route(user_input)["intent"]
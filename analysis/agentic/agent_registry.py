@@ -0,0 +1,97 @@
+import time
+import threading
+
+
+# ------------------ AGENT REGISTRY ------------------
+class AgentRegistry:
+    """
+    One long-lived agent per intent, reused across conversations.
+
+    An intent's agent is built by its factory the first time it is needed (or
+    by the warm-up) and handed out again for every later conversation, after
+    agent.reset() has cleared the previous one. Warm-up steps (training the
+    intent router, importing the tool modules, loading datasets and building
+    their indexes) run once, in order, on a background daemon thread, so the
+    prompt is ready right away and the first question finds the work done. A
+    question that arrives mid-warm-up shares it instead of repeating it: agents
+    are built once under a per-intent lock and the dataset caches load each
+    file once.
+    """
+
+    def __init__(self):
+        self._factories = {}  # intent -> factory
+        self._agents = {}  # intent -> agent
+        self._locks = {}  # intent -> lock held while its agent is built
+        self._steps = []  # (name, fn) warm-up steps, run in order
+        self._thread = None
+        self._warm = threading.Event()
+        self.warmup_seconds = {}  # step name -> seconds
+        self.warmup_errors = {}  # step name -> error message
+        self.builds = 0
+        self.conversations = 0
+
+    def register(self, intent: str, factory, warmup=None):
+        """
+        :param factory: Builds the intent's agent (called once)
+        :param warmup: Optional callable run after the agent is built by the
+                       warm-up, e.g. loading the datasets its tools query
+        """
+        self._factories[intent] = factory
+        self._locks[intent] = threading.Lock()
+        self.add_warmup(intent, lambda: self.get(intent))
+        if warmup is not None:
+            self.add_warmup(f"{intent} data", warmup)
+
+    def add_warmup(self, name: str, fn):
+        """Adds a step to the background warm-up (steps run in the order added)."""
+        self._steps.append((name, fn))
+
+    def get(self, intent: str):
+        """The intent's agent, built on first use."""
+        agent = self._agents.get(intent)
+        if agent is None:
+            with self._locks[intent]:
+                agent = self._agents.get(intent)
+                if agent is None:
+                    agent = self._agents[intent] = self._factories[intent]()
+                    self.builds += 1
+        return agent
+
+    def start_conversation(self, intent: str):
+        """The intent's agent with the previous conversation's state cleared."""
+        agent = self.get(intent)
+        agent.reset()
+        self.conversations += 1
+        return agent
+
+    # ------------------ WARM-UP ------------------
+    def start_warmup(self) -> threading.Thread:
+        """Runs the warm-up steps on a daemon thread (once); returns the thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run_warmup, name="agent-warmup", daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def _run_warmup(self):
+        for name, fn in self._steps:
+            start = time.perf_counter()
+            try:
+                fn()
+            except Exception as e:  # a broken dataset must not stop the others; the tool reports it on use
+                self.warmup_errors[name] = f"{type(e).__name__}: {e}"
+            self.warmup_seconds[name] = round(time.perf_counter() - start, 3)
+        self._warm.set()
+
+    def wait_until_warm(self, timeout: float = None) -> bool:
+        """Blocks until the warm-up has finished; returns False on timeout."""
+        return self._warm.wait(timeout)
+
+    def stats(self) -> dict:
+        return {
+            "intents": sorted(self._factories),
+            "agents_built": self.builds,
+            "conversations": self.conversations,
+            "warm": self._warm.is_set(),
+            "warmup_seconds": dict(self.warmup_seconds),
+            "warmup_errors": dict(self.warmup_errors),
+        }
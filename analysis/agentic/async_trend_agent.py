@@ -0,0 +1,92 @@
+import asyncio
+from trend_agent2 import TrendAnalysisAgent
+from trend_fast_path import aanswer_trend_question
+from trend_analysis_tool import asummarize_trend
+
+# Tools that select state (db / product) that other calls in the same turn may rely on
+STATEFUL_TOOLS = ["validate_database", "validate_product_name"]
+
+
+def _collect_into(outbox: list):
+    """reply callable for _handle_tool that keeps a call's messages (message, tool) in outbox."""
+    return lambda message, tool=None: outbox.append((message, tool))
+
+
+# ------------------ ASYNC AGENT ------------------
+class AsyncTrendAnalysisAgent(TrendAnalysisAgent):
+    """
+    asyncio variant of the trend agent: Gemini calls go through the async
+    transport, so a slow completion only suspends this conversation instead of
+    blocking a worker thread. Tool handlers (pandas lookups) run in the default
+    thread pool, and independent tool calls from one model turn run concurrently.
+    """
+
+    async def respond(self, user_input: str, max_loops: int = 5) -> str:
+        """Handles one user message and returns the agent's final reply text."""
+        answer = await self.afast_answer(user_input)
+        if answer is not None:
+            return answer
+
+        self.chat.add_user_message(user_input)
+        result = await self.chat.acall()
+
+        for _ in range(max_loops):
+            if result["type"] == "reply":
+                return result["text"]
+            if result["type"] != "tool_call":
+                return result.get("text", "⚠️ Unexpected result type.")
+
+            await self._dispatch_tools(result.get("calls") or [{"tool": result["tool"], "args": result["args"]}])
+            result = await self.chat.acall()
+
+        return result.get("text", "⚠️ No reply after the maximum number of tool calls.")
+
+    async def afast_answer(self, user_input: str):
+        """Non-blocking fast_answer: the summary goes through the async transport."""
+        if not await asyncio.to_thread(self._fast_path_applies, user_input):
+            return None
+        answer = await aanswer_trend_question(user_input, self.db_name, self.product_name)
+        return self._keep_fast_answer(user_input, answer)
+
+    async def _dispatch_tools(self, calls):
+        """
+        Runs state-selecting tools in order first, then the rest concurrently.
+        Each call's messages are buffered and added to the history in call order,
+        so the turn reads the same however the concurrent calls interleave.
+        """
+        for call in calls:
+            if call["tool"] in STATEFUL_TOOLS:
+                await self._ahandle_tool(call["tool"], call["args"])
+
+        independent = [call for call in calls if call["tool"] not in STATEFUL_TOOLS]
+        outboxes = [[] for _ in independent]
+        await asyncio.gather(*(
+            self._ahandle_tool(call["tool"], call["args"], reply=_collect_into(outbox))
+            for call, outbox in zip(independent, outboxes)
+        ))
+        for outbox in outboxes:
+            for message, tool in outbox:
+                self.chat.add_user_message(message, tool=tool)
+
+    async def _ahandle_tool(self, tool, args, reply=None):
+        reply = reply or self.chat.add_user_message
+        if tool != "summarize_trend":
+            await asyncio.to_thread(self._handle_tool, tool, args, reply)
+            return
+
+        product_name = args.get("product_name", self.product_name)
+        summary = await asummarize_trend(product_name, args.get("monthly_sales", "{}"))
+        reply(f"Trend summary for {product_name}: {summary}", tool="summarize_trend")
+
+    async def arun(self):
+        """Interactive loop; the blocking input() runs off the event loop."""
+        print("📈 Trend Analysis Agent: Hi! I can help you analyze sales trends.")
+        while True:
+            user_input = await asyncio.to_thread(input, "\nYou: ")
+            if user_input.lower() in ["exit", "quit"]:
+                break
+            print(f"🧠 {await self.respond(user_input)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(AsyncTrendAnalysisAgent().arun())
@@ -0,0 +1,51 @@
+import argparse
+import json
+from gemini_chat_agent import GeminiChatAgent
+
+# ------------------ BENCHMARK ------------------
+# History payload per Gemini call: full transcript vs. budgeted history.
+#   python bench_chat_history.py --rounds 20 --months 36
+#
+# Simulates trend-analysis rounds (product list, monthly sales JSON, trend
+# summary, model reply) without calling Gemini, and reports the bytes of
+# "contents" each call would have sent.
+
+def simulate(agent: GeminiChatAgent, rounds: int, months: int):
+    products = [f"Product {i:05d}" for i in range(20)]
+    for r in range(rounds):
+        product = products[r % len(products)]
+        agent.add_user_message(f"Show me the sales trend for {product}")
+        agent.add_user_message(f"Products available: {', '.join(products)}", tool="load_product_list")
+        agent._request_body()
+        agent.pin(db_name="sales_db", product_name=product)
+        sales = {f"Month {m:02d} 2024": 100 + 7 * m + r for m in range(months)}
+        agent.add_user_message(
+            f"Monthly sales data for '{product}': {json.dumps(sales)}. Please summarize the trend.",
+            tool="get_monthly_sales",
+        )
+        agent._request_body()
+        agent.add_user_message(f"Trend summary for {product}: Increasing", tool="summarize_trend")
+        agent._request_body()
+        agent.add_agent_message(f"{product} shows an increasing trend over the last {months} months.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chat history payload bytes per call")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--months", type=int, default=36)
+    args = parser.parse_args()
+
+    agent = GeminiChatAgent()
+    simulate(agent, args.rounds, args.months)
+    stats = agent.memory.payload_stats()
+
+    print(f"Calls simulated: {stats['calls']}")
+    print(f"{'full history, last call':<35} {stats['raw_bytes_last']:>10,} bytes")
+    print(f"{'budgeted history, last call':<35} {stats['sent_bytes_last']:>10,} bytes")
+    print(f"{'full history, mean per call':<35} {stats['raw_bytes_mean']:>10,} bytes")
+    print(f"{'budgeted history, mean per call':<35} {stats['sent_bytes_mean']:>10,} bytes")
+    print(f"{'reduction':<35} {stats['reduction']:>10.1%}")
+
+
+if __name__ == "__main__":
+    main()
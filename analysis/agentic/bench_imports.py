@@ -0,0 +1,149 @@
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# ------------------ BENCHMARK ------------------
+# Import cost of the entry points (python -X importtime), with a regression gate.
+#   python bench_imports.py --runs 5
+#   python bench_imports.py --budget-scale 2     # slower machine: double every budget
+#
+# Each entry point is imported in a fresh interpreter --runs times; the median
+# cumulative import time of the entry module is checked against its budget, and
+# none of the HEAVY modules may be loaded while importing it (they belong on
+# first use or in the background warm-up). The heaviest imports are listed to
+# show where a regression came from. Exits with status 1 when a check fails.
+# lang/app.py is also launched for real to time process start -> "/" answering.
+
+# entry point -> (directory, module, import budget in ms)
+ENTRY_POINTS = {
+    "main.py": (HERE, "main", 400),
+    "lang/app.py": (os.path.join(HERE, "lang"), "app", 400),
+    "lang/trend_agent.py": (os.path.join(HERE, "lang"), "trend_agent", 50),
+}
+HEAVY = ["pandas", "numpy", "pyarrow", "sklearn", "scipy", "prophet", "matplotlib", "plotly",
+         "langchain", "langchain_google_genai", "streamlit"]
+
+
+def import_times(directory: str, module: str) -> list:
+    """[(depth, cumulative_us, name)] from one `python -X importtime -c "import module"`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=directory, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((depth, int(cumulative), name.strip()))
+    return rows
+
+
+def measure(directory: str, module: str, runs: int) -> dict:
+    totals, heaviest, loaded = [], {}, set()
+    for _ in range(runs):
+        children = []
+        for depth, us, name in import_times(directory, module):
+            # importtime lists a module after its own imports
+            if depth == 0:
+                if name == module:
+                    totals.append(us)
+                    for child, child_us in children:
+                        heaviest[child] = min(heaviest.get(child, child_us), child_us)
+                children = []
+            elif depth == 1:
+                children.append((name, us))
+            loaded.add(name.split(".")[0])
+    top = sorted(heaviest.items(), key=lambda item: -item[1])[:5]
+    return {"ms": statistics.median(totals) / 1000, "heavy": sorted(loaded & set(HEAVY)), "top": top}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_health_check(timeout: float = 60) -> dict:
+    """
+    Seconds from launching `python lang/app.py` until "/" answers, then until
+    the warm-up behind /ready has finished (successfully or not; see "warmup").
+    """
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "app.py", "--port", str(port)], cwd=os.path.join(HERE, "lang"),
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    timings = {}
+    try:
+        for path, key in [("/", "health"), ("/ready", "ready")]:
+            while key not in timings:
+                if time.perf_counter() - start > timeout or process.poll() is not None:
+                    raise RuntimeError(f"app.py did not answer {path}")
+                try:
+                    response = httpx.get(url + path, timeout=1)
+                    # /ready stays 503 after a failed warm-up; its body says it has finished
+                    if response.status_code == 200 or (key == "ready" and response.json()["ready"]):
+                        timings[key] = time.perf_counter() - start
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.01)
+        response = httpx.get(url + "/ready")
+        timings["warmup"] = {**response.json(), "status": response.status_code}
+    finally:
+        process.terminate()
+        process.wait()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time budget check for the agent entry points")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-scale", type=float, default=1.0, help="Multiplies every import budget")
+    parser.add_argument("--skip-serve", action="store_true", help="Don't launch lang/app.py")
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'entry point':<22} {'import':>8} {'budget':>8}  heaviest imports")
+    for label, (directory, module, budget_ms) in ENTRY_POINTS.items():
+        try:
+            result = measure(directory, module, args.runs)
+        except RuntimeError as e:
+            print(f"{label:<22} {'-':>8}")
+            failures.append(f"{label}: {str(e).splitlines()[0]} ({str(e).splitlines()[-1]})")
+            continue
+        budget_ms *= args.budget_scale
+        top = ", ".join(f"{name} {us / 1000:.0f}ms" for name, us in result["top"])
+        print(f"{label:<22} {result['ms']:>6.0f}ms {budget_ms:>6.0f}ms  {top}")
+        if result["ms"] > budget_ms:
+            failures.append(f"{label}: {result['ms']:.0f}ms import time exceeds its {budget_ms:.0f}ms budget")
+        if result["heavy"]:
+            failures.append(f"{label}: imports {', '.join(result['heavy'])} at startup")
+
+    if not args.skip_serve:
+        timings = time_health_check()
+        print(f"\nlang/app.py launch -> '/' answers: {timings['health'] * 1000:.0f}ms, "
+              f"-> /ready: {timings['ready'] * 1000:.0f}ms (warm-up {timings['warmup']})")
+        if timings["warmup"]["error"]:
+            failures.append(f"lang/app.py: warm-up failed, /ready answers {timings['warmup']['status']}")
+
+    if failures:
+        print("\nFAIL\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("\nOK: every entry point is within its import budget")
+
+
+if __name__ == "__main__":
+    main()
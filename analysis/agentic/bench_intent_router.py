@@ -0,0 +1,154 @@
+import argparse
+import time
+from intent_router import IntentRouter, INTENTS
+
+# ------------------ BENCHMARK ------------------
+# Offline accuracy of the local intent router on labelled messages.
+#   python bench_intent_router.py [--log intent_log.jsonl]
+#
+# No Gemini calls: messages the router would send to the LLM are counted as
+# "deferred" and left out of the local accuracy. Pass --log to also train the
+# classifier on logged (LLM-labelled) messages.
+#
+# Two sets are reported. TUNING_MESSAGES are the messages INTENT_RULES' weights
+# were tuned against, so their score is only a sanity check. HOLDOUT_MESSAGES
+# were written after the rules were frozen and are in neither the rules'
+# tuning nor INTENT_EXAMPLES; they are the accuracy estimate. Never adjust
+# INTENT_RULES or INTENT_EXAMPLES to fix a held-out miss: move the message to
+# TUNING_MESSAGES and write a fresh one instead.
+
+TUNING_MESSAGES = [
+    ("trend of cap in eon", "trend_analysis"),
+    ("can you show the sales trend for the leather wallet", "trend_analysis"),
+    ("has the demand for umbrellas been increasing", "trend_analysis"),
+    ("is the green tea selling more or less than before", "trend_analysis"),
+    ("how are sneakers doing over time", "trend_analysis"),
+    ("monthly sales history for the desk lamp please", "trend_analysis"),
+    ("are phone case sales declining", "trend_analysis"),
+    ("trending direction of product 1023", "trend_analysis"),
+    ("what does the sales curve for candles look like", "trend_analysis"),
+    ("did hoodie sales grow in the last 6 months", "trend_analysis"),
+    ("forecast the next 3 months for the cap", "forecasting"),
+    ("predict sales of water bottles for next week", "forecasting"),
+    ("how much will we sell in the coming quarter", "forecasting"),
+    ("give me a projection for jeans demand", "forecasting"),
+    ("expected orders for next month in eon", "forecasting"),
+    ("estimate upcoming demand for scarves", "forecasting"),
+    ("what are sales going to be like next year", "forecasting"),
+    ("run a prediction for all products", "forecasting"),
+    ("how many backpacks should we stock for the next 30 days", "forecasting"),
+    ("future sales of the yoga mat", "forecasting"),
+    ("which items are bought together with pasta", "product_bundling"),
+    ("recommend a product bundle for back to school", "product_bundling"),
+    ("what pairs well with a tennis racket", "product_bundling"),
+    ("market basket analysis for the grocery db", "product_bundling"),
+    ("upsell options for customers buying phones", "product_bundling"),
+    ("build a combo with chips and soda", "product_bundling"),
+    ("frequently purchased with the printer", "product_bundling"),
+    ("products that go together with coffee beans", "product_bundling"),
+    ("affinity between shampoo and conditioner", "product_bundling"),
+    ("cross-sell suggestions for the camera", "product_bundling"),
+    ("top 5 best selling products in eon", "performance_metrics"),
+    ("what is our total revenue this month", "performance_metrics"),
+    ("show the kpi dashboard", "performance_metrics"),
+    ("which store has the best performance", "performance_metrics"),
+    ("profit margin by category", "performance_metrics"),
+    ("worst performing products last quarter", "performance_metrics"),
+    ("average sales per day in retail", "performance_metrics"),
+    ("rank products by orders", "performance_metrics"),
+    ("conversion metrics for the website", "performance_metrics"),
+    ("compare revenue of the two databases", "performance_metrics"),
+]
+
+HOLDOUT_MESSAGES = [
+    ("is the travel mug trending up", "trend_analysis"),
+    ("plot how pillow sales changed across the year", "trend_analysis"),
+    ("did sunscreen sell better this summer than last", "trend_analysis"),
+    ("show the sales pattern of the wool socks since january", "trend_analysis"),
+    ("are people buying fewer dvds lately", "trend_analysis"),
+    ("month by month orders for the bike helmet", "trend_analysis"),
+    ("has the charger been losing momentum", "trend_analysis"),
+    ("what's the long-term direction for tote bag orders in retail", "trend_analysis"),
+    ("trajectory of espresso pod sales", "trend_analysis"),
+    ("how did notebooks do over the past year", "trend_analysis"),
+    ("how many raincoats will we need in november", "forecasting"),
+    ("predict tomorrow's orders for bread", "forecasting"),
+    ("what will sandal demand be during the holidays", "forecasting"),
+    ("project earbuds sales through the end of the year", "forecasting"),
+    ("expected volume for kettles over the next two weeks", "forecasting"),
+    ("what should we order for the winter season", "forecasting"),
+    ("anticipate stock requirements for pens in telecom", "forecasting"),
+    ("forecasting report for all items in eon", "forecasting"),
+    ("guess how many mugs we'll move in the next 10 days", "forecasting"),
+    ("outlook for lamp sales in the upcoming months", "forecasting"),
+    ("what accessories do buyers of the laptop also pick up", "product_bundling"),
+    ("suggest items to package with the grill", "product_bundling"),
+    ("which snacks are usually purchased together", "product_bundling"),
+    ("create a gift set around the candle", "product_bundling"),
+    ("basket analysis for telecom", "product_bundling"),
+    ("items commonly bought along with diapers", "product_bundling"),
+    ("bundle ideas for the new phone launch", "product_bundling"),
+    ("what complements the running shoes", "product_bundling"),
+    ("pairing suggestions for wine", "product_bundling"),
+    ("upsell recommendations at checkout", "product_bundling"),
+    ("who are our bottom 10 sellers", "performance_metrics"),
+    ("how much revenue did retail make in march", "performance_metrics"),
+    ("gross margin per product", "performance_metrics"),
+    ("show sales performance by region", "performance_metrics"),
+    ("total orders across all databases", "performance_metrics"),
+    ("which category earns the most profit", "performance_metrics"),
+    ("leaderboard of stores by sales", "performance_metrics"),
+    ("give me the monthly kpi report", "performance_metrics"),
+    ("what's the average order value", "performance_metrics"),
+    ("best performing sku in telecom", "performance_metrics"),
+]
+
+
+def evaluate(router: IntentRouter, messages) -> dict:
+    correct = local = 0
+    per_intent = {intent: [0, 0] for intent in INTENTS}  # [correct, routed locally]
+    start = time.perf_counter()
+    for text, expected in messages:
+        result = router.route(text)
+        if result["source"] in ("rules", "model"):
+            local += 1
+            per_intent[expected][1] += 1
+            if result["intent"] == expected:
+                correct += 1
+                per_intent[expected][0] += 1
+    elapsed = time.perf_counter() - start
+    return {
+        "local_share": local / len(messages),
+        "local_accuracy": correct / local if local else 0.0,
+        "per_intent": per_intent,
+        "avg_ms": 1000 * elapsed / len(messages),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline accuracy of the local intent router")
+    parser.add_argument("--log", default=None, help="Routing log with LLM-labelled messages to train on")
+    args = parser.parse_args()
+
+    configs = [
+        ("rules only", IntentRouter(log_path=args.log, use_model=False)),
+        ("rules + classifier", IntentRouter(log_path=args.log)),
+    ]
+    sets = [
+        ("held-out", HOLDOUT_MESSAGES),
+        ("tuning set (rules were tuned on it: sanity check only)", TUNING_MESSAGES),
+    ]
+    for set_label, messages in sets:
+        print(f"\n=== {set_label}: {len(messages)} messages ===")
+        for label, router in configs:
+            report = evaluate(router, messages)
+            print(f"\n{label}")
+            print(f"  {'routed locally':<28} {report['local_share']:>8.1%}")
+            print(f"  {'accuracy (local routes)':<28} {report['local_accuracy']:>8.1%}")
+            print(f"  {'avg routing latency':<28} {report['avg_ms']:>7.3f}ms")
+            for intent, (correct, routed) in report["per_intent"].items():
+                print(f"    {intent:<26} {correct:>3}/{routed:<3} correct")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# ------------------ BENCHMARK ------------------
+# Cold start of main.py: process launch -> prompt ready -> first answered question.
+#   python bench_startup.py --products 500 --think-ms 0 1500 --runs 3
+#
+# Each run launches a fresh `main.py` process (with and without the background
+# warm-up) in a scratch directory whose data/eon.xlsx is a synthetic workbook,
+# waits for the "You:" prompt, pauses --think-ms (the user typing), then asks
+# two trend questions over stdin. Gemini is a local stub answering after
+# --llm-ms, and the response cache is in-memory so every question reaches it.
+# A first untimed run converts the workbook to its columnar copy, as any
+# earlier session on the machine would have.
+
+QUESTION = "Show me the trend for product_{:05d} in eon"
+
+
+def start_stub(llm_seconds: float):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            time.sleep(llm_seconds)
+            reply = {"candidates": [{"content": {"parts": [{"text": "Sales rise steadily month over month."}]}}]}
+            payload = json.dumps(reply).encode()
+            streaming = ":streamGenerateContent" in self.path  # the trend summary streams
+            if streaming:
+                payload = b"data: " + payload + b"\r\n\r\n"
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream" if streaming else "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def child(url: str, warmup: bool):
+    """Runs main.main() with Gemini pointed at the stub (inside the launched process)."""
+    sys.path.insert(0, HERE)
+    import gemini_client
+    import gemini_chat_agent
+    import agent_manager
+    import response_cache
+    from response_cache import ResponseCache
+    import main as assistant
+
+    gemini_client.GEMINI_URL = gemini_chat_agent.GEMINI_URL = agent_manager.GEMINI_URL = url
+    response_cache._cache = ResponseCache(path=":memory:", ttl=0)
+    assistant.main(warmup=warmup)
+
+
+class Session:
+    """A launched assistant process whose output is timestamped as it arrives."""
+
+    def __init__(self, url: str, workdir: str, warmup: bool):
+        command = [sys.executable, "-u", os.path.abspath(__file__), "--child", url]
+        if not warmup:
+            command.append("--no-warmup")
+        self.start = time.perf_counter()
+        self.process = subprocess.Popen(
+            command, cwd=workdir, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            env={**os.environ, "PYTHONIOENCODING": "utf-8"},
+        )
+        self.output = ""
+        self.changed = threading.Condition()
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self):
+        while True:
+            data = os.read(self.process.stdout.fileno(), 65536)
+            with self.changed:
+                self.output += data.decode("utf-8", errors="replace") if data else "\0"
+                self.changed.notify_all()
+            if not data:
+                return
+
+    def wait_for(self, text: str, occurrence: int, timeout: float = 300) -> float:
+        """Seconds since launch until `text` has appeared `occurrence` times in the output."""
+        with self.changed:
+            if not self.changed.wait_for(lambda: self.output.count(text) >= occurrence or "\0" in self.output, timeout):
+                raise TimeoutError(text)
+            if self.output.count(text) < occurrence:
+                raise RuntimeError(f"assistant exited early:\n{self.output}")
+        return time.perf_counter() - self.start
+
+    def send(self, line: str) -> float:
+        self.process.stdin.write((line + "\n").encode())
+        self.process.stdin.flush()
+        return time.perf_counter() - self.start
+
+    def close(self):
+        self.send("exit")
+        self.process.wait(timeout=60)
+
+
+def run_once(url: str, workdir: str, warmup: bool, think_seconds: float) -> dict:
+    session = Session(url, workdir, warmup)
+    prompt = session.wait_for("You:", 1)
+    time.sleep(think_seconds)
+    asked = session.send(QUESTION.format(1))
+    first = session.wait_for("📈", 1)
+    asked_again = session.send(QUESTION.format(2))
+    second = session.wait_for("📈", 2)
+    session.close()
+    return {"prompt": prompt, "first_answer": first, "first_latency": first - asked,
+            "second_latency": second - asked_again}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start of main.py with and without the background warm-up")
+    parser.add_argument("--products", type=int, default=500)
+    parser.add_argument("--llm-ms", type=float, default=300, help="Simulated Gemini latency per call")
+    parser.add_argument("--think-ms", type=float, nargs="+", default=[0, 1500],
+                        help="Pause between the prompt and the first question")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--child", metavar="GEMINI_URL", help=argparse.SUPPRESS)
+    parser.add_argument("--no-warmup", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, warmup=not args.no_warmup)
+        return
+
+    sys.path.insert(0, os.path.dirname(HERE))
+    from bench_data import make_sales_frame
+
+    workdir = tempfile.mkdtemp(prefix="bench_startup_")
+    os.makedirs(os.path.join(workdir, "data"))
+    make_sales_frame(n_products=args.products, n_days=365).to_excel(os.path.join(workdir, "data", "eon.xlsx"), index=False)
+
+    server = start_stub(args.llm_ms / 1000)
+    url = f"http://127.0.0.1:{server.server_port}/v1beta/models/stub:generateContent?key=bench"
+    run_once(url, workdir, warmup=False, think_seconds=0)  # builds the columnar copy once
+
+    print(f"{args.products} products, {args.llm_ms:.0f}ms simulated Gemini latency, median of {args.runs} launches\n")
+    print(f"{'mode':<10} {'think':>7} {'prompt':>9} {'1st answer':>11} {'1st latency':>12} {'2nd latency':>12}")
+    for think_ms in args.think_ms:
+        for warmup in [False, True]:
+            runs = [run_once(url, workdir, warmup, think_ms / 1000) for _ in range(args.runs)]
+            p50 = {key: statistics.median(run[key] for run in runs) * 1000 for key in runs[0]}
+            print(f"{'warm-up' if warmup else 'lazy':<10} {think_ms:>5.0f}ms {p50['prompt']:>7.0f}ms "
+                  f"{p50['first_answer']:>9.0f}ms {p50['first_latency']:>10.0f}ms {p50['second_latency']:>10.0f}ms")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import gemini_client
+import gemini_chat_agent
+import response_cache
+from gemini_chat_agent import GeminiChatAgent
+from gemini_transport import iter_sse
+from response_cache import ResponseCache
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "lang"))
+from werkzeug.serving import WSGIRequestHandler, make_server  # noqa: E402
+from app import create_app  # noqa: E402
+
+# ------------------ BENCHMARK ------------------
+# Time to first token vs. time to the full answer, blocking vs. streaming.
+#   python bench_streaming.py --first-ms 600 --chunks 30 --chunk-ms 40 --requests 5
+#
+# A local fake Gemini serves both generateContent (answers once the whole text
+# is generated) and streamGenerateContent?alt=sse (sends each chunk as it is
+# generated): --first-ms until the first chunk, then --chunk-ms per chunk.
+# Measured through call_gemini / stream_gemini, GeminiChatAgent.call / stream,
+# and end to end through lang/app.py's /chat and /chat/stream.
+
+WORDS = "Sales rose steadily for five months before flattening out in the last quarter".split()
+
+
+def start_fake_gemini(first_seconds: float, chunks: int, chunk_seconds: float):
+    pieces = [WORDS[i % len(WORDS)] + " " for i in range(chunks)]
+
+    def chunk(text):
+        return {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            time.sleep(first_seconds)
+            if ":streamGenerateContent" not in self.path:
+                time.sleep(chunk_seconds * (chunks - 1))
+                payload = json.dumps(chunk("".join(pieces))).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for i, piece in enumerate(pieces):
+                if i:
+                    time.sleep(chunk_seconds)
+                event = f"data: {json.dumps(chunk(piece))}\r\n\r\n".encode()
+                self.wfile.write(f"{len(event):X}\r\n".encode() + event + b"\r\n")
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def timed_stream(pieces):
+    """(seconds to the first piece, seconds to the end, text) of an iterable of text pieces."""
+    start = time.perf_counter()
+    first, text = None, []
+    for piece in pieces:
+        if first is None:
+            first = time.perf_counter() - start
+        text.append(piece)
+    return first, time.perf_counter() - start, "".join(text)
+
+
+def timed_call(call):
+    start = time.perf_counter()
+    text = call()
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed, text
+
+
+def agent_deltas(events):
+    for event in events:
+        if event["type"] == "delta":
+            yield event["text"]
+
+
+def sse_deltas(client, url, body):
+    with client.stream("POST", url, json=body) as response:
+        for event in iter_sse(line for line in response.iter_lines() if not line.startswith("event:")):
+            if "text" in event:
+                yield event["text"]
+
+
+# Stub session agent for the Flask app: one GeminiChatAgent conversation
+class ChatSession:
+    def __init__(self):
+        self.chat = GeminiChatAgent()
+
+    def run(self, message):
+        self.chat.add_user_message(message)
+        return self.chat.call().get("text", "")
+
+
+def stream_chat_reply(agent, message):
+    agent.chat.add_user_message(message)
+    yield from agent.chat.stream()
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Blocking vs. streaming Gemini responses")
+    parser.add_argument("--first-ms", type=float, default=600, help="Fake Gemini delay before the first chunk")
+    parser.add_argument("--chunks", type=int, default=30)
+    parser.add_argument("--chunk-ms", type=float, default=40, help="Fake Gemini delay per further chunk")
+    parser.add_argument("--requests", type=int, default=5)
+    args = parser.parse_args()
+
+    gemini = start_fake_gemini(args.first_ms / 1000, args.chunks, args.chunk_ms / 1000)
+    url = f"http://127.0.0.1:{gemini.server_port}/v1beta/models/stub:generateContent?key=bench"
+    gemini_client.GEMINI_URL = gemini_chat_agent.GEMINI_URL = url
+    response_cache._cache = ResponseCache(path=":memory:", ttl=0)  # every request reaches the fake server
+
+    app = make_server("127.0.0.1", 0, create_app(ChatSession, stream_reply=stream_chat_reply),
+                      threaded=True, request_handler=_QuietHandler)
+    threading.Thread(target=app.serve_forever, daemon=True).start()
+    app_url = f"http://127.0.0.1:{app.server_port}"
+    client = httpx.Client(timeout=60)
+    session = {"session_id": "bench"}
+
+    cases = [
+        ("call_gemini", lambda i: timed_call(lambda: gemini_client.call_gemini(f"prompt {i}"))),
+        ("stream_gemini", lambda i: timed_stream(gemini_client.stream_gemini(f"prompt {i}"))),
+        ("GeminiChatAgent.call", lambda i: timed_call(lambda: ChatSession().run(f"message {i}"))),
+        ("GeminiChatAgent.stream", lambda i: timed_stream(agent_deltas(stream_chat_reply(ChatSession(), f"message {i}")))),
+        ("POST /chat", lambda i: timed_call(
+            lambda: client.post(f"{app_url}/chat", json={"message": f"message {i}", **session}).json()["response"])),
+        ("POST /chat/stream (SSE)", lambda i: timed_stream(
+            sse_deltas(client, f"{app_url}/chat/stream", {"message": f"message {i}", **session}))),
+    ]
+
+    total = args.first_ms + args.chunk_ms * (args.chunks - 1)
+    print(f"Fake Gemini: first chunk after {args.first_ms:.0f}ms, {args.chunks} chunks, full answer after {total:.0f}ms\n")
+    print(f"{'path':<26} {'first token p50':>16} {'full answer p50':>16}")
+    for label, run in cases:
+        results = [run(i) for i in range(args.requests)]
+        assert all(text.strip() for _, _, text in results), label
+        first = statistics.median(r[0] for r in results)
+        full = statistics.median(r[1] for r in results)
+        print(f"{label:<26} {first * 1000:>14.0f}ms {full * 1000:>14.0f}ms")
+
+    app.shutdown()
+    gemini.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import statistics
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import gemini_client
+import gemini_chat_agent
+import response_cache
+import trend_analysis_tool
+from response_cache import ResponseCache
+from trend_agent2 import TrendAnalysisAgent
+from trend_fast_path import answer_trend_question
+from bench_data import make_sales_frame  # analysis/ is on sys.path via trend_analysis_tool
+from tracing import configure_tracing, span
+
+# ------------------ BENCHMARK ------------------
+# LLM calls and latency per answered trend question: tool-calling loop vs. fast path.
+#   python bench_trend_fast_path.py --questions 20 --llm-ms 400
+#
+# Gemini is replaced by a local stub that sleeps --llm-ms per call and plays
+# the tool sequence the model uses for a trend question (validate_database ->
+# load_product_list -> validate_product_name -> get_monthly_sales ->
+# summarize_trend -> reply). The dataset is a synthetic workbook.
+# With --trace FILE every question's spans are written there; summarize them
+# with `python ../tracing.py FILE`.
+
+BENCH_DB = "bench"
+QUESTION = re.compile(r"trend for (.+?) in (\w+)", re.IGNORECASE)
+
+
+def _function_call(name, **args):
+    return {"candidates": [{"content": {"parts": [{"functionCall": {"name": name, "args": args}}]}}]}
+
+
+def _text(text):
+    return {"candidates": [{"content": {"parts": [{"text": text}]}}]}
+
+
+def scripted_reply(body: dict) -> dict:
+    """What the model does next in a trend conversation, given the request body."""
+    if not body.get("tools"):
+        return _text("Growing. Sales rise steadily month over month.")
+
+    texts = [part.get("text", "") for content in body["contents"] for part in content["parts"]]
+    question = next(QUESTION.search(t) for t in texts if QUESTION.search(t))
+    product, db_name = question.group(1), question.group(2)
+    last = texts[-1]
+    if last.startswith("Trend summary"):
+        return _text(last)
+    if last.startswith("Monthly sales data"):
+        sales = last[last.index("{"):last.rindex("}") + 1]
+        return _function_call("summarize_trend", product_name=product, monthly_sales=sales)
+    if "is valid and selected" in last and last.startswith("Product"):
+        return _function_call("get_monthly_sales", db_name=db_name, product_name=product)
+    if last.startswith("Products available"):
+        return _function_call("validate_product_name", product_name=product, db_name=db_name)
+    if "is valid and selected" in last:
+        return _function_call("load_product_list", db_name=db_name)
+    return _function_call("validate_database", db_name=db_name)
+
+
+def start_stub(llm_seconds: float):
+    calls = {"n": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            calls["n"] += 1
+            time.sleep(llm_seconds)
+            payload = json.dumps(scripted_reply(body)).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, calls
+
+
+def measure(label, questions, ask, calls) -> str:
+    latencies, call_counts = [], []
+    for question in questions:
+        before = calls["n"]
+        start = time.perf_counter()
+        with span("turn", path=label):
+            ask(question)
+        latencies.append(time.perf_counter() - start)
+        call_counts.append(calls["n"] - before)
+    return (f"{label:<22} LLM calls/question: {statistics.mean(call_counts):>4.1f}   "
+            f"p50: {statistics.median(latencies) * 1000:>7.0f}ms   max: {max(latencies) * 1000:>7.0f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trend question: tool-calling loop vs. fast path")
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--products", type=int, default=200)
+    parser.add_argument("--llm-ms", type=float, default=400, help="Simulated Gemini latency per call")
+    parser.add_argument("--trace", metavar="FILE", help="Write the spans of every question to FILE (JSON lines)")
+    args = parser.parse_args()
+    configure_tracing(jsonl_path=args.trace)
+
+    workdir = tempfile.mkdtemp(prefix="bench_trend_")
+    workbook = os.path.join(workdir, "bench.xlsx")
+    make_sales_frame(n_products=args.products, n_days=365).to_excel(workbook, index=False)
+    trend_analysis_tool.DATABASES[BENCH_DB] = workbook
+
+    server, calls = start_stub(args.llm_ms / 1000)
+    url = f"http://127.0.0.1:{server.server_port}/v1beta/models/stub:generateContent?key=bench"
+    gemini_client.GEMINI_URL = gemini_chat_agent.GEMINI_URL = url
+    response_cache._cache = ResponseCache(path=":memory:", ttl=0)  # every question pays for its calls
+
+    products = [f"product_{i:05d}" for i in range(args.questions)]
+    questions = [f"Show me the trend for {product} in {BENCH_DB}" for product in products]
+    answer_trend_question(questions[0])  # build the columnar copy, rollup and matcher once
+
+    def tool_loop(question):
+        # TrendAnalysisAgent.run() without the fast path
+        agent = TrendAnalysisAgent()
+        agent.chat.add_user_message(question)
+        result = agent.chat.call()
+        for _ in range(8):
+            if result["type"] != "tool_call":
+                break
+            agent._handle_tool(result["tool"], result["args"])
+            result = agent.chat.call()
+
+    print(f"{args.questions} trend questions, {args.llm_ms:.0f}ms simulated Gemini latency\n")
+    with contextlib.redirect_stdout(io.StringIO()):  # the agent's debug prints
+        loop_report = measure("tool-calling loop", questions, tool_loop, calls)
+    print(loop_report)
+    print(measure("fast path", questions, answer_trend_question, calls))
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
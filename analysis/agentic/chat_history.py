@@ -0,0 +1,145 @@
+import json
+
+# ------------------ HISTORY CONFIG ------------------
+HISTORY_TOKEN_BUDGET = 4000  # estimated tokens of history sent per call
+CHARS_PER_TOKEN = 4  # rough estimate for English text / JSON
+KEEP_RECENT_TURNS = 6  # newest turns are never summarized away
+LARGE_MESSAGE_CHARS = 600  # tool outputs above this are compacted once consumed
+PREVIEW_CHARS = 120
+SUMMARY_LINE_CHARS = 100
+SUMMARY_MAX_LINES = 12
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _message(role: str, text: str) -> dict:
+    return {"role": role, "parts": [{"text": text}]}
+
+
+def _preview(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit] + "…"
+
+
+# ------------------ HISTORY MANAGER ------------------
+class ChatHistory:
+    """
+    Conversation memory for GeminiChatAgent with a token budget.
+
+    The full transcript is kept locally; what is sent to Gemini is built per
+    call by contents():
+      - pinned session state (e.g. db_name / product_name) always goes first;
+      - large tool outputs are replaced by a short reference once the model
+        has replied after seeing them;
+      - if the result is still over budget, the oldest turns are folded into
+        a one-line-per-turn summary, keeping at least the newest turns.
+    """
+
+    def __init__(self, token_budget=HISTORY_TOKEN_BUDGET, keep_recent=KEEP_RECENT_TURNS):
+        self.token_budget = token_budget
+        self.keep_recent = keep_recent
+        self.turns = []  # {"role", "text", "tool", "consumed"}
+        self.pinned = {}
+        self._raw_bytes = 0  # JSON bytes of every message in the transcript (see record_payload)
+        self._reset_payloads()
+
+    def _reset_payloads(self):
+        # Running totals of raw vs sent history size over the recorded calls
+        self.payloads = {"calls": 0, "raw_bytes": 0, "sent_bytes": 0, "raw_bytes_last": 0, "sent_bytes_last": 0}
+
+    # ---- recording ----
+    def add(self, role: str, text: str, tool: str = None):
+        """
+        :param tool: Name of the tool that produced this message, if any
+        """
+        if role == "model":
+            # The model has now seen every earlier tool output
+            for turn in self.turns:
+                turn["consumed"] = True
+        self.turns.append({"role": role, "text": text, "tool": tool, "consumed": False})
+        self._raw_bytes += len(json.dumps(_message(role, text)).encode())
+
+    def pin(self, **state):
+        """Session state resent on every call regardless of truncation (None unpins)."""
+        for name, value in state.items():
+            if value is None:
+                self.pinned.pop(name, None)
+            else:
+                self.pinned[name] = value
+
+    def clear(self):
+        self.turns.clear()
+        self.pinned.clear()
+        self._raw_bytes = 0
+        self._reset_payloads()
+
+    @property
+    def messages(self) -> list:
+        """Full, uncompacted transcript in Gemini "contents" format."""
+        return [_message(turn["role"], turn["text"]) for turn in self.turns]
+
+    # ---- building the payload ----
+    def _compact(self, turn: dict) -> str:
+        text = turn["text"]
+        if not turn["consumed"] or len(text) <= LARGE_MESSAGE_CHARS:
+            return text
+        label = f"'{turn['tool']}' output" if turn["tool"] else "Earlier message"
+        return f"[{label} ({len(text)} chars) already used; preview: {_preview(text, PREVIEW_CHARS)}]"
+
+    def contents(self) -> list:
+        """History to send: pinned state + summary of old turns + recent turns, within budget."""
+        texts = [(turn["role"], self._compact(turn)) for turn in self.turns]
+
+        header = []
+        if self.pinned:
+            state = ", ".join(f"{name}={value}" for name, value in self.pinned.items())
+            header.append(f"Current session state: {state}.")
+
+        budget = self.token_budget - sum(estimate_tokens(line) for line in header)
+        used = sum(estimate_tokens(text) for _, text in texts)
+        cut = 0
+        while used > budget and cut < len(texts) - self.keep_recent:
+            used -= estimate_tokens(texts[cut][1])
+            cut += 1
+
+        if cut:
+            lines = [f"{role}: {_preview(text, SUMMARY_LINE_CHARS)}" for role, text in texts[:cut]]
+            if len(lines) > SUMMARY_MAX_LINES:
+                lines = [f"({len(lines) - SUMMARY_MAX_LINES} older turns omitted)"] + lines[-SUMMARY_MAX_LINES:]
+            header.append("Summary of earlier conversation:\n" + "\n".join(lines))
+
+        contents = [_message("user", "\n\n".join(header))] if header else []
+        contents.extend(_message(role, text) for role, text in texts[cut:])
+        return contents
+
+    # ---- metrics ----
+    def record_payload(self, sent_contents: list):
+        """
+        Logs history bytes for one call: full transcript vs what was actually sent.
+        The transcript size is kept up to date by add(), so this never re-encodes it.
+        """
+        n = len(self.turns)
+        raw = self._raw_bytes + 2 * (n - 1) + 2 if n else 2  # == len(json.dumps(self.messages))
+        sent = len(json.dumps(sent_contents).encode())
+        payloads = self.payloads
+        payloads["calls"] += 1
+        payloads["raw_bytes"] += raw
+        payloads["sent_bytes"] += sent
+        payloads["raw_bytes_last"] = raw
+        payloads["sent_bytes_last"] = sent
+
+    def payload_stats(self) -> dict:
+        payloads = self.payloads
+        calls = payloads["calls"]
+        if not calls:
+            return {"calls": 0}
+        return {
+            "calls": calls,
+            "raw_bytes_last": payloads["raw_bytes_last"],
+            "sent_bytes_last": payloads["sent_bytes_last"],
+            "raw_bytes_mean": round(payloads["raw_bytes"] / calls),
+            "sent_bytes_mean": round(payloads["sent_bytes"] / calls),
+            "reduction": round(1 - payloads["sent_bytes"] / payloads["raw_bytes"], 4) if payloads["raw_bytes"] else 0.0,
+        }
@@ -1,4 +1,6 @@
-import requests
+from gemini_transport import get_transport, get_async_transport, stream_url, chunk_parts
+from chat_history import ChatHistory, HISTORY_TOKEN_BUDGET
+from tracing import span  # analysis/ is on sys.path via gemini_transport
 
 # ------------------ GEMINI CONFIG ------------------
 GEMINI_API_KEY = "YOUR_ACTUAL_GEMINI_API_KEY_HERE"
@@ -10,35 +12,37 @@ GEMINI_URL = (
 
 # ------------------ CHAT AGENT ------------------
 class GeminiChatAgent:
-    def __init__(self, tools=None):
+    def __init__(self, tools=None, token_budget=HISTORY_TOKEN_BUDGET):
         """
         :param tools: List of function tool schemas this agent can call
+        :param token_budget: Estimated tokens of conversation history sent per call
         """
-        self.history = []
+        self.memory = ChatHistory(token_budget=token_budget)
         self.tools = tools if tools else []
 
-    def add_user_message(self, message: str):
-        self.history.append({
-            "role": "user",
-            "parts": [{"text": message}]
-        })
+    @property
+    def history(self) -> list:
+        """Full conversation transcript (what is sent may be compacted, see ChatHistory)."""
+        return self.memory.messages
 
-    def add_agent_message(self, message: str):
-        self.history.append({
-            "role": "model",
-            "parts": [{"text": message}]
-        })
-
-    def call(self):
+    def add_user_message(self, message: str, tool: str = None):
         """
-        Calls Gemini with memory + tool support.
-        Returns one of:
-          - {type: "reply", text: "..."}
-          - {type: "tool_call", tool: "...", args: {...}}
+        :param tool: Name of the tool whose output this message carries, if any
         """
-        headers = {"Content-Type": "application/json"}
-        body = {
-            "contents": self.history,
+        self.memory.add("user", message, tool=tool)
+
+    def add_agent_message(self, message: str):
+        self.memory.add("model", message)
+
+    def pin(self, **state):
+        """Keeps session state (e.g. db_name=..., product_name=...) in every request."""
+        self.memory.pin(**state)
+
+    def _request_body(self) -> dict:
+        contents = self.memory.contents()
+        self.memory.record_payload(contents)
+        return {
+            "contents": contents,
             "tools": self.tools,
             "toolConfig": {
                 "functionCallingConfig": {
@@ -47,28 +51,79 @@ class GeminiChatAgent:
             }
         }
 
-        try:
-            response = requests.post(GEMINI_URL, headers=headers, json=body)
-            response.raise_for_status()
-            result = response.json()
-
-            candidate = result.get("candidates", [])[0]
-            parts = candidate.get("content", {}).get("parts", [])
-
-            if parts and "functionCall" in parts[0]:
-                return {
-                    "type": "tool_call",
-                    "tool": parts[0]["functionCall"]["name"],
-                    "args": parts[0]["functionCall"]["args"]
-                }
+    def _parse_result(self, result: dict) -> dict:
+        candidate = result.get("candidates", [])[0]
+        parts = candidate.get("content", {}).get("parts", [])
+
+        calls = [
+            {"tool": part["functionCall"]["name"], "args": part["functionCall"].get("args", {})}
+            for part in parts if "functionCall" in part
+        ]
+        if calls:
+            # "tool"/"args" is the first call; "calls" lists every call of this turn
+            return {"type": "tool_call", "tool": calls[0]["tool"], "args": calls[0]["args"], "calls": calls}
 
-            elif parts and "text" in parts[0]:
-                message = parts[0]["text"]
-                self.add_agent_message(message)
-                return {"type": "reply", "text": message}
+        elif parts and "text" in parts[0]:
+            message = parts[0]["text"]
+            self.add_agent_message(message)
+            return {"type": "reply", "text": message}
 
-            else:
-                return {"type": "unknown", "text": "No response."}
+        else:
+            return {"type": "unknown", "text": "No response."}
 
+    @staticmethod
+    def _traced_result(s, result: dict) -> dict:
+        """Notes what the model decided (reply / which tool / error) on the step's span."""
+        s.set(result=result["type"])
+        if result["type"] == "tool_call":
+            s.set(tool=result["tool"])
+        elif result["type"] == "error":
+            s.error = result["text"]
+        return result
+
+    def call(self):
+        """
+        Calls Gemini with memory + tool support.
+        Returns one of:
+          - {type: "reply", text: "..."}
+          - {type: "tool_call", tool: "...", args: {...}, calls: [{tool, args}, ...]}
+        """
+        with span("agent.step", turns=len(self.memory.turns)) as s:
+            try:
+                result = self._parse_result(get_transport().post_json(GEMINI_URL, self._request_body()))
+            except Exception as e:
+                result = {"type": "error", "text": f"❌ Gemini API Error: {str(e)}"}
+            return self._traced_result(s, result)
+
+    def stream(self):
+        """
+        Streaming variant of call(): yields {type: "delta", text: "..."} for each
+        piece of reply text as Gemini generates it, then the same final result
+        call() returns (reply / tool_call / error). Function calls arrive whole,
+        so a tool-call turn yields no deltas.
+        """
+        texts, calls = [], []
+        try:
+            for chunk in get_transport().stream_json(stream_url(GEMINI_URL), self._request_body()):
+                for part in chunk_parts(chunk):
+                    if "functionCall" in part:
+                        calls.append(part)
+                    elif part.get("text"):
+                        texts.append(part["text"])
+                        yield {"type": "delta", "text": part["text"]}
         except Exception as e:
-            return {"type": "error", "text": f"❌ Gemini API Error: {str(e)}"}
+            yield {"type": "error", "text": f"❌ Gemini API Error: {str(e)}"}
+            return
+
+        parts = calls + ([{"text": "".join(texts)}] if texts else [])
+        yield self._parse_result({"candidates": [{"content": {"parts": parts}}]})
+
+    async def acall(self):
+        """Non-blocking variant of call(); same return values."""
+        with span("agent.step", turns=len(self.memory.turns)) as s:
+            try:
+                transport = get_async_transport()
+                result = self._parse_result(await transport.post_json(GEMINI_URL, self._request_body()))
+            except Exception as e:
+                result = {"type": "error", "text": f"❌ Gemini API Error: {str(e)}"}
+            return self._traced_result(s, result)
@@ -1,4 +1,6 @@
-import requests
+import time
+from gemini_transport import get_transport, get_async_transport, stream_url, chunk_parts
+from response_cache import get_response_cache
 
 # ------------------ GEMINI CONFIG ------------------
 GEMINI_API_KEY = "YOUR_ACTUAL_GEMINI_API_KEY_HERE"
@@ -7,6 +9,7 @@ GEMINI_URL = (
     f"https://generativelanguage.googleapis.com/v1beta/models/"
     f"{GEMINI_MODEL}:generateContent?key={GEMINI_API_KEY}"
 )
+GEMINI_ERROR = "❌ Gemini API Error"  # call_gemini / stream_gemini return this (plus details) on failure
 
 # ------------------ SIMPLE TEXT COMPLETION ------------------
 def call_gemini(prompt: str) -> str:
@@ -14,16 +17,64 @@ def call_gemini(prompt: str) -> str:
     Calls Gemini with a free-form prompt (no tools).
     Returns plain text output from Gemini.
     """
-    headers = {"Content-Type": "application/json"}
     body = {
         "contents": [{"role": "user", "parts": [{"text": prompt}]}]
     }
 
     try:
-        response = requests.post(GEMINI_URL, headers=headers, json=body)
-        response.raise_for_status()
-        result = response.json()
+        result = get_transport().post_json(GEMINI_URL, body, cache=get_response_cache())
         return result["candidates"][0]["content"]["parts"][0]["text"].strip()
     
     except Exception as e:
-        return f"❌ Gemini API Error: {str(e)}"
+        return f"{GEMINI_ERROR}: {str(e)}"
+
+
+async def acall_gemini(prompt: str) -> str:
+    """Non-blocking variant of call_gemini (async transport); same return values."""
+    body = {
+        "contents": [{"role": "user", "parts": [{"text": prompt}]}]
+    }
+
+    try:
+        result = await get_async_transport().post_json(GEMINI_URL, body, cache=get_response_cache())
+        return result["candidates"][0]["content"]["parts"][0]["text"].strip()
+
+    except Exception as e:
+        return f"{GEMINI_ERROR}: {str(e)}"
+
+
+# ------------------ STREAMING TEXT COMPLETION ------------------
+def stream_gemini(prompt: str):
+    """
+    Streaming variant of call_gemini: yields the text in pieces as Gemini
+    generates it (streamGenerateContent), so the first words can be shown
+    long before the whole answer is done.
+
+    A cached answer is yielded in one piece; a completed stream is stored in
+    the response cache, so call_gemini with the same prompt hits it too.
+    """
+    body = {
+        "contents": [{"role": "user", "parts": [{"text": prompt}]}]
+    }
+    cache = get_response_cache()
+    cached = cache.get(GEMINI_URL, body)
+    if cached is not None:
+        yield cached["candidates"][0]["content"]["parts"][0]["text"].strip()
+        return
+
+    pieces = []
+    start = time.perf_counter()
+    try:
+        for chunk in get_transport().stream_json(stream_url(GEMINI_URL), body):
+            text = "".join(part.get("text", "") for part in chunk_parts(chunk))
+            if not pieces:
+                text = text.lstrip()
+            if text:
+                pieces.append(text)
+                yield text
+    except Exception as e:
+        yield f"{GEMINI_ERROR}: {str(e)}"
+        return
+
+    response = {"candidates": [{"content": {"role": "model", "parts": [{"text": "".join(pieces)}]}}]}
+    cache.put(GEMINI_URL, body, response, latency=time.perf_counter() - start)
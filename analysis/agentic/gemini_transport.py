@@ -0,0 +1,297 @@
+import os
+import sys
+import json
+import time
+import random
+import threading
+import weakref
+import requests
+from requests.adapters import HTTPAdapter
+
+# Tracing is shared with the data modules in analysis/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tracing import span  # noqa: E402
+
+# ------------------ TRANSPORT CONFIG ------------------
+CONNECT_TIMEOUT = 5  # seconds to establish the TCP/TLS connection
+READ_TIMEOUT = 120  # seconds to wait for Gemini to finish generating
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5  # seconds; doubled per attempt, full jitter
+BACKOFF_MAX = 8
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_CONCURRENCY = 8  # in-flight Gemini requests per process
+POOL_SIZE = 16  # keep-alive connections kept per host
+ASYNC_MAX_CONCURRENCY = 64  # in-flight requests per event loop for the async transport
+
+
+# ------------------ POOLED TRANSPORT ------------------
+class GeminiTransport:
+    """
+    One keep-alive requests.Session shared by every Gemini call in the process,
+    so chat turns reuse TCP/TLS connections instead of handshaking per call.
+
+    Adds connect/read timeouts, retries with exponential backoff and jitter on
+    429/5xx and connection errors (honouring Retry-After), and a cap on
+    concurrent in-flight requests. Read timeouts are not retried: the request
+    reached Gemini, so another attempt would bill a second generation and wait
+    READ_TIMEOUT again.
+    """
+
+    def __init__(
+        self,
+        connect_timeout=CONNECT_TIMEOUT,
+        read_timeout=READ_TIMEOUT,
+        max_retries=MAX_RETRIES,
+        max_concurrency=MAX_CONCURRENCY,
+        pool_size=POOL_SIZE,
+    ):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.session = requests.Session()
+        self.session.headers.update({"Content-Type": "application/json"})
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self.calls = 0
+        self.retries = 0
+
+    def _backoff(self, attempt, response=None):
+        delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, min(BACKOFF_MAX, int(retry_after)))
+        time.sleep(delay)
+
+    def post(self, url: str, body: dict, stream: bool = False, timeout=None) -> requests.Response:
+        """
+        POSTs a JSON body, retrying transient failures.
+        Returns the successful response; raises requests exceptions otherwise.
+        """
+        for attempt in range(self.max_retries + 1):
+            response = None
+            with self._slots:
+                self.calls += 1
+                try:
+                    response = self.session.post(url, json=body, stream=stream, timeout=timeout or self.timeout)
+                except requests.ConnectionError:  # includes ConnectTimeout, not ReadTimeout
+                    if attempt == self.max_retries:
+                        raise
+                else:
+                    if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                        response.raise_for_status()
+                        return response
+                    response.close()
+
+            # Back off outside the concurrency slot so waiting callers can proceed
+            self.retries += 1
+            self._backoff(attempt, response)
+
+    def post_json(self, url: str, body: dict, timeout=None, cache=None) -> dict:
+        """
+        POSTs a JSON body and returns the decoded JSON response.
+        With a ResponseCache, cached responses are returned without a network call.
+        """
+        with span("llm.generate", model=model_name(url)) as s:
+            if s.recording:
+                s.set(request_bytes=len(json.dumps(body)))
+            if cache is not None:
+                cached = cache.get(url, body)
+                s.set(cache_hit=cached is not None)
+                if cached is not None:
+                    return cached
+
+            start = time.perf_counter()
+            response = self.post(url, body, timeout=timeout)
+            result = response.json()
+            s.set(response_bytes=len(response.content))
+            if cache is not None:
+                cache.put(url, body, result, latency=time.perf_counter() - start)
+            return result
+
+    def stream_json(self, url: str, body: dict, timeout=None):
+        """
+        POSTs a JSON body to a server-sent-events endpoint (see stream_url) and
+        yields every event's decoded JSON payload as soon as it arrives.
+
+        Retries apply until the response headers arrive; a stream that breaks
+        midway raises to the caller. The concurrency slot is released once the
+        stream has started, like post(stream=True).
+        """
+        # Not the current span: the generator's caller runs between the chunks
+        s = span("llm.stream", model=model_name(url))
+        if s.recording:
+            s.set(request_bytes=len(json.dumps(body)))
+        start, chunks, size = time.perf_counter(), 0, 0
+
+        def counted(lines):
+            nonlocal size
+            for line in lines:
+                size += len(line) + 1
+                yield line
+
+        try:
+            response = self.post(url, body, stream=True, timeout=timeout)
+            with response:
+                response.encoding = "utf-8"
+                for event in iter_sse(counted(response.iter_lines(decode_unicode=True))):
+                    if not chunks:
+                        s.set(first_chunk_ms=round((time.perf_counter() - start) * 1000, 3))
+                    chunks += 1
+                    yield event
+        except Exception as e:
+            s.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            s.set(chunks=chunks, response_bytes=size)
+            s.end()
+
+
+# ------------------ STREAMING ------------------
+def model_name(url: str) -> str:
+    """Model of a generateContent URL (".../models/<model>:generateContent?...")."""
+    return url.partition("/models/")[2].partition(":")[0] or url
+
+
+def stream_url(url: str) -> str:
+    """streamGenerateContent (server-sent events) counterpart of a generateContent URL."""
+    base, _, query = url.partition("?")
+    base = base.replace(":generateContent", ":streamGenerateContent")
+    return f"{base}?alt=sse" + (f"&{query}" if query else "")
+
+
+def iter_sse(lines):
+    """Decoded JSON payloads of the events in a server-sent-events line stream."""
+    data = []
+    for line in lines:
+        if line.startswith("data:"):
+            data.append(line[5:].strip())
+        elif not line.strip() and data:
+            yield json.loads("\n".join(data))
+            data = []
+    if data:
+        yield json.loads("\n".join(data))
+
+
+def chunk_parts(chunk: dict) -> list:
+    """Content parts of one streamed GenerateContentResponse chunk ([] for metadata-only chunks)."""
+    candidates = chunk.get("candidates") or [{}]
+    return candidates[0].get("content", {}).get("parts", [])
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> GeminiTransport:
+    """Process-wide shared transport (created on first use)."""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = GeminiTransport()
+    return _transport
+
+
+# ------------------ ASYNC TRANSPORT ------------------
+class AsyncGeminiTransport:
+    """
+    asyncio-native counterpart of GeminiTransport built on httpx.AsyncClient
+    (optional dependency: pip install httpx). Same timeouts and retry policy,
+    read timeouts included; waiting on Gemini never blocks the event loop, so
+    one process can keep many conversations in flight.
+    """
+
+    def __init__(
+        self,
+        connect_timeout=CONNECT_TIMEOUT,
+        read_timeout=READ_TIMEOUT,
+        max_retries=MAX_RETRIES,
+        max_concurrency=ASYNC_MAX_CONCURRENCY,
+    ):
+        import asyncio  # only async callers pay for it (already loaded by their event loop)
+        try:
+            import httpx
+        except ImportError as e:
+            raise ImportError("The async Gemini transport requires httpx (pip install httpx).") from e
+
+        self._asyncio = asyncio
+        self._httpx = httpx
+        self.max_retries = max_retries
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+            headers={"Content-Type": "application/json"},
+        )
+        self._slots = self._asyncio.Semaphore(max_concurrency)
+        self.calls = 0
+        self.retries = 0
+
+    async def _backoff(self, attempt, response=None):
+        delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, min(BACKOFF_MAX, int(retry_after)))
+        await self._asyncio.sleep(delay)
+
+    async def post(self, url: str, body: dict, timeout=None):
+        """POSTs a JSON body, retrying transient failures. Returns the httpx response."""
+        httpx = self._httpx
+        request_timeout = httpx.Timeout(timeout[1], connect=timeout[0]) if timeout else httpx.USE_CLIENT_DEFAULT
+        for attempt in range(self.max_retries + 1):
+            response = None
+            async with self._slots:
+                self.calls += 1
+                try:
+                    response = await self.client.post(url, json=body, timeout=request_timeout)
+                except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout, httpx.RemoteProtocolError):
+                    if attempt == self.max_retries:
+                        raise
+                else:
+                    if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                        response.raise_for_status()
+                        return response
+
+            self.retries += 1
+            await self._backoff(attempt, response)
+
+    async def post_json(self, url: str, body: dict, timeout=None, cache=None) -> dict:
+        """
+        POSTs a JSON body and returns the decoded JSON response (optionally via a
+        ResponseCache). The cache does SQLite work and may embed the prompt, so
+        its lookups and writes run in a worker thread, off the event loop.
+        """
+        to_thread = self._asyncio.to_thread
+        with span("llm.generate", model=model_name(url)) as s:
+            if s.recording:
+                s.set(request_bytes=len(json.dumps(body)))
+            if cache is not None:
+                cached = await to_thread(cache.get, url, body)
+                s.set(cache_hit=cached is not None)
+                if cached is not None:
+                    return cached
+
+            start = time.perf_counter()
+            response = await self.post(url, body, timeout=timeout)
+            result = response.json()
+            s.set(response_bytes=len(response.content))
+            if cache is not None:
+                await to_thread(cache.put, url, body, result, latency=time.perf_counter() - start)
+            return result
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+# httpx clients and asyncio semaphores are bound to the loop they're used on
+_async_transports = weakref.WeakKeyDictionary()
+
+
+def get_async_transport() -> AsyncGeminiTransport:
+    """Shared async transport for the running event loop."""
+    import asyncio
+    loop = asyncio.get_running_loop()
+    transport = _async_transports.get(loop)
+    if transport is None:
+        transport = _async_transports[loop] = AsyncGeminiTransport()
+    return transport
@@ -0,0 +1,227 @@
+import os
+import re
+import sys
+import json
+import time
+import threading
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tracing import span  # noqa: E402
+
+# ------------------ ROUTER CONFIG ------------------
+INTENTS = ["trend_analysis", "forecasting", "product_bundling", "performance_metrics"]
+INTENT_LOG_PATH = "intent_log.jsonl"  # {"text", "intent", "source"} per routed message
+RULE_CONFIDENCE = 0.65  # rule score needed to skip the model / LLM
+MODEL_CONFIDENCE = 0.5  # classifier probability needed to skip the LLM
+MIN_TRAINING_EXAMPLES = 20
+
+# Keyword rules: (pattern, weight). A message's score for an intent is the
+# summed weight of matching patterns, squashed to [0, 1) by score / (score + 1).
+INTENT_RULES = {
+    "trend_analysis": [
+        (r"\btrend(s|ing)?\b", 3.0),
+        (r"\b(increas|decreas|grow|grew|declin|rising|falling|going up|going down|more or less)", 2.0),
+        (r"\b(monthly|month over month|over time|history|historical|past|last \d+ months)\b", 1.0),
+        (r"\bhow (is|are|has|have) .* (doing|selling|sold)\b", 1.0),
+    ],
+    "forecasting": [
+        (r"\b(forecast\w*|predict\w*|projection|project(ed)?|future|upcoming)\b", 3.0),
+        (r"\b(next|upcoming|coming|future)\s+(\d+\s+)?(day|week|month|quarter|year)s?\b", 2.0),
+        (r"\b(will|expected|expect|estimate|anticipate)\b", 1.0),
+        (r"\bdemand\b", 0.5),
+    ],
+    "product_bundling": [
+        (r"\b(bundl\w*|combo\w*|cross[- ]?sell\w*|upsell\w*)\b", 3.0),
+        (r"\b(bought|purchased|sold|go(es)?)\s+together\b", 3.0),
+        (r"\b(frequently|often)\s+(bought|purchased)\b", 2.0),
+        (r"\b(pair|pairs|pairing|market basket|basket analysis|affinity|complementary)\b", 2.0),
+    ],
+    "performance_metrics": [
+        (r"\b(kpi|kpis|metric\w*|performance|revenue|margin|profit\w*|conversion)\b", 2.5),
+        (r"\b(top|best|worst|bottom)\b.{0,20}\b(selling|performing|products?|sellers?|stores?)\b", 2.5),
+        (r"\b(total|average|avg)\s+(sales|orders|revenue)\b", 2.0),
+        (r"\b(rank\w*|leaderboard|compare|comparison|dashboard|report)\b", 1.0),
+    ],
+}
+_COMPILED_RULES = {
+    intent: [(re.compile(pattern, re.IGNORECASE), weight) for pattern, weight in rules]
+    for intent, rules in INTENT_RULES.items()
+}
+
+# Seed utterances so the classifier has something to learn from before any logs exist
+INTENT_EXAMPLES = [
+    ("show me the trend for product cap in eon", "trend_analysis"),
+    ("how has the blue mug been selling over the last few months", "trend_analysis"),
+    ("is the demand for tshirts going up or down", "trend_analysis"),
+    ("sales trend of water bottle in retail db", "trend_analysis"),
+    ("analyze monthly sales of the hoodie", "trend_analysis"),
+    ("is product x increasing or decreasing", "trend_analysis"),
+    ("what happened to notebook sales this year", "trend_analysis"),
+    ("forecast sales for the next 30 days", "forecasting"),
+    ("predict how many caps we will sell next month", "forecasting"),
+    ("what will demand look like next quarter", "forecasting"),
+    ("projection of orders for the coming weeks", "forecasting"),
+    ("estimate future sales of the red jacket", "forecasting"),
+    ("how many units should we expect to sell in december", "forecasting"),
+    ("which products are frequently bought together", "product_bundling"),
+    ("suggest a bundle for the summer sale", "product_bundling"),
+    ("what goes well with the coffee mug", "product_bundling"),
+    ("cross sell ideas for laptops", "product_bundling"),
+    ("find complementary products for shoes", "product_bundling"),
+    ("create a combo offer with socks", "product_bundling"),
+    ("what are the top 10 selling products", "performance_metrics"),
+    ("show me kpis for last month", "performance_metrics"),
+    ("total revenue by store", "performance_metrics"),
+    ("which products perform worst", "performance_metrics"),
+    ("give me the average orders per day", "performance_metrics"),
+    ("compare performance of eon and retail databases", "performance_metrics"),
+]
+
+
+# ------------------ RULES ------------------
+def rule_scores(text: str) -> dict:
+    """{intent: confidence in [0, 1)} from the keyword rules."""
+    scores = {}
+    for intent, rules in _COMPILED_RULES.items():
+        score = sum(weight for pattern, weight in rules if pattern.search(text))
+        scores[intent] = score / (score + 1.0)
+    return scores
+
+
+def _best(scores: dict):
+    """(intent, margin-adjusted confidence); ties between intents lower the confidence."""
+    ranked = sorted(scores.items(), key=lambda item: -item[1])
+    (intent, top), runner_up = ranked[0], (ranked[1][1] if len(ranked) > 1 else 0.0)
+    return intent, top * (1.0 - runner_up)
+
+
+# ------------------ CLASSIFIER ------------------
+def _build_classifier(examples):
+    """TF-IDF + logistic regression over (text, intent) pairs; None if scikit-learn is missing."""
+    try:
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.pipeline import make_pipeline, make_union
+    except ImportError:
+        return None
+
+    texts = [text for text, _ in examples]
+    labels = [intent for _, intent in examples]
+    if len(set(labels)) < 2:
+        return None
+    model = make_pipeline(
+        make_union(
+            TfidfVectorizer(ngram_range=(1, 2), sublinear_tf=True),
+            TfidfVectorizer(analyzer="char_wb", ngram_range=(3, 5), sublinear_tf=True),
+        ),
+        LogisticRegression(max_iter=1000, C=5.0),
+    )
+    return model.fit(texts, labels)
+
+
+def load_logged_examples(path=INTENT_LOG_PATH) -> list:
+    """(text, intent) pairs from the routing log (only rows labelled by the LLM or a human)."""
+    if not os.path.exists(path):
+        return []
+    examples = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if row.get("intent") in INTENTS and row.get("source") in ("llm", "human"):
+                examples.append((row["text"], row["intent"]))
+    return examples
+
+
+# ------------------ ROUTER ------------------
+class IntentRouter:
+    """
+    Routes a message to one of INTENTS without Gemini when possible.
+
+    Keyword rules answer first; if they aren't confident, a small scikit-learn
+    classifier (seed examples + LLM-labelled messages from the routing log)
+    gets a turn; only if both are unsure is the fallback (Gemini's
+    detect_intent) called. Fallback answers are appended to the log so the
+    classifier learns them the next time it is trained.
+    """
+
+    def __init__(
+        self,
+        fallback=None,
+        log_path=INTENT_LOG_PATH,
+        rule_confidence=RULE_CONFIDENCE,
+        model_confidence=MODEL_CONFIDENCE,
+        use_model=True,
+    ):
+        """
+        :param fallback: user_input -> intent, called when local routing is unsure (None: never)
+        """
+        self.fallback = fallback
+        self.log_path = log_path
+        self.rule_confidence = rule_confidence
+        self.model_confidence = model_confidence
+        self.model = None
+        if use_model:
+            examples = INTENT_EXAMPLES + (load_logged_examples(log_path) if log_path else [])
+            if len(examples) >= MIN_TRAINING_EXAMPLES:
+                self.model = _build_classifier(examples)
+        self._lock = threading.Lock()
+        self.counts = {"rules": 0, "model": 0, "llm": 0, "unresolved": 0}
+        self.latency = {"rules": 0.0, "model": 0.0, "llm": 0.0, "unresolved": 0.0}
+
+    def classify_local(self, text: str):
+        """(intent, confidence, source) from rules, then the classifier; never calls the LLM."""
+        intent, confidence = _best(rule_scores(text))
+        if confidence >= self.rule_confidence or self.model is None:
+            return intent, confidence, "rules"
+
+        probabilities = self.model.predict_proba([text])[0]
+        best = int(probabilities.argmax())
+        return self.model.classes_[best], float(probabilities[best]), "model"
+
+    def route(self, text: str) -> dict:
+        """{"intent", "confidence", "source", "latency_ms"}; intent is "unknown" if nothing was confident."""
+        start = time.perf_counter()
+        with span("intent.route") as s:
+            intent, confidence, source = self.classify_local(text)
+            threshold = self.rule_confidence if source == "rules" else self.model_confidence
+
+            if confidence < threshold:
+                if self.fallback is not None:
+                    intent, confidence, source = self.fallback(text), 1.0, "llm"
+                    if intent in INTENTS:
+                        self._log(text, intent, source)
+                    else:
+                        intent, source = "unknown", "unresolved"
+                else:
+                    intent, source = "unknown", "unresolved"
+            s.set(intent=intent, source=source, confidence=round(confidence, 4))
+
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.counts[source] += 1
+            self.latency[source] += elapsed
+        return {"intent": intent, "confidence": round(confidence, 4), "source": source,
+                "latency_ms": round(elapsed * 1000, 3)}
+
+    def _log(self, text: str, intent: str, source: str):
+        if not self.log_path:
+            return
+        with self._lock, open(self.log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"text": text, "intent": intent, "source": source}) + "\n")
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = sum(self.counts.values())
+            local = self.counts["rules"] + self.counts["model"]
+            return {
+                "messages": total,
+                **{f"routed_{source}": count for source, count in self.counts.items()},
+                "local_share": round(local / total, 4) if total else 0.0,
+                **{
+                    f"avg_ms_{source}": round(1000 * self.latency[source] / count, 3)
+                    for source, count in self.counts.items() if count
+                },
+            }
@@ -1,28 +1,237 @@
 # app.py
 
-from flask import Flask, request, jsonify
-from trend_agent import trend_agent
+import os
+import sys
+import json
+import time
+import uuid
+import argparse
+import threading
+from flask import Flask, Response, request, jsonify, stream_with_context
+from session_store import SessionStore, MAX_SESSIONS, IDLE_TTL_SECONDS
 
-app = Flask(__name__)
+# analysis/ (dataset_cache and the tool modules) is imported on first use:
+# pandas, LangChain and the Gemini client stay out of process startup
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from tracing import configure_tracing, span, OTLP_ENDPOINT  # noqa: E402
 
-@app.route("/chat", methods=["POST"])
-def chat():
-    try:
-        data = request.json
+# --------------- SERVING CONFIG -------------------
+SERVER_THREADS = 32  # concurrent requests; agent calls are I/O-bound (Gemini), so threads suffice
+
+
+def _default_agent_factory():
+    # Imported on first use so the app (and its load test) starts without building an agent
+    from trend_agent import build_trend_agent
+    return build_trend_agent()
+
+
+def _default_stream_reply(agent, message):
+    from trend_agent import stream_trend_reply
+    return stream_trend_reply(agent, message)
+
+
+def _default_warmup():
+    from trend_agent import warm_up
+    warm_up()
+
+
+class _Warmup:
+    """Runs fn once on a daemon thread so the heavy imports happen while the server already answers."""
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.done = threading.Event()
+        self.seconds = None
+        self.error = None
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="app-warmup", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        start = time.perf_counter()
+        try:
+            self.fn()
+        except Exception as e:  # the first chat request then reports the same error
+            self.error = f"{type(e).__name__}: {e}"
+        self.seconds = round(time.perf_counter() - start, 3)
+        self.done.set()
+
+    def state(self) -> dict:
+        return {"started": self._thread is not None, "ready": self.done.is_set(),
+                "seconds": self.seconds, "error": self.error}
+
+
+def _sse(event: str, payload: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+def create_app(
+    agent_factory=None,
+    stream_reply=None,
+    max_sessions: int = MAX_SESSIONS,
+    idle_ttl: float = IDLE_TTL_SECONDS,
+    warmup=None,
+) -> Flask:
+    """
+    Flask app serving one isolated conversation per session.
+
+    Clients pass a session_id (JSON field or X-Session-Id header); a request
+    without one starts a new session whose id is returned with the response.
+    /chat answers with the complete reply, /chat/stream with server-sent events
+    as the reply is generated.
+
+    :param agent_factory: Builds the agent of a new session (default: trend_agent.build_trend_agent)
+    :param stream_reply: stream_reply(agent, message) yields {type: "delta" | "reply" | "error", text}
+                         events (default: trend_agent.stream_trend_reply)
+    :param warmup: Callable run on a background thread as the app is created, so the agent
+                   stack is imported while the server already answers; True for
+                   trend_agent.warm_up. "/" answers right away, /ready once it is done
+                   (503 while it runs or if it failed).
+    """
+    app = Flask(__name__)
+    stream_reply = stream_reply or _default_stream_reply
+    sessions = SessionStore(agent_factory or _default_agent_factory, max_sessions=max_sessions, idle_ttl=idle_ttl)
+    app.config["SESSIONS"] = sessions
+    app.config["WARMUP"] = _Warmup(_default_warmup if warmup is True else warmup) if warmup else None
+    if app.config["WARMUP"] is not None:
+        app.config["WARMUP"].start()
+
+    @app.route("/chat", methods=["POST"])
+    def chat():
+        try:
+            data = request.get_json(silent=True) or {}
+            user_message = data.get("message", "")
+
+            if not user_message:
+                return jsonify({"error": "No message provided."}), 400
+
+            session_id = data.get("session_id") or request.headers.get("X-Session-Id") or uuid.uuid4().hex
+            with span("http.chat", session_id=session_id, request_bytes=len(user_message)) as s:
+                with sessions.acquire(session_id) as agent:
+                    response = agent.run(user_message)
+                s.set(response_bytes=len(response))
+            return jsonify({"response": response, "session_id": session_id})
+
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    @app.route("/chat/stream", methods=["POST"])
+    def chat_stream():
+        """
+        Server-sent events: "delta" events carry pieces of the reply as they are
+        generated ({"text": ...}), then one "done" ({"response", "session_id"})
+        or "error" ({"error"}) event ends the stream.
+        """
+        data = request.get_json(silent=True) or {}
         user_message = data.get("message", "")
 
         if not user_message:
             return jsonify({"error": "No message provided."}), 400
 
-        response = trend_agent.run(user_message)
-        return jsonify({"response": response})
+        session_id = data.get("session_id") or request.headers.get("X-Session-Id") or uuid.uuid4().hex
+
+        def events():
+            # Ended by hand: the response generator yields between the deltas
+            s = span("http.chat_stream", session_id=session_id, request_bytes=len(user_message))
+            started, deltas = time.perf_counter(), 0
+            try:
+                with sessions.acquire(session_id) as agent:
+                    replies = stream_reply(agent, user_message)
+                    try:
+                        for event in replies:
+                            if event["type"] == "delta":
+                                if not deltas:
+                                    s.set(first_delta_ms=round((time.perf_counter() - started) * 1000, 3))
+                                deltas += 1
+                                yield _sse("delta", {"text": event["text"]})
+                            elif event["type"] == "reply":
+                                s.set(response_bytes=len(event["text"]))
+                                yield _sse("done", {"response": event["text"], "session_id": session_id})
+                            else:
+                                s.error = event["text"]
+                                yield _sse("error", {"error": event["text"], "session_id": session_id})
+                    finally:
+                        # On a client disconnect, close the reply stream (which waits for the
+                        # agent to finish) before the session is released to the next request
+                        if hasattr(replies, "close"):
+                            replies.close()
+            except Exception as e:
+                s.error = f"{type(e).__name__}: {e}"
+                yield _sse("error", {"error": str(e), "session_id": session_id})
+            finally:
+                s.set(deltas=deltas)
+                s.end()
+
+        headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "X-Session-Id": session_id}
+        return Response(stream_with_context(events()), mimetype="text/event-stream", headers=headers)
+
+    @app.route("/chat/<session_id>", methods=["DELETE"])
+    def end_session(session_id):
+        return jsonify({"session_id": session_id, "ended": sessions.drop(session_id)})
+
+    @app.route("/stats/sessions", methods=["GET"])
+    def session_stats():
+        return jsonify(sessions.stats())
+
+    @app.route("/stats/datasets", methods=["GET"])
+    def dataset_stats():
+        from dataset_cache import DATASET_CACHE
+        return jsonify(DATASET_CACHE.stats())
+
+    @app.route("/", methods=["GET"])
+    def health_check():
+        return "✅ LangChain Gemini Agent is running.", 200
 
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    @app.route("/ready", methods=["GET"])
+    def readiness_check():
+        warm = app.config["WARMUP"]
+        state = warm.state() if warm else {"started": False, "ready": True, "seconds": None, "error": None}
+        # A failed warm-up is not ready either: the worker can't serve chats
+        return jsonify(state), 200 if state["ready"] and not state["error"] else 503
+
+    return app
+
+
+# Importing the module stays cheap (the benchmarks build their own apps); WSGI
+# servers should load "app:create_app(warmup=True)" to get the warm-up
+app = create_app()
+
+
+def serve(app: Flask, host: str = "127.0.0.1", port: int = 5000, threads: int = SERVER_THREADS):
+    """
+    Runs the app on a thread pool: waitress when installed, werkzeug's threaded server otherwise.
+
+    Sessions live in this process, so scale with threads rather than worker
+    processes (or pin sessions to a process at the load balancer).
+    """
+    try:
+        from waitress import serve as waitress_serve
+    except ImportError:
+        from werkzeug.serving import make_server
+        make_server(host, port, app, threaded=True).serve_forever()
+    else:
+        waitress_serve(app, host=host, port=port, threads=threads)
 
-@app.route("/", methods=["GET"])
-def health_check():
-    return "✅ LangChain Gemini Agent is running.", 200
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    parser = argparse.ArgumentParser(description="Serve the trend chat agent")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=SERVER_THREADS)
+    parser.add_argument("--debug", action="store_true", help="Flask's single-user debug server instead")
+    parser.add_argument("--no-warmup", action="store_true", help="Import the agent stack on the first chat instead")
+    parser.add_argument("--trace", metavar="FILE", help="Append per-stage spans to FILE as JSON lines")
+    parser.add_argument("--otlp", nargs="?", const=OTLP_ENDPOINT, metavar="URL",
+                        help=f"Send spans to an OpenTelemetry collector (default {OTLP_ENDPOINT})")
+    args = parser.parse_args()
+
+    configure_tracing(jsonl_path=args.trace, otlp_endpoint=args.otlp)
+
+    app = create_app(warmup=not args.no_warmup)
+    if args.debug:
+        app.run(debug=True)
+    else:
+        serve(app, host=args.host, port=args.port, threads=args.threads)
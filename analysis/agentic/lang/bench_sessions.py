@@ -0,0 +1,142 @@
+import argparse
+import json
+import statistics
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+from werkzeug.serving import WSGIRequestHandler, make_server
+from app import create_app
+
+# --------------- BENCHMARK -------------------
+# Load test of the /chat endpoint: throughput and latency as concurrent users grow.
+#   python bench_sessions.py --llm-ms 200 --turns 5 --concurrency 1 4 16 32
+#
+# Gemini is replaced by a local stub that sleeps --llm-ms per call; each agent
+# keeps its own message history and makes --calls-per-turn LLM calls per
+# message (a tool step plus the answer). Every user talks to the app in its own
+# session; "shared" replays the old setup where all users go through one
+# agent / one memory. The stub echoes how many user messages it saw, so
+# replies that leak another user's turns are counted as isolation errors.
+
+
+def start_stub_llm(llm_seconds: float):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            time.sleep(llm_seconds)
+            payload = json.dumps({"text": f"turn {len(body['history'])}"}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        request_queue_size = 256  # the default backlog (5) refuses connections under load
+
+    server = Server(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class StubAgent:
+    """Stands in for the LangChain agent: private memory, calls_per_turn LLM round trips per message."""
+
+    def __init__(self, llm_url: str, client: httpx.Client, calls_per_turn: int):
+        self.llm_url = llm_url
+        self.client = client
+        self.calls_per_turn = calls_per_turn
+        self.history = []
+
+    def run(self, message: str) -> str:
+        self.history.append(message)
+        for _ in range(self.calls_per_turn):
+            reply = self.client.post(self.llm_url, json={"history": self.history}).json()["text"]
+        return reply
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def start_app(agent_factory):
+    server = make_server("127.0.0.1", 0, create_app(agent_factory), threaded=True, request_handler=_QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_load(app_url: str, users: int, turns: int, shared: bool) -> dict:
+    latencies, errors = [], []
+    lock = threading.Lock()
+    shared_id = uuid.uuid4().hex
+
+    def user():
+        session_id = shared_id if shared else uuid.uuid4().hex
+        with httpx.Client(timeout=120) as client:
+            for turn in range(1, turns + 1):
+                start = time.perf_counter()
+                reply = client.post(app_url, json={"message": f"question {turn}", "session_id": session_id}).json()
+                elapsed = time.perf_counter() - start
+                with lock:
+                    latencies.append(elapsed)
+                    if reply.get("response") != f"turn {turn}":
+                        errors.append(reply)
+
+    threads = [threading.Thread(target=user) for _ in range(users)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "throughput": len(latencies) / wall,
+        "p50": statistics.median(latencies),
+        "p95": latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))],
+        "isolation_errors": len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent /chat load test against a stub LLM")
+    parser.add_argument("--llm-ms", type=float, default=200, help="Simulated Gemini latency per call")
+    parser.add_argument("--calls-per-turn", type=int, default=2)
+    parser.add_argument("--turns", type=int, default=5, help="Messages per user")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 32])
+    args = parser.parse_args()
+
+    llm = start_stub_llm(args.llm_ms / 1000)
+    llm_url = f"http://127.0.0.1:{llm.server_port}/generate"
+    llm_client = httpx.Client(timeout=120, limits=httpx.Limits(max_connections=256, max_keepalive_connections=256))
+    server = start_app(lambda: StubAgent(llm_url, llm_client, args.calls_per_turn))
+    app_url = f"http://127.0.0.1:{server.server_port}/chat"
+
+    ideal = args.calls_per_turn * args.llm_ms
+    print(f"Stub LLM {args.llm_ms:.0f}ms x {args.calls_per_turn} calls per message ({ideal:.0f}ms floor), "
+          f"{args.turns} messages per user\n")
+    print(f"{'mode':<10} {'users':>6} {'req/s':>8} {'p50':>9} {'p95':>9} {'isolation errors':>17}")
+    for users in args.concurrency:
+        for mode in ["shared", "sessions"]:
+            result = run_load(app_url, users, args.turns, shared=mode == "shared")
+            print(f"{mode:<10} {users:>6} {result['throughput']:>8.1f} {result['p50'] * 1000:>7.0f}ms "
+                  f"{result['p95'] * 1000:>7.0f}ms {result['isolation_errors']:>17}")
+
+    stats = httpx.get(f"http://127.0.0.1:{server.server_port}/stats/sessions").json()
+    print(f"\nSession store: {stats}")
+    server.shutdown()
+    llm.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# --------------- SESSION CONFIG -------------------
+MAX_SESSIONS = 1000
+IDLE_TTL_SECONDS = 30 * 60
+
+
+class _Session:
+    __slots__ = ("agent", "lock", "last_used", "requests", "active")
+
+    def __init__(self, now: float):
+        self.agent = None
+        self.lock = threading.Lock()  # one request at a time per conversation
+        self.last_used = now
+        self.requests = 0
+        self.active = 0  # requests running or waiting for the lock (guarded by the store lock)
+
+
+# --------------- SESSION STORE -------------------
+class SessionStore:
+    """
+    Per-session agents (each with its own conversation memory) for concurrent serving.
+
+    Sessions are created on first use by calling factory(), kept in
+    least-recently-used order and dropped once idle for longer than idle_ttl
+    seconds or when more than max_sessions are alive. Sessions with a request
+    running or waiting are never dropped that way (the table may briefly hold
+    more than max_sessions if all of them are busy). Requests of the same
+    session run one after another (a conversation's memory is not thread-safe);
+    requests of different sessions run in parallel. The store-wide lock only
+    guards the session table, never an agent call or an agent's construction.
+    """
+
+    def __init__(self, factory, max_sessions: int = MAX_SESSIONS, idle_ttl: float = IDLE_TTL_SECONDS, clock=time.monotonic):
+        """
+        :param factory: Builds a fresh agent for a new session
+        :param clock: Time source (seconds), replaceable for tests
+        """
+        self.factory = factory
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.clock = clock
+        self._sessions = OrderedDict()  # session_id -> _Session, least recently used first
+        self._lock = threading.Lock()
+        self.created = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, session_id):
+        return session_id in self._sessions
+
+    def _session(self, session_id: str) -> _Session:
+        now = self.clock()
+        with self._lock:
+            self._expire(now)
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = _Session(now)
+                self.created += 1
+            else:
+                self._sessions.move_to_end(session_id)
+            session.last_used = now
+            session.requests += 1
+            session.active += 1
+            self._evict()
+            return session
+
+    def _release(self, session_id: str, session: _Session):
+        with self._lock:
+            session.active -= 1
+            session.last_used = self.clock()
+            if self._sessions.get(session_id) is session:
+                self._sessions.move_to_end(session_id)
+
+    def _expire(self, now: float):
+        # Oldest first, so stop at the first session still inside its TTL; busy ones stay
+        stale = []
+        for session_id, session in self._sessions.items():
+            if now - session.last_used <= self.idle_ttl:
+                break
+            if not session.active:
+                stale.append(session_id)
+        for session_id in stale:
+            del self._sessions[session_id]
+        self.expired += len(stale)
+
+    def _evict(self):
+        # Least recently used idle sessions first; busy ones stay
+        over = len(self._sessions) - self.max_sessions
+        victims = []
+        for session_id, session in self._sessions.items():
+            if len(victims) >= over:
+                break
+            if not session.active:
+                victims.append(session_id)
+        for session_id in victims:
+            del self._sessions[session_id]
+        self.evicted += len(victims)
+
+    @contextmanager
+    def acquire(self, session_id: str):
+        """
+        Yields the session's agent, holding the session for the duration of the block.
+
+        The session is neither expired nor evicted while the block runs, and
+        it becomes the most recently used one again when the block ends. Only
+        drop() ends it meanwhile; the request in progress still finishes.
+        """
+        session = self._session(session_id)
+        try:
+            with session.lock:
+                if session.agent is None:
+                    session.agent = self.factory()
+                yield session.agent
+        finally:
+            self._release(session_id, session)
+
+    def drop(self, session_id: str) -> bool:
+        """Ends a conversation. Returns whether the session existed."""
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def expire_idle(self):
+        with self._lock:
+            self._expire(self.clock())
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "idle_ttl": self.idle_ttl,
+                "created": self.created,
+                "expired": self.expired,
+                "evicted": self.evicted,
+                "busy": sum(session.lock.locked() for session in self._sessions.values()),
+            }
@@ -6,7 +6,8 @@ from trend_analysis_tools import (
     load_product_list,
     validate_product_name,
     get_monthly_sales,
-    summarize_trend
+    summarize_trend,
+    list_trends
 )
 
 # List of all tools available to the agent
@@ -16,5 +17,6 @@ TREND_ANALYSIS_TOOLS = [
     load_product_list,
     validate_product_name,
     get_monthly_sales,
-    summarize_trend
+    summarize_trend,
+    list_trends
 ]
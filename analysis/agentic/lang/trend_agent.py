@@ -1,28 +1,126 @@
-from langchain.agents import initialize_agent, AgentType
-from langchain.memory import ConversationBufferMemory
-from langchain_google_genai import ChatGoogleGenerativeAI
-from tool_registry import registered_tools
+import queue
+import threading
+from functools import lru_cache
+
+# LangChain, langchain_google_genai and the pandas-backed tool modules are
+# imported on first use (or by warm_up()), so importing this module is cheap.
 
 # --------------- CONFIG -------------------
 GEMINI_API_KEY = "your_actual_gemini_api_key_here"  # Replace securely in prod
 
-llm = ChatGoogleGenerativeAI(
-    model="gemini-1.5-pro",
-    temperature=0.3,
-    google_api_key=GEMINI_API_KEY  # 🔐 Explicitly passed
-)
+_llm = None
+_shared_agent = None
+_lock = threading.Lock()
+
+
+def get_llm():
+    """The Gemini chat model, created on first use; stateless and shared by every session."""
+    global _llm
+    if _llm is None:
+        with _lock:
+            if _llm is None:
+                from langchain_google_genai import ChatGoogleGenerativeAI
+                _llm = ChatGoogleGenerativeAI(
+                    model="gemini-1.5-pro",
+                    temperature=0.3,
+                    google_api_key=GEMINI_API_KEY,  # 🔐 Explicitly passed
+                    streaming=True  # tokens reach on_llm_new_token (stream_trend_reply) as they arrive
+                )
+    return _llm
 
-# --------------- MEMORY -------------------
-memory = ConversationBufferMemory(
-    memory_key="chat_history",
-    return_messages=True
-)
 
 # --------------- AGENT -------------------
-trend_agent = initialize_agent(
-    tools=registered_tools,
-    llm=llm,
-    agent=AgentType.OPENAI_FUNCTIONS,  # Use function-calling style
-    memory=memory,
-    verbose=True
-)
+def build_trend_agent():
+    """A trend agent with its own conversation memory; app.py keeps one per chat session."""
+    from langchain.agents import initialize_agent, AgentType
+    from langchain.memory import ConversationBufferMemory
+    from tool_registery import TREND_ANALYSIS_TOOLS as registered_tools
+
+    memory = ConversationBufferMemory(
+        memory_key="chat_history",
+        return_messages=True
+    )
+    return initialize_agent(
+        tools=registered_tools,
+        llm=get_llm(),
+        agent=AgentType.OPENAI_FUNCTIONS,  # Use function-calling style
+        memory=memory,
+        verbose=True
+    )
+
+
+def warm_up():
+    """Does the imports and client setup of the first agent ahead of time (app.py runs it in the background)."""
+    import tool_registery  # noqa: F401
+    _token_queue_class()
+    build_trend_agent()
+
+
+def __getattr__(name):
+    # Single shared conversation (`trend_agent`) and `llm`, for scripts that
+    # import them directly; built on first access rather than at import
+    global _shared_agent
+    if name == "llm":
+        return get_llm()
+    if name == "trend_agent":
+        if _shared_agent is None:
+            _shared_agent = build_trend_agent()
+        return _shared_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# --------------- STREAMING -------------------
+@lru_cache(maxsize=None)
+def _token_queue_class():
+    from langchain.callbacks.base import BaseCallbackHandler
+
+    class _TokenQueue(BaseCallbackHandler):
+        """Collects the tokens the LLM emits while the agent runs."""
+
+        def __init__(self):
+            self.tokens = queue.Queue()
+
+        def on_llm_new_token(self, token: str, **kwargs):
+            self.tokens.put(token)
+
+    return _TokenQueue
+
+
+def stream_trend_reply(agent, message: str):
+    """
+    Runs the agent on a worker thread and yields {type: "delta", text} for each
+    token the LLM generates, then {type: "reply", text} with the final answer
+    (or {type: "error", text}). When the model does not stream, the answer
+    arrives as a single delta.
+
+    Closing the generator early (client disconnected) waits for agent.run to
+    return, since the agent's memory is in use until then.
+    """
+    handler = _token_queue_class()()
+    outcome = {}
+
+    def run():
+        try:
+            outcome["reply"] = agent.run(message, callbacks=[handler])
+        except Exception as e:
+            outcome["error"] = str(e)
+        finally:
+            handler.tokens.put(None)
+
+    worker = threading.Thread(target=run, daemon=True)
+    worker.start()
+    streamed = False
+    try:
+        for token in iter(handler.tokens.get, None):
+            if token:
+                streamed = True
+                yield {"type": "delta", "text": token}
+    finally:
+        worker.join()
+
+    if "error" in outcome:
+        yield {"type": "error", "text": outcome["error"]}
+        return
+    if not streamed:
+        yield {"type": "delta", "text": outcome["reply"]}
+    yield {"type": "reply", "text": outcome["reply"]}
@@ -1,8 +1,17 @@
-import pandas as pd
+import os
+import sys
 from difflib import get_close_matches
 from langchain.tools import tool
 from pydantic import BaseModel, Field
-from typing import List, Dict
+from typing import List, Dict, Optional, Union
+
+# Shared data-access modules live in analysis/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from dataset_cache import get_dataset  # noqa: E402
+from monthly_rollup import get_rollup_index  # noqa: E402
+from product_matcher import get_matcher  # noqa: E402
+from trend_classifier import classify_monthly_sales  # noqa: E402
+from trend_results import TREND_SORT_COLUMNS, query_trends  # noqa: E402
 
 # ------------------ DATABASE MAPPING ------------------
 DATABASES = {
@@ -44,29 +53,21 @@ def load_product_list(db_name: str) -> List[str]:
     if db_name not in DATABASES:
         raise ValueError(f"Invalid DB: {db_name}")
     
-    df = pd.read_excel(DATABASES[db_name])
-    df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_")
-    return sorted(df["product"].dropna().astype(str).str.strip().unique())
+    df = get_dataset(DATABASES[db_name])
+    return sorted(df["product"].dropna().unique())
 
 # ------------------ TOOL 4: validate_product_name ------------------
 class ValidateProductNameInput(BaseModel):
     product_name: str = Field(..., description="The product name to validate")
-    product_list: List[str] = Field(..., description="The list of valid product names")
+    db_name: str = Field(..., description="The database whose catalog to search")
 
 @tool(args_schema=ValidateProductNameInput)
-def validate_product_name(product_name: str, product_list: List[str]) -> Dict:
-    """Validates or suggests closest product name match."""
-    product_name = product_name.strip().lower()
-    clean_list = [p.lower() for p in product_list]
-
-    if product_name in clean_list:
-        return {"status": "valid", "product_name": product_list[clean_list.index(product_name)]}
+def validate_product_name(product_name: str, db_name: str) -> Dict:
+    """Validates or suggests the closest product name matches (with scores) in the given database."""
+    if db_name not in DATABASES:
+        raise ValueError(f"Invalid DB: {db_name}")
 
-    matches = get_close_matches(product_name, clean_list, n=1, cutoff=0.6)
-    if matches:
-        return {"status": "suggest", "suggestion": product_list[clean_list.index(matches[0])]}
-
-    return {"status": "invalid", "suggestion": None}
+    return get_matcher(DATABASES[db_name]).match(product_name)
 
 # ------------------ TOOL 5: get_monthly_sales ------------------
 class GetMonthlySalesInput(BaseModel):
@@ -79,22 +80,8 @@ def get_monthly_sales(db_name: str, product_name: str) -> Dict[str, int]:
     if db_name not in DATABASES:
         raise ValueError(f"Invalid DB: {db_name}")
     
-    df = pd.read_excel(DATABASES[db_name])
-    df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_")
-
-    if not all(col in df.columns for col in ["product", "date", "total_orders"]):
-        raise ValueError("Missing required columns.")
-
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    df = df.dropna(subset=["date"])
-
-    df_filtered = df[df["product"].str.lower().str.strip() == product_name.lower().strip()]
-    if df_filtered.empty:
-        return {}
-
-    df_filtered["month"] = df_filtered["date"].dt.strftime("%B %Y")
-    monthly_sales = df_filtered.groupby("month")["total_orders"].sum().to_dict()
-    return dict(sorted(monthly_sales.items(), key=lambda x: pd.to_datetime(x[0])))
+    # Monthly totals are precomputed once per dataset version; this is a per-product lookup
+    return get_rollup_index(DATABASES[db_name]).lookup(product_name)
 
 # ------------------ TOOL 6: summarize_trend ------------------
 class SummarizeTrendInput(BaseModel):
@@ -103,22 +90,43 @@ class SummarizeTrendInput(BaseModel):
 
 @tool(args_schema=SummarizeTrendInput)
 def summarize_trend(product_name: str, monthly_sales: Dict[str, int]) -> str:
-    """Generates a trend analysis prompt based on monthly sales."""
+    """Classifies the trend locally and returns a prompt asking the LLM only to explain it."""
+    stats = classify_monthly_sales(monthly_sales)
     sales_lines = "\n".join([f"{month}: {value}" for month, value in monthly_sales.items()])
     prompt = f"""
 The following is the monthly sales data for the product '{product_name}':
 
 {sales_lines}
 
-Based on this pattern, classify the product as one of the following:
-- Growing
-- Decaying
-- Flat
-- Obsolete
-- Seasonal
-- Volatile
+A statistical check classified it as: {stats['category']}
+(slope {stats['slope']} orders/day, R² {stats['r_squared']}, recent monthly average {stats['recent_avg_sales']},
+seasonality {stats['seasonality']}, volatility {stats['volatility']}).
 
-Then explain your reasoning in 2–3 sentences.
+State this classification, then explain it in 2–3 sentences.
 """.strip()
     return prompt
 
+# ------------------ TOOL 7: list_trends ------------------
+class ListTrendsInput(BaseModel):
+    db_name: Optional[str] = Field(None, description="Database to search (all databases if omitted)")
+    category: Optional[str] = Field(None, description="Growing, Decaying, Seasonal, Volatile, Flat, Obsolete or Unclassified")
+    sort_by: str = Field("slope", description=f"Column to sort by: {', '.join(TREND_SORT_COLUMNS)}")
+    ascending: bool = Field(True, description="Sort ascending (steepest decline first for slope)")
+    limit: int = Field(20, description="Maximum number of products to return")
+
+@tool(args_schema=ListTrendsInput)
+def list_trends(db_name: Optional[str] = None, category: Optional[str] = None, sort_by: str = "slope",
+                ascending: bool = True, limit: int = 20) -> Union[List[Dict], str]:
+    """Lists products from the precomputed trend table, filtered by database and category."""
+    if db_name is not None and db_name not in DATABASES:
+        return f"❌ Invalid DB: {db_name}. Valid databases: {', '.join(DATABASES)}"
+
+    try:
+        table = query_trends(DATABASES, database=db_name, category=category, sort_by=sort_by,
+                             ascending=ascending, limit=limit)
+    except ValueError as e:  # bad sort_by: tell the model rather than end the run
+        return f"❌ {e}"
+    columns = ["database", "product", "category", "slope", "r_squared", "recent_avg_sales", "classified_at"]
+    table = table[columns].assign(product=table["product"].astype(str),
+                                  classified_at=table["classified_at"].astype(str))
+    return table.to_dict(orient="records")
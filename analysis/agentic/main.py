@@ -1,9 +1,64 @@
-from agent_manager import detect_intent
-from trend_agent import TrendAnalysisAgent
+import os
+import argparse
+from agent_manager import route_intent, get_intent_router
+from agent_registry import AgentRegistry
+from tracing import configure_tracing, span, OTLP_ENDPOINT  # analysis/ is on sys.path via agent_manager
 # from forecasting_agent import ForecastingAgent  # For future use
 # from bundling_agent import ProductBundlingAgent  # For future use
 
-def main():
+# ------------------ AGENT REGISTRY ------------------
+def _build_trend_agent():
+    # Pulls in the pandas-heavy tool modules; normally done by the background warm-up
+    from trend_agent import TrendAnalysisAgent
+    return TrendAnalysisAgent()
+
+
+def _warm_trend_data():
+    """Loads every available trend dataset with its product matcher and monthly rollup index."""
+    import trend_fast_path  # noqa: F401
+    from trend_analysis_tool import DATABASES
+    from monthly_rollup import get_rollup_index  # analysis/ is on sys.path via trend_analysis_tool
+    from product_matcher import get_matcher
+
+    for path in DATABASES.values():
+        if os.path.exists(path):
+            get_matcher(path)
+            get_rollup_index(path)
+
+
+class _StreamPrinter:
+    """on_delta callback: prints streamed text on one line after a prefix."""
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self.started = False
+
+    def __call__(self, piece: str):
+        print(piece if self.started else f"{self.prefix}{piece}", end="", flush=True)
+        self.started = True
+
+    def finish(self):
+        if self.started:
+            print()
+
+
+def build_registry() -> AgentRegistry:
+    registry = AgentRegistry()
+    registry.add_warmup("intent_router", get_intent_router)
+    registry.register("trend_analysis", _build_trend_agent, warmup=_warm_trend_data)
+    return registry
+
+
+def main(warmup: bool = True, verbose: bool = False):
+    """
+    :param warmup: Prepare the router, agents and datasets in the background
+                   while waiting for the first message (otherwise on first use)
+    :param verbose: Print routing and agent registry statistics on exit
+    """
+    registry = build_registry()
+    if warmup:
+        registry.start_warmup()
+
     print("👋 Welcome to the Gemini Assistant!")
     print("You can ask about trend analysis, forecasting, product bundling, and more.")
     print("Type 'exit' to quit.\n")
@@ -11,17 +66,35 @@ def main():
     while True:
         user_input = input("You: ").strip()
         if user_input.lower() in ["exit", "quit"]:
+            if verbose:
+                print(f"🔧 Intent routing: {get_intent_router().stats()}")
+                print(f"🔧 Agents: {registry.stats()}")
             print("👋 Goodbye!")
             break
 
-        # Step 1: Use Gemini to detect intent
-        intent = detect_intent(user_input)
-        print(f"🔍 Detected intent: {intent}")
+        answer = None
+        with span("turn", agent="main") as turn:
+            # Step 1: Detect intent locally (Gemini only when the router is unsure)
+            intent = route_intent(user_input)
+            print(f"🔍 Detected intent: {intent}")
+            turn.set(intent=intent)
+
+            # Plain "trend for <product> in <db>" questions need a single Gemini call
+            if intent == "trend_analysis":
+                from trend_fast_path import answer_trend_question
+                printer = _StreamPrinter("📈 ")  # the summary is printed as Gemini streams it
+                answer = answer_trend_question(user_input, on_delta=printer)
+                printer.finish()
+                turn.set(fast_path=answer["status"])
+                if answer["status"] == "answered":
+                    continue
+                if not printer.started:
+                    print(f"🤔 {answer['message']}")  # what is missing or a suggestion
 
-        # Step 2: Route to the correct intent agent
+        # Step 2: Route to the correct intent agent (its own turns are traced separately)
         if intent == "trend_analysis":
-            agent = TrendAnalysisAgent()
-            agent.chat.add_user_message(user_input)  # seed the conversation
+            agent = registry.start_conversation("trend_analysis")
+            agent.seed(user_input, answer)  # continues from what the fast path resolved
             agent.run()
 
         elif intent == "forecasting":
@@ -38,4 +111,12 @@ def main():
             print("   'Show me the trend for product cap in eon'")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Interactive Gemini assistant")
+    parser.add_argument("--no-warmup", action="store_true", help="Load agents and datasets on first use instead")
+    parser.add_argument("--verbose", action="store_true", help="Print routing and agent registry statistics on exit")
+    parser.add_argument("--trace", metavar="FILE", help="Append per-stage spans to FILE as JSON lines")
+    parser.add_argument("--otlp", nargs="?", const=OTLP_ENDPOINT, metavar="URL",
+                        help=f"Send spans to an OpenTelemetry collector (default {OTLP_ENDPOINT})")
+    args = parser.parse_args()
+    configure_tracing(jsonl_path=args.trace, otlp_endpoint=args.otlp)
+    main(warmup=not args.no_warmup, verbose=args.verbose)
@@ -0,0 +1,270 @@
+import re
+import json
+import time
+import copy
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from gemini_transport import get_transport, chunk_parts
+from tracing import span  # analysis/ is on sys.path via gemini_transport
+
+# ------------------ CACHE CONFIG ------------------
+RESPONSE_CACHE_PATH = "gemini_response_cache.sqlite"
+RESPONSE_CACHE_TTL = 24 * 3600  # seconds
+RESPONSE_CACHE_MAX_ENTRIES = 5000
+SEMANTIC_THRESHOLD = 0.95  # cosine similarity needed for a near-duplicate hit
+EMBEDDING_MODEL = "text-embedding-004"
+TOUCH_BATCH = 64  # hits whose last_used updates are written to SQLite together
+
+
+# ------------------ KEYS ------------------
+def _normalize_text(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _normalize_body(body: dict) -> dict:
+    """Copy of a request body with every text part whitespace-normalized."""
+    body = json.loads(json.dumps(body))
+    for content in body.get("contents", []):
+        for part in content.get("parts", []):
+            if "text" in part:
+                part["text"] = _normalize_text(part["text"])
+    return body
+
+
+def _model_from_url(url: str) -> str:
+    """models/<name>:generateContent?key=... -> <name> (the API key is never part of a key)."""
+    match = re.search(r"models/([^:/?]+)", url)
+    return match.group(1) if match else url.split("?")[0]
+
+
+def request_keys(url: str, body: dict):
+    """
+    Returns (key, scope, prompt_text) for a request.
+    key: exact match on normalized prompt + model + tools/generation config.
+    scope: model + config only; near-duplicate matching never crosses scopes.
+    """
+    body = _normalize_body(body)
+    contents = body.pop("contents", [])
+    scope = hashlib.sha256(json.dumps([_model_from_url(url), body], sort_keys=True).encode()).hexdigest()
+    key = hashlib.sha256(json.dumps([scope, contents], sort_keys=True).encode()).hexdigest()
+    prompt_text = "\n".join(part["text"] for c in contents for part in c.get("parts", []) if "text" in part)
+    return key, scope, prompt_text
+
+
+def is_cacheable(response: dict) -> bool:
+    """
+    True for responses with text or a function call. Safety-blocked or empty
+    responses (no candidates / parts) are not stored: serving them again would
+    keep failing until the TTL expired.
+    """
+    return any(part.get("text") or "functionCall" in part for part in chunk_parts(response))
+
+
+# ------------------ RESPONSE CACHE ------------------
+class ResponseCache:
+    """
+    Gemini response cache with an in-memory LRU in front of a SQLite file.
+
+    Exact hits match on the normalized prompt, model and generation config.
+    With an `embed` function (text -> vector), misses fall back to the most
+    similar cached prompt in the same scope if its cosine similarity is at
+    least `threshold`. Entries expire after `ttl` seconds and the table is
+    bounded to `max_entries`, least-recently-used evicted first. Hits record
+    their last_used time in memory; those are written every TOUCH_BATCH hits
+    and before each eviction (in put), so a hit costs no SQLite commit.
+    """
+
+    def __init__(
+        self,
+        path=RESPONSE_CACHE_PATH,
+        ttl=RESPONSE_CACHE_TTL,
+        max_entries=RESPONSE_CACHE_MAX_ENTRIES,
+        embed=None,
+        threshold=SEMANTIC_THRESHOLD,
+        memory_entries=512,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.embed = embed
+        self.threshold = threshold
+        self.memory_entries = memory_entries
+        self._memory = OrderedDict()  # key -> (created, response, latency)
+        self._touched = {}  # key -> last hit time, not yet written
+        self._touch_count = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")  # cheap commits for puts and batched last_used updates
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, scope TEXT, prompt TEXT, response TEXT,"
+            " created REAL, last_used REAL, latency REAL, embedding BLOB)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses(last_used)")
+        self._db.commit()
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.skipped = 0  # responses not stored (see is_cacheable)
+        self.latency_saved = 0.0
+
+    # ---- lookups ----
+    def get(self, url: str, body: dict):
+        """Cached response for a request (a copy the caller may modify), or None."""
+        with span("cache.response") as s:
+            response, match = self._lookup(url, body)
+            s.set(cache_hit=response is not None, match=match)
+            return copy.deepcopy(response)
+
+    def _lookup(self, url: str, body: dict):
+        """(response, "exact" | "semantic") or (None, None)."""
+        key, scope, prompt_text = request_keys(url, body)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                row = self._db.execute(
+                    "SELECT created, response, latency FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row:
+                    entry = (row[0], json.loads(row[1]), row[2])
+
+            if entry is not None and now - entry[0] <= self.ttl:
+                self._remember(key, entry)
+                self._touch(key, now)
+                self.hits += 1
+                self.latency_saved += entry[2] or 0.0
+                return entry[1], "exact"
+
+        if self.embed is not None and prompt_text:
+            response = self._semantic_get(scope, prompt_text, now)
+            if response is not None:
+                return response, "semantic"
+
+        with self._lock:
+            self.misses += 1
+        return None, None
+
+    def _semantic_get(self, scope: str, prompt_text: str, now: float):
+        import numpy as np  # semantic matching only; keeps exact-match users from importing numpy
+        query = np.asarray(self.embed(prompt_text), dtype=np.float32)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT key, embedding, response, latency FROM responses"
+                " WHERE scope = ? AND embedding IS NOT NULL AND created >= ?",
+                (scope, now - self.ttl),
+            ).fetchall()
+            if not rows:
+                return None
+            vectors = np.stack([np.frombuffer(row[1], dtype=np.float32) for row in rows])
+            similarity = vectors @ query / (np.linalg.norm(vectors, axis=1) * np.linalg.norm(query) + 1e-12)
+            best = int(np.argmax(similarity))
+            if similarity[best] < self.threshold:
+                return None
+            self._touch(rows[best][0], now)
+            self.hits += 1
+            self.semantic_hits += 1
+            self.latency_saved += rows[best][3] or 0.0
+            return json.loads(rows[best][2])
+
+    # ---- writes ----
+    def put(self, url: str, body: dict, response: dict, latency: float = 0.0):
+        """Stores a response unless it has neither text nor a function call (is_cacheable)."""
+        if not is_cacheable(response):
+            with self._lock:
+                self.skipped += 1
+            return
+        key, scope, prompt_text = request_keys(url, body)
+        embedding = None
+        if self.embed is not None and prompt_text:
+            import numpy as np
+            embedding = np.asarray(self.embed(prompt_text), dtype=np.float32).tobytes()
+
+        now = time.time()
+        payload = json.dumps(response)
+        response = json.loads(payload)  # the memory tier keeps its own copy, not the caller's dict
+        with self._lock:
+            self._flush_touches()  # eviction below orders by last_used
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, scope, prompt_text, payload, now, now, latency, embedding),
+            )
+            self._db.execute(
+                "DELETE FROM responses WHERE created < ? OR key IN ("
+                " SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (now - self.ttl, self.max_entries),
+            )
+            self._db.commit()
+            self._remember(key, (now, response, latency))
+
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _touch(self, key, now):
+        self._touched[key] = now
+        self._touch_count += 1
+        if self._touch_count >= TOUCH_BATCH:
+            self._flush_touches()
+            self._db.commit()
+
+    def _flush_touches(self):
+        """Writes the pending last_used updates (the caller commits)."""
+        if self._touched:
+            self._db.executemany(
+                "UPDATE responses SET last_used = ? WHERE key = ?",
+                [(used, key) for key, used in self._touched.items()],
+            )
+        self._touched.clear()
+        self._touch_count = 0
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._touched.clear()
+            self._touch_count = 0
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            entries = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            return {
+                "entries": entries,
+                "hits": self.hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "skipped": self.skipped,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "latency_saved_s": round(self.latency_saved, 3),
+            }
+
+
+# ------------------ EMBEDDINGS ------------------
+def gemini_embedder(api_key: str, model: str = EMBEDDING_MODEL):
+    """text -> embedding vector via Gemini's embedContent, for semantic matching."""
+    url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:embedContent?key={api_key}"
+
+    def embed(text: str):
+        body = {"model": f"models/{model}", "content": {"parts": [{"text": text}]}}
+        return get_transport().post_json(url, body)["embedding"]["values"]
+
+    return embed
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Process-wide shared response cache (exact matching only)."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache()
+    return _cache
@@ -1,12 +1,16 @@
 from gemini_chat_agent import GeminiChatAgent
-from trend_analysis_tools import (
+from trend_analysis_tool import (
     list_databases,
     validate_database,
     load_product_list,
     validate_product_name,
     get_monthly_sales,
     summarize_trend,
+    list_trends,
+    TREND_SORT_COLUMNS,
 )
+import json
+from tracing import span  # analysis/ is on sys.path via trend_analysis_tool
 
 # ------------------ TOOL SCHEMAS ------------------
 
@@ -40,14 +44,14 @@ trend_analysis_tool_schemas = [
     },
     {
         "name": "validate_product_name",
-        "description": "Checks if product exists and suggests correction if needed.",
+        "description": "Checks if product exists in a database and suggests corrections if needed.",
         "parameters": {
             "type": "object",
             "properties": {
                 "product_name": {"type": "string"},
-                "product_list": {"type": "array", "items": {"type": "string"}}
+                "db_name": {"type": "string", "description": "Database name"}
             },
-            "required": ["product_name", "product_list"]
+            "required": ["product_name", "db_name"]
         }
     },
     {
@@ -76,6 +80,21 @@ trend_analysis_tool_schemas = [
             },
             "required": ["product_name", "monthly_sales"]
         }
+    },
+    {
+        "name": "list_trends",
+        "description": "Lists products from the precomputed trend table, e.g. every Decaying product in a database sorted by slope.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "db_name": {"type": "string", "description": "Database name (all databases if omitted)"},
+                "category": {"type": "string", "enum": ["Growing", "Decaying", "Seasonal", "Volatile", "Flat", "Obsolete", "Unclassified"]},
+                "sort_by": {"type": "string", "enum": TREND_SORT_COLUMNS},
+                "ascending": {"type": "boolean"},
+                "limit": {"type": "integer"}
+            },
+            "required": []
+        }
     }
 ]
 
@@ -88,6 +107,32 @@ class TrendAnalysisAgent:
         self.product_name = None
         self.product_list = []
 
+    def reset(self):
+        """Starts a new conversation: forgets the history and the selected DB / product."""
+        self.chat.memory.clear()
+        self.db_name = None
+        self.product_name = None
+        self.product_list = []
+
+    def seed(self, user_input: str, answer: dict = None):
+        """
+        Opens the conversation with a question the fast path could not finish.
+
+        :param answer: Its answer_trend_question result; the database / product it
+                       resolved are kept and its clarification (e.g. "Did you mean
+                       ...?") joins the history, so a "yes" continues from there
+        """
+        self.chat.add_user_message(user_input)
+        if answer is None:
+            return
+        if answer["db_name"]:
+            self.db_name = answer["db_name"]
+            self.chat.pin(db_name=self.db_name)
+        if answer["product_name"]:
+            self.product_name = answer["product_name"]
+            self.chat.pin(product_name=self.product_name)
+        self.chat.add_agent_message(answer["message"])
+
     def run(self):
         print("📈 Trend Analysis Agent: Hi! I can help you analyze sales trends.")
         while True:
@@ -95,63 +140,90 @@ class TrendAnalysisAgent:
             if user_input.lower() in ["exit", "quit"]:
                 break
 
-            self.chat.add_user_message(user_input)
-            result = self.chat.call()
-
-            if result["type"] == "reply":
-                print(f"🧠 {result['text']}")
-
-            elif result["type"] == "tool_call":
-                tool = result["tool"]
-                args = result["args"]
-
-                if tool == "list_databases":
-                    dbs = list_databases()
-                    print("📂 Available Databases:", ", ".join(dbs))
-
-                elif tool == "validate_database":
-                    outcome = validate_database(args["db_name"])
-                    if outcome["status"] == "valid":
-                        self.db_name = outcome["db_name"]
-                        print(f"✅ Selected DB: {self.db_name}")
-                    elif outcome["status"] == "suggest":
-                        print(f"🤔 Did you mean '{outcome['suggestion']}'?")
-                    else:
-                        print("❌ Invalid DB name.")
-
-                elif tool == "load_product_list":
-                    if not self.db_name:
-                        print("⚠️ Please select a valid database first.")
-                    else:
-                        self.product_list = load_product_list(self.db_name)
-                        print(f"📦 Products in {self.db_name}:", ", ".join(self.product_list[:10]), "...")
-
-                elif tool == "validate_product_name":
-                    result = validate_product_name(args["product_name"], args["product_list"])
-                    if result["status"] == "valid":
-                        self.product_name = result["product_name"]
-                        print(f"✅ Product selected: {self.product_name}")
-                    elif result["status"] == "suggest":
-                        print(f"🤔 Did you mean '{result['suggestion']}'?")
-                    else:
-                        print("❌ Product not found.")
-
-                elif tool == "get_monthly_sales":
-                    if self.db_name and self.product_name:
-                        sales = get_monthly_sales(self.db_name, self.product_name)
-                        print("📊 Monthly Sales:")
-                        for month, total in sales.items():
-                            print(f"   {month}: {total}")
-                        # Now pass back to Gemini for summarization
-                        self.chat.add_user_message(
-                            f"Please summarize the trend for '{self.product_name}' using this sales data: {sales}"
-                        )
+            with span("turn", agent="trend_analysis"):
+                self.chat.add_user_message(user_input)
+                result = self.chat.call()
+
+                if result["type"] == "reply":
+                    print(f"🧠 {result['text']}")
+
+                elif result["type"] == "tool_call":
+                    tool = result["tool"]
+                    args = result["args"]
+
+                    if tool == "list_databases":
+                        dbs = list_databases()
+                        print("📂 Available Databases:", ", ".join(dbs))
+
+                    elif tool == "validate_database":
+                        outcome = validate_database(args["db_name"])
+                        if outcome["status"] == "valid":
+                            self.db_name = outcome["db_name"]
+                            self.chat.pin(db_name=self.db_name)
+                            print(f"✅ Selected DB: {self.db_name}")
+                        elif outcome["status"] == "suggest":
+                            print(f"🤔 Did you mean '{outcome['suggestion']}'?")
+                        else:
+                            print("❌ Invalid DB name.")
+
+                    elif tool == "load_product_list":
+                        if not self.db_name:
+                            print("⚠️ Please select a valid database first.")
+                        else:
+                            self.product_list = load_product_list(self.db_name)
+                            print(f"📦 Products in {self.db_name}:", ", ".join(self.product_list[:10]), "...")
+
+                    elif tool == "validate_product_name":
+                        db_name = args.get("db_name", self.db_name)
+                        if not db_name:
+                            print("⚠️ Please select a valid database first.")
+                            continue
+                        result = validate_product_name(args["product_name"], db_name)
+                        if result["status"] == "valid":
+                            self.product_name = result["product_name"]
+                            self.chat.pin(product_name=self.product_name)
+                            print(f"✅ Product selected: {self.product_name}")
+                        elif result["status"] == "suggest":
+                            print(f"🤔 Did you mean '{result['suggestion']}'?")
+                        else:
+                            print("❌ Product not found.")
+
+                    elif tool == "get_monthly_sales":
+                        if self.db_name and self.product_name:
+                            sales = get_monthly_sales(self.db_name, self.product_name)
+                            print("📊 Monthly Sales:")
+                            for month, total in sales.items():
+                                print(f"   {month}: {total}")
+                            # Now pass back to Gemini for summarization
+                            self.chat.add_user_message(
+                                f"Please summarize the trend for '{self.product_name}' using this sales data: {sales}",
+                                tool="get_monthly_sales",
+                            )
+                            result = self.chat.call()
+                            print("📈", result.get("text"))
+                        else:
+                            print("❌ Missing DB or product info.")
+
+                    elif tool == "summarize_trend":
+                        summary = summarize_trend(args["product_name"], args["monthly_sales"])
+                        print("📈 Trend Summary:")
+                        print(summary)
+
+                    elif tool == "list_trends":
+                        try:
+                            rows = list_trends(
+                                db_name=args.get("db_name") or None,
+                                category=args.get("category"),
+                                sort_by=args.get("sort_by", "slope"),
+                                ascending=args.get("ascending", True),
+                                limit=int(args.get("limit", 20)),
+                            )
+                        except (ValueError, TypeError) as e:
+                            print(f"❌ {e}")
+                            self.chat.add_user_message(f"list_trends failed: {e}", tool="list_trends")
+                        else:
+                            print(f"📋 {len(rows)} products from the trend table")
+                            self.chat.add_user_message(f"Trend table results: {json.dumps(rows)}", tool="list_trends")
+                        # Let Gemini answer from the table (or explain the error)
                         result = self.chat.call()
-                        print("📈", result.get("text"))
-                    else:
-                        print("❌ Missing DB or product info.")
-
-                elif tool == "summarize_trend":
-                    summary = summarize_trend(args["product_name"], args["monthly_sales"])
-                    print("📈 Trend Summary:")
-                    print(summary)
+                        print("🧠", result.get("text"))
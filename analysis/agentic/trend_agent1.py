@@ -1,11 +1,13 @@
 from gemini_chat_agent import GeminiChatAgent
-from trend_analysis_tools import (
+from trend_analysis_tool import (
     list_databases,
     validate_database,
     load_product_list,
     validate_product_name,
     get_monthly_sales,
     summarize_trend,
+    list_trends,
+    TREND_SORT_COLUMNS,
 )
 import json
 
@@ -41,14 +43,14 @@ trend_analysis_tool_schemas = [
     },
     {
         "name": "validate_product_name",
-        "description": "Checks if product exists and suggests correction if needed.",
+        "description": "Checks if product exists in a database and suggests corrections if needed.",
         "parameters": {
             "type": "object",
             "properties": {
                 "product_name": {"type": "string"},
-                "product_list": {"type": "array", "items": {"type": "string"}}
+                "db_name": {"type": "string", "description": "Database name"}
             },
-            "required": ["product_name", "product_list"]
+            "required": ["product_name", "db_name"]
         }
     },
     {
@@ -74,6 +76,21 @@ trend_analysis_tool_schemas = [
             },
             "required": ["product_name", "monthly_sales"]
         }
+    },
+    {
+        "name": "list_trends",
+        "description": "Lists products from the precomputed trend table, e.g. every Decaying product in a database sorted by slope.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "db_name": {"type": "string", "description": "Database name (all databases if omitted)"},
+                "category": {"type": "string", "enum": ["Growing", "Decaying", "Seasonal", "Volatile", "Flat", "Obsolete", "Unclassified"]},
+                "sort_by": {"type": "string", "enum": TREND_SORT_COLUMNS},
+                "ascending": {"type": "boolean"},
+                "limit": {"type": "integer"}
+            },
+            "required": []
+        }
     }
 ]
 
@@ -110,13 +127,14 @@ class TrendAnalysisAgent:
                 if tool == "list_databases":
                     dbs = list_databases()
                     print("📂 Available Databases:", ", ".join(dbs))
-                    self.chat.add_user_message(f"Available databases: {', '.join(dbs)}")
+                    self.chat.add_user_message(f"Available databases: {', '.join(dbs)}", tool="list_databases")
 
                 elif tool == "validate_database":
                     db_name = args.get("db_name", "")
                     outcome = validate_database(db_name)
                     if outcome["status"] == "valid":
                         self.db_name = outcome["db_name"]
+                        self.chat.pin(db_name=self.db_name)
                         print(f"✅ Selected DB: {self.db_name}")
                         self.chat.add_user_message(f"Database '{self.db_name}' is valid and selected.")
                     elif outcome["status"] == "suggest":
@@ -134,19 +152,21 @@ class TrendAnalysisAgent:
                     else:
                         self.product_list = load_product_list(db_name)
                         print(f"📦 Products in {db_name}:", ", ".join(self.product_list[:10]), "...")
-                        self.chat.add_user_message(f"Products available in {db_name}: {', '.join(self.product_list[:20])}")
+                        self.chat.add_user_message(f"Products available in {db_name}: {', '.join(self.product_list[:20])}", tool="load_product_list")
 
                 elif tool == "validate_product_name":
                     product_name = args.get("product_name", "")
-                    product_list = args.get("product_list", self.product_list)
-                    
-                    if not product_list and self.db_name:
-                        self.product_list = load_product_list(self.db_name)
-                        product_list = self.product_list
-                    
-                    result = validate_product_name(product_name, product_list)
+                    db_name = args.get("db_name", self.db_name)
+
+                    if not db_name:
+                        print("⚠️ Please select a valid database first.")
+                        self.chat.add_user_message("No database selected. Please select a valid database first.")
+                        continue
+
+                    result = validate_product_name(product_name, db_name)
                     if result["status"] == "valid":
                         self.product_name = result["product_name"]
+                        self.chat.pin(product_name=self.product_name)
                         print(f"✅ Product selected: {self.product_name}")
                         self.chat.add_user_message(f"Product '{self.product_name}' is valid and selected.")
                     elif result["status"] == "suggest":
@@ -176,7 +196,8 @@ class TrendAnalysisAgent:
                         
                         sales_json = json.dumps(sales)
                         self.chat.add_user_message(
-                            f"Monthly sales data for '{product_name}': {sales_json}. Please summarize the trend."
+                            f"Monthly sales data for '{product_name}': {sales_json}. Please summarize the trend.",
+                            tool="get_monthly_sales",
                         )
 
                         # ✅ This was missing before
@@ -207,7 +228,23 @@ class TrendAnalysisAgent:
                         summary = summarize_trend(product_name, monthly_sales)
                         print("📈 Trend Summary:")
                         print(summary)
-                        self.chat.add_user_message(f"Trend summary for {product_name}: {summary}")
+                        self.chat.add_user_message(f"Trend summary for {product_name}: {summary}", tool="summarize_trend")
+
+                elif tool == "list_trends":
+                    try:
+                        rows = list_trends(
+                            db_name=args.get("db_name") or None,
+                            category=args.get("category"),
+                            sort_by=args.get("sort_by", "slope"),
+                            ascending=args.get("ascending", True),
+                            limit=int(args.get("limit", 20)),
+                        )
+                    except (ValueError, TypeError) as e:
+                        print(f"❌ {e}")
+                        self.chat.add_user_message(f"list_trends failed: {e}", tool="list_trends")
+                    else:
+                        print(f"📋 {len(rows)} products from the trend table")
+                        self.chat.add_user_message(f"Trend table results: {json.dumps(rows)}", tool="list_trends")
 
             elif result["type"] == "error":
                 print(f"❌ Error: {result['text']}")
@@ -1,12 +1,17 @@
 from gemini_chat_agent import GeminiChatAgent
-from trend_analysis_tools import (
+from agent_manager import get_intent_router
+from trend_fast_path import answer_trend_question
+from trend_analysis_tool import (
     list_databases,
     validate_database,
     load_product_list,
     validate_product_name,
     get_monthly_sales,
     summarize_trend,
+    list_trends,
+    TREND_SORT_COLUMNS,
 )
+from tracing import span  # analysis/ is on sys.path via trend_analysis_tool
 import json
 
 
@@ -14,9 +19,10 @@ trend_analysis_tool_schemas = [
     {"name": "list_databases", "description": "Returns the list of valid databases available for analysis.", "parameters": {"type": "object", "properties": {}, "required": []}},
     {"name": "validate_database", "description": "Validates the database name. Suggests correction if invalid.", "parameters": {"type": "object", "properties": {"db_name": {"type": "string"}}, "required": ["db_name"]}},
     {"name": "load_product_list", "description": "Loads list of products from a given database.", "parameters": {"type": "object", "properties": {"db_name": {"type": "string"}}, "required": ["db_name"]}},
-    {"name": "validate_product_name", "description": "Checks if product exists and suggests correction if needed.", "parameters": {"type": "object", "properties": {"product_name": {"type": "string"}, "product_list": {"type": "array", "items": {"type": "string"}}}, "required": ["product_name", "product_list"]}},
+    {"name": "validate_product_name", "description": "Checks if product exists in a database and suggests corrections if needed.", "parameters": {"type": "object", "properties": {"product_name": {"type": "string"}, "db_name": {"type": "string"}}, "required": ["product_name", "db_name"]}},
     {"name": "get_monthly_sales", "description": "Aggregates daily sales to monthly sales for a product in a database.", "parameters": {"type": "object", "properties": {"db_name": {"type": "string"}, "product_name": {"type": "string"}}, "required": ["db_name", "product_name"]}},
-    {"name": "summarize_trend", "description": "Analyzes monthly sales and returns a classification of the trend.", "parameters": {"type": "object", "properties": {"product_name": {"type": "string"}, "monthly_sales": {"type": "string"}}, "required": ["product_name", "monthly_sales"]}}
+    {"name": "summarize_trend", "description": "Analyzes monthly sales and returns a classification of the trend.", "parameters": {"type": "object", "properties": {"product_name": {"type": "string"}, "monthly_sales": {"type": "string"}}, "required": ["product_name", "monthly_sales"]}},
+    {"name": "list_trends", "description": "Lists products from the precomputed trend table, e.g. every Decaying product in a database sorted by slope.", "parameters": {"type": "object", "properties": {"db_name": {"type": "string"}, "category": {"type": "string", "enum": ["Growing", "Decaying", "Seasonal", "Volatile", "Flat", "Obsolete", "Unclassified"]}, "sort_by": {"type": "string", "enum": TREND_SORT_COLUMNS}, "ascending": {"type": "boolean"}, "limit": {"type": "integer"}}, "required": []}}
 ]
 
 
@@ -35,24 +41,79 @@ class TrendAnalysisAgent:
             if user_input.lower() in ["exit", "quit"]:
                 break
 
-            self.chat.add_user_message(user_input)
-            result = self.chat.call()
+            with span("turn", agent="trend_analysis"):
+                self._turn(user_input)
 
-            if result["type"] == "reply":
-                print(f"🧠 {result['text']}")
-            elif result["type"] == "tool_call":
-                print(f"[DEBUG] Calling tool: {result['tool']}({result['args']})")
-                self._handle_tool(result["tool"], result["args"])
-                self._continue_until_reply()
-            else:
-                print("❓ Unrecognized result type.")
+    def _turn(self, user_input: str):
+        started = []
+
+        def show(piece):  # the fast-path summary is printed as it streams
+            print(piece if started else f"🧠 {piece}", end="", flush=True)
+            started.append(True)
+
+        answer = self.fast_answer(user_input, on_delta=show)
+        if started:
+            print()
+        if answer is not None:
+            return
+
+        self.chat.add_user_message(user_input)
+        result = self._call()  # a reply is printed while it streams
+
+        if result["type"] == "tool_call":
+            print(f"[DEBUG] Calling tool: {result['tool']}({result['args']})")
+            self._handle_tool(result["tool"], result["args"])
+            self._continue_until_reply()
+        elif result["type"] != "reply":
+            print("❓ Unrecognized result type.")
+
+    def fast_answer(self, user_input: str, on_delta=None):
+        """
+        Answers a plain trend question with one summarization call instead of the
+        tool-calling loop. Returns the reply text, or None to fall back to the loop.
+
+        :param on_delta: Called with each piece of the reply as it streams
+        """
+        if not self._fast_path_applies(user_input):
+            return None
+        answer = answer_trend_question(user_input, self.db_name, self.product_name, on_delta=on_delta)
+        return self._keep_fast_answer(user_input, answer)
+
+    def _fast_path_applies(self, user_input: str) -> bool:
+        intent, _, _ = get_intent_router().classify_local(user_input)
+        return intent == "trend_analysis"
+
+    def _keep_fast_answer(self, user_input: str, answer: dict):
+        """Records an answered fast-path question in the conversation; returns its text (None if unanswered)."""
+        if answer["status"] != "answered":
+            return None
+
+        self.db_name, self.product_name = answer["db_name"], answer["product_name"]
+        self.chat.pin(db_name=self.db_name, product_name=self.product_name)
+        self.chat.add_user_message(user_input)
+        self.chat.add_user_message(
+            f"Monthly sales data for '{self.product_name}': {json.dumps(answer['monthly_sales'])}.",
+            tool="get_monthly_sales",
+        )
+        self.chat.add_agent_message(answer["summary"])
+        return answer["summary"]
+
+    def _call(self):
+        """One streamed Gemini call; reply text is printed as it arrives. Returns the final result."""
+        started = False
+        for event in self.chat.stream():
+            if event["type"] != "delta":
+                if started:
+                    print()
+                return event
+            print(event["text"] if started else f"🧠 {event['text']}", end="", flush=True)
+            started = True
 
     def _continue_until_reply(self, max_loops=5):
         for _ in range(max_loops):
-            result = self.chat.call()
+            result = self._call()
             print(f"[DEBUG] Chained call type: {result['type']}")
             if result["type"] == "reply":
-                print(f"🧠 {result['text']}")
                 break
             elif result["type"] == "tool_call":
                 print(f"[DEBUG] Chained tool: {result['tool']}({result['args']})")
@@ -61,53 +122,62 @@ class TrendAnalysisAgent:
                 print("⚠️ Unexpected result type.")
                 break
 
-    def _handle_tool(self, tool, args):
+    def _handle_tool(self, tool, args, reply=None):
+        """
+        Runs one tool call and reports its outcome to the model.
+
+        :param reply: Receives the outcome messages (message, tool=None) instead of
+                      the chat history, e.g. to append concurrent calls in order
+        """
+        reply = reply or self.chat.add_user_message
         if tool == "list_databases":
             dbs = list_databases()
             print("📂 Available Databases:", ", ".join(dbs))
-            self.chat.add_user_message(f"Available databases: {', '.join(dbs)}")
+            reply(f"Available databases: {', '.join(dbs)}", tool="list_databases")
 
         elif tool == "validate_database":
             db_name = args.get("db_name", "")
             outcome = validate_database(db_name)
             if outcome["status"] == "valid":
                 self.db_name = outcome["db_name"]
+                self.chat.pin(db_name=self.db_name)
                 print(f"✅ Selected DB: {self.db_name}")
-                self.chat.add_user_message(f"Database '{self.db_name}' is valid and selected.")
+                reply(f"Database '{self.db_name}' is valid and selected.")
             elif outcome["status"] == "suggest":
                 print(f"🤔 Did you mean '{outcome['suggestion']}'?")
-                self.chat.add_user_message(f"Database '{db_name}' not found. Did you mean '{outcome['suggestion']}'?")
+                reply(f"Database '{db_name}' not found. Did you mean '{outcome['suggestion']}'?")
             else:
                 print("❌ Invalid DB name.")
-                self.chat.add_user_message(f"Database '{db_name}' not found. Please try another database.")
+                reply(f"Database '{db_name}' not found. Please try another database.")
 
         elif tool == "load_product_list":
             db_name = args.get("db_name", self.db_name)
             if not db_name:
                 print("⚠️ Please select a valid database first.")
-                self.chat.add_user_message("No database selected.")
+                reply("No database selected.")
             else:
                 self.product_list = load_product_list(db_name)
                 print(f"📦 Products in {db_name}:", ", ".join(self.product_list[:10]), "...")
-                self.chat.add_user_message(f"Products available: {', '.join(self.product_list[:20])}")
+                reply(f"Products available: {', '.join(self.product_list[:20])}", tool="load_product_list")
 
         elif tool == "validate_product_name":
             product_name = args.get("product_name", "")
-            product_list = args.get("product_list", self.product_list)
-            if not product_list and self.db_name:
-                self.product_list = load_product_list(self.db_name)
-                product_list = self.product_list
-            result = validate_product_name(product_name, product_list)
+            db_name = args.get("db_name", self.db_name)
+            if not db_name:
+                reply("No database selected.")
+                return
+            result = validate_product_name(product_name, db_name)
             if result["status"] == "valid":
                 self.product_name = result["product_name"]
+                self.chat.pin(product_name=self.product_name)
                 print(f"✅ Product selected: {self.product_name}")
-                self.chat.add_user_message(f"Product '{self.product_name}' is valid and selected.")
+                reply(f"Product '{self.product_name}' is valid and selected.")
             elif result["status"] == "suggest":
                 print(f"🤔 Did you mean '{result['suggestion']}'?")
-                self.chat.add_user_message(f"Product '{product_name}' not found. Did you mean '{result['suggestion']}'?")
+                reply(f"Product '{product_name}' not found. Did you mean '{result['suggestion']}'?")
             else:
                 print("❌ Product not found.")
-                self.chat.add_user_message(f"Product '{product_name}' not found in the database.")
+                reply(f"Product '{product_name}' not found in the database.")
 
         elif tool == "get_monthly_sales":
             db_name = args.get("db_name", self.db_name)
@@ -116,15 +186,16 @@ class TrendAnalysisAgent:
                 missing = []
                 if not db_name: missing.append("database")
                 if not product_name: missing.append("product")
-                self.chat.add_user_message(f"Missing {' and '.join(missing)} info.")
+                reply(f"Missing {' and '.join(missing)} info.")
             else:
                 print(f"[DEBUG] Getting monthly sales for {product_name} in {db_name}")
                 sales = get_monthly_sales(db_name, product_name)
                 for month, total in sales.items():
                     print(f"   {month}: {total}")
                 sales_json = json.dumps(sales)
-                self.chat.add_user_message(
-                    f"Monthly sales data for '{product_name}': {sales_json}. Please summarize the trend."
+                reply(
+                    f"Monthly sales data for '{product_name}': {sales_json}. Please summarize the trend.",
+                    tool="get_monthly_sales",
                 )
 
         elif tool == "summarize_trend":
@@ -139,4 +210,21 @@ class TrendAnalysisAgent:
             summary = summarize_trend(product_name, monthly_sales)
             print("📈 Trend Summary:")
             print(summary)
-            self.chat.add_user_message(f"Trend summary for {product_name}: {summary}")
+            reply(f"Trend summary for {product_name}: {summary}", tool="summarize_trend")
+
+        elif tool == "list_trends":
+            db_name = args.get("db_name") or None
+            try:
+                rows = list_trends(
+                    db_name=db_name,
+                    category=args.get("category"),
+                    sort_by=args.get("sort_by", "slope"),
+                    ascending=args.get("ascending", True),
+                    limit=int(args.get("limit", 20)),
+                )
+            except (ValueError, TypeError) as e:
+                print(f"❌ {e}")
+                reply(f"list_trends failed: {e}", tool="list_trends")
+                return
+            print(f"📋 {len(rows)} products from the trend table")
+            reply(f"Trend table results: {json.dumps(rows)}", tool="list_trends")
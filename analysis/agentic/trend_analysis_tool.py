@@ -1,6 +1,17 @@
-import pandas as pd
+import os
+import sys
+import json
 from difflib import get_close_matches
-from gemini_client import call_gemini  # used for summarization prompt
+from gemini_client import call_gemini, acall_gemini, stream_gemini  # used for summarization prompt
+
+# Shared data-access modules live in analysis/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dataset_cache import get_dataset  # noqa: E402
+from monthly_rollup import get_rollup_index  # noqa: E402
+from product_matcher import get_matcher  # noqa: E402
+from trend_classifier import classify_monthly_sales  # noqa: E402
+from trend_results import TREND_SORT_COLUMNS, query_trends, run_trend_batch  # noqa: E402
+from tracing import span, traced  # noqa: E402
 
 # ------------------ DATABASE MAPPING ------------------
 DATABASES = {
@@ -10,11 +21,13 @@ DATABASES = {
 }
 
 # ------------------ TOOL 1: list_databases ------------------
+@traced("tool.list_databases")
 def list_databases() -> list:
     """Returns the list of available database names."""
     return list(DATABASES.keys())
 
 # ------------------ TOOL 2: validate_database ------------------
+@traced("tool.validate_database", record_size=False)
 def validate_database(db_name: str) -> dict:
     """Validates DB name. Returns 'valid', 'suggest', or 'invalid'."""
     db_name = db_name.lower().strip()
@@ -28,75 +41,138 @@ def validate_database(db_name: str) -> dict:
     return {"status": "invalid", "suggestion": None}
 
 # ------------------ TOOL 3: load_product_list ------------------
+@traced("tool.load_product_list")
 def load_product_list(db_name: str) -> list:
     """Loads all unique product names from the Excel file mapped to the given DB."""
     if db_name not in DATABASES:
         raise ValueError(f"Invalid DB: {db_name}")
 
-    df = pd.read_excel(DATABASES[db_name])
-    df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_")
-
-    return sorted(df["product"].dropna().astype(str).str.strip().unique())
+    df = get_dataset(DATABASES[db_name])
+    return sorted(df["product"].dropna().unique())
 
 # ------------------ TOOL 4: validate_product_name ------------------
-def validate_product_name(product_name: str, product_list: list) -> dict:
-    """Validates or suggests closest match for product name."""
-    product_name = product_name.strip().lower()
-    clean_list = [p.lower() for p in product_list]
-
-    if product_name in clean_list:
-        return {"status": "valid", "product_name": product_list[clean_list.index(product_name)]}
+@traced("tool.validate_product_name", record_size=False)
+def validate_product_name(product_name: str, db_name: str) -> dict:
+    """
+    Validates or suggests closest matches for a product name in the given DB,
+    using the prebuilt matcher index (no product list needs to be passed in).
+    """
+    if db_name not in DATABASES:
+        raise ValueError(f"Invalid DB: {db_name}")
 
-    matches = get_close_matches(product_name, clean_list, n=1, cutoff=0.6)
-    if matches:
-        return {"status": "suggest", "suggestion": product_list[clean_list.index(matches[0])]}
-    
-    return {"status": "invalid", "suggestion": None}
+    return get_matcher(DATABASES[db_name]).match(product_name)
 
 # ------------------ TOOL 5: get_monthly_sales ------------------
+@traced("tool.get_monthly_sales")
 def get_monthly_sales(db_name: str, product_name: str) -> dict:
     """Aggregates daily sales into monthly totals for the given product."""
     if db_name not in DATABASES:
         raise ValueError(f"Invalid DB: {db_name}")
     
-    df = pd.read_excel(DATABASES[db_name])
-    df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_")
+    # Monthly totals are precomputed once per dataset version; this is a per-product lookup
+    return get_rollup_index(DATABASES[db_name]).lookup(product_name)
 
-    if not all(col in df.columns for col in ["product", "date", "total_orders"]):
-        raise ValueError("Missing one or more required columns.")
-
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    df = df.dropna(subset=["date"])
-
-    df_filtered = df[df["product"].str.lower().str.strip() == product_name.lower().strip()]
-    if df_filtered.empty:
-        return {}
+# ------------------ TOOL 6: summarize_trend ------------------
+def _parse_sales(monthly_sales):
+    if isinstance(monthly_sales, str):  # tool-call args arrive as a JSON string
+        try:
+            monthly_sales = json.loads(monthly_sales)
+        except json.JSONDecodeError:
+            return None
+    return monthly_sales if isinstance(monthly_sales, dict) else None
 
-    df_filtered["month"] = df_filtered["date"].dt.strftime("%B %Y")
-    monthly_sales = df_filtered.groupby("month")["total_orders"].sum().to_dict()
-    return dict(sorted(monthly_sales.items(), key=lambda x: pd.to_datetime(x[0])))
 
-# ------------------ TOOL 6: summarize_trend ------------------
-def summarize_trend(product_name: str, monthly_sales: dict) -> str:
-    """
-    Sends monthly sales to Gemini for trend classification and explanation.
-    """
+def _summary_prompt(product_name: str, monthly_sales: dict, stats: dict) -> str:
     sales_lines = "\n".join([f"{month}: {value}" for month, value in monthly_sales.items()])
-    prompt = f"""
+    return f"""
 The following is the monthly sales data for the product '{product_name}':
 
 {sales_lines}
 
-Based on this pattern, classify the product as one of the following:
-- Growing
-- Decaying
-- Flat
-- Obsolete
-- Seasonal
-- Volatile
+A statistical check classified it as: {stats['category']}
+(slope {stats['slope']} orders/day, R² {stats['r_squared']}, recent monthly average {stats['recent_avg_sales']},
+seasonality {stats['seasonality']}, volatility {stats['volatility']}).
 
-Then explain your reasoning in 2–3 sentences.
+Explain this classification in 2–3 sentences for a business user.
 """.strip()
 
-    return call_gemini(prompt)
 
+@traced("tool.summarize_trend")
+def summarize_trend(product_name: str, monthly_sales: dict, explain: bool = True) -> str:
+    """
+    Classifies the monthly series locally (trend_classifier) and, if explain is
+    set, asks Gemini only for a short explanation of that label.
+    """
+    monthly_sales = _parse_sales(monthly_sales)
+    if monthly_sales is None:
+        return "❌ monthly_sales must be an object of {month: total}."
+    stats = classify_monthly_sales(monthly_sales)
+    label = stats["category"]
+    if not explain:
+        return label
+
+    return f"{label}: {call_gemini(_summary_prompt(product_name, monthly_sales, stats))}"
+
+
+async def asummarize_trend(product_name: str, monthly_sales: dict, explain: bool = True) -> str:
+    """
+    Non-blocking variant of summarize_trend for asyncio callers: the Gemini
+    explanation goes through the async transport instead of holding a thread.
+    """
+    import asyncio  # only async callers pay for it (already loaded by their event loop)
+
+    with span("tool.summarize_trend", mode="async"):
+        monthly_sales = _parse_sales(monthly_sales)
+        if monthly_sales is None:
+            return "❌ monthly_sales must be an object of {month: total}."
+        stats = await asyncio.to_thread(classify_monthly_sales, monthly_sales)  # pandas work off the loop
+        label = stats["category"]
+        if not explain:
+            return label
+
+        return f"{label}: {await acall_gemini(_summary_prompt(product_name, monthly_sales, stats))}"
+
+
+def stream_trend_summary(product_name: str, monthly_sales: dict):
+    """
+    Streaming variant of summarize_trend for replies shown to the user: yields
+    "<label>: " as soon as the local classification is done, then Gemini's
+    explanation in pieces as it is generated (stream_gemini). The joined
+    pieces equal summarize_trend's result.
+    """
+    monthly_sales = _parse_sales(monthly_sales)
+    if monthly_sales is None:
+        yield "❌ monthly_sales must be an object of {month: total}."
+        return
+    stats = classify_monthly_sales(monthly_sales)
+    yield f"{stats['category']}: "
+    yield from stream_gemini(_summary_prompt(product_name, monthly_sales, stats))
+
+# ------------------ TOOL 7: list_trends ------------------
+@traced("tool.list_trends")
+def list_trends(db_name: str = None, category: str = None, sort_by: str = "slope",
+                ascending: bool = True, limit: int = 20) -> list:
+    """
+    Queries the materialized trend table (see refresh_trend_results), e.g. every
+    Decaying product in telecom sorted by slope. Returns one dict per product;
+    raises ValueError for an unknown db_name or a sort_by outside TREND_SORT_COLUMNS.
+    """
+    if db_name is not None and db_name not in DATABASES:
+        raise ValueError(f"Invalid DB: {db_name}")
+
+    table = query_trends(DATABASES, database=db_name, category=category, sort_by=sort_by,
+                         ascending=ascending, limit=limit)
+    columns = ["database", "product", "category", "slope", "r_squared", "recent_avg_sales", "classified_at"]
+    table = table[columns].assign(product=table["product"].astype(str),
+                                  classified_at=table["classified_at"].astype(str))
+    return table.to_dict(orient="records")
+
+
+def refresh_trend_results(workers: int = None) -> list:
+    """Batch job: classifies every product of every database in parallel (stale tables only)."""
+    return run_trend_batch(DATABASES, workers=workers)
+
+
+if __name__ == "__main__":
+    for summary in refresh_trend_results():
+        print(summary)
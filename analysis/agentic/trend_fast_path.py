@@ -0,0 +1,188 @@
+import re
+import json
+from gemini_client import call_gemini, GEMINI_ERROR
+from trend_analysis_tool import (
+    DATABASES,
+    validate_database,
+    validate_product_name,
+    get_monthly_sales,
+    summarize_trend,
+    asummarize_trend,
+    stream_trend_summary,
+)
+from product_matcher import get_matcher  # analysis/ is on sys.path via trend_analysis_tool
+from tracing import traced
+
+# ------------------ FAST PATH CONFIG ------------------
+MAX_PRODUCT_WORDS = 6  # longest word n-gram tried as an exact product name
+_WORD = re.compile(r"[\w\-./&']+")
+_DB_PHRASE = re.compile(r"\b(?:in|from|on|of|using)\s+(?:the\s+)?([\w\-]+)\s+(?:db|database|data)\b", re.IGNORECASE)
+_PRODUCT_PHRASE = re.compile(
+    r"\b(?:trend|trends|sales|selling|sold|doing|performance)\s+(?:for|of)\s+(?:the\s+)?(?:product\s+)?(.+?)"
+    r"(?:\s+(?:in|from|on|using)\s+(?:the\s+)?[\w\-]+(?:\s+(?:db|database|data))?)?\s*[?.!]*$",
+    re.IGNORECASE,
+)
+
+SLOT_PROMPT = """
+Extract the database and product the user is asking about.
+Databases: {databases}
+Message: {message}
+
+Reply with JSON only: {{"db_name": "<database or null>", "product_name": "<product or null>"}}
+""".strip()
+
+
+# ------------------ SLOT EXTRACTION ------------------
+def _find_database(text: str):
+    """Database named in the message, else (via an "in X db" phrase) a fuzzy suggestion."""
+    lowered = text.lower()
+    for db_name in DATABASES:
+        if re.search(rf"\b{re.escape(db_name)}\b", lowered):
+            return {"status": "valid", "db_name": db_name}
+
+    phrase = _DB_PHRASE.search(text)
+    if phrase:
+        return validate_database(phrase.group(1))
+    return None
+
+
+def _find_product(text: str, db_name: str):
+    """
+    Product in the message for a database: the longest word n-gram that is an exact
+    catalog name, else the matcher's verdict on a "trend for <product>" phrase.
+    """
+    matcher = get_matcher(DATABASES[db_name])
+    words = _WORD.findall(text)
+    for size in range(min(MAX_PRODUCT_WORDS, len(words)), 0, -1):
+        for start in range(len(words) - size + 1):
+            product = matcher.exact(" ".join(words[start:start + size]))
+            if product is not None:
+                return {"status": "valid", "product_name": product}
+
+    phrase = _PRODUCT_PHRASE.search(text.strip())
+    if phrase:
+        return matcher.match(phrase.group(1))
+    return None
+
+
+def _extract_with_llm(text: str) -> dict:
+    """One Gemini call returning {"db_name", "product_name"} (values may be None)."""
+    reply = call_gemini(SLOT_PROMPT.format(databases=", ".join(DATABASES), message=text))
+    match = re.search(r"\{.*\}", reply, re.DOTALL)
+    try:
+        slots = json.loads(match.group(0)) if match else {}
+    except json.JSONDecodeError:
+        slots = {}
+    values = {}
+    for key in ("db_name", "product_name"):
+        value = slots.get(key)
+        value = str(value).strip() if value is not None else ""  # the model may return numbers
+        values[key] = value if value and value.lower() != "null" else None
+    return values
+
+
+@traced("trend.extract_slots", record_size=False)
+def extract_trend_slots(text: str, db_name: str = None, product_name: str = None, use_llm: bool = True) -> dict:
+    """
+    Resolves the database and product for a trend question.
+
+    Known values (e.g. already selected earlier in the session) are kept unless
+    the message names others. Returns {"db": verdict, "product": verdict,
+    "llm_calls": n}, where a verdict is a validate_database /
+    validate_product_name result or None when nothing was found.
+    """
+    llm_calls = 0
+    db = _find_database(text) or ({"status": "valid", "db_name": db_name} if db_name else None)
+    product = _find_product(text, db["db_name"]) if db and db["status"] == "valid" else None
+    if product is None and product_name and db and db.get("db_name") == db_name:
+        product = {"status": "valid", "product_name": product_name}
+
+    if use_llm and (db is None or product is None):
+        slots = _extract_with_llm(text)
+        llm_calls += 1
+        if db is None and slots["db_name"]:
+            db = validate_database(slots["db_name"])
+        if product is None and slots["product_name"] and db and db["status"] == "valid":
+            product = validate_product_name(slots["product_name"], db["db_name"])
+    return {"db": db, "product": product, "llm_calls": llm_calls}
+
+
+# ------------------ ONE-SHOT ANSWER ------------------
+@traced("trend.fast_path", record_size=False)
+def answer_trend_question(text: str, db_name: str = None, product_name: str = None, use_llm: bool = True,
+                          on_delta=None, summarize: bool = True) -> dict:
+    """
+    Answers a trend question without tool choreography: slots are resolved
+    locally (one extraction call at most), checked against the in-memory
+    indexes, and the monthly series goes to a single summarization call.
+
+    Returns {"status", "message", "db_name", "product_name", "monthly_sales",
+    "summary", "llm_calls"}; status is "answered" or, when the question can't
+    be resolved unambiguously, one of "need_db", "suggest_db", "need_product",
+    "suggest_product", "no_data" (message then says what is missing) or
+    "llm_error" when the summarization call failed (message carries the error).
+    The resolved db_name / product_name are returned with every status.
+
+    :param on_delta: Called with each piece of the summary as Gemini streams it
+                     (stream_trend_summary), so it can be shown before it is complete
+    :param summarize: False stops before the summarization call, with status
+                      "resolved" and the monthly series (aanswer_trend_question)
+    """
+    slots = extract_trend_slots(text, db_name, product_name, use_llm=use_llm)
+    db, product = slots["db"], slots["product"]
+    answer = {"db_name": None, "product_name": None, "monthly_sales": {}, "summary": None,
+              "llm_calls": slots["llm_calls"]}
+
+    if db is None or db["status"] == "invalid":
+        return {**answer, "status": "need_db",
+                "message": f"Which database should I use? Available: {', '.join(DATABASES)}."}
+    if db["status"] == "suggest":
+        return {**answer, "status": "suggest_db", "message": f"Did you mean the '{db['suggestion']}' database?"}
+    answer["db_name"] = db["db_name"]
+
+    if product is None or product["status"] == "invalid":
+        return {**answer, "status": "need_product", "message": f"Which product in '{db['db_name']}' should I analyze?"}
+    if product["status"] == "suggest":
+        return {**answer, "status": "suggest_product", "message": f"Did you mean '{product['suggestion']}'?"}
+    answer["product_name"] = product["product_name"]
+
+    monthly_sales = get_monthly_sales(answer["db_name"], answer["product_name"])
+    if not monthly_sales:
+        return {**answer, "status": "no_data",
+                "message": f"No sales found for '{answer['product_name']}' in '{answer['db_name']}'."}
+
+    answer["monthly_sales"] = monthly_sales
+    if not summarize:
+        return {**answer, "status": "resolved", "message": ""}
+
+    if on_delta is None:
+        summary = summarize_trend(answer["product_name"], monthly_sales)
+    else:
+        pieces = []
+        for piece in stream_trend_summary(answer["product_name"], monthly_sales):
+            pieces.append(piece)
+            on_delta(piece)
+        summary = "".join(pieces)
+    return _with_summary(answer, summary)
+
+
+def _with_summary(answer: dict, summary: str) -> dict:
+    answer = {**answer, "llm_calls": answer["llm_calls"] + 1}
+    if GEMINI_ERROR in summary:  # "<label>: ❌ Gemini API Error: ..."
+        return {**answer, "status": "llm_error", "message": summary}
+    return {**answer, "status": "answered", "message": summary, "summary": summary}
+
+
+async def aanswer_trend_question(text: str, db_name: str = None, product_name: str = None,
+                                 use_llm: bool = True) -> dict:
+    """
+    asyncio variant of answer_trend_question (same results): the local lookups
+    run in the default thread pool and the summarization call goes through the
+    async transport.
+    """
+    import asyncio  # only async callers pay for it (already loaded by their event loop)
+
+    answer = await asyncio.to_thread(answer_trend_question, text, db_name, product_name, use_llm, summarize=False)
+    if answer["status"] != "resolved":
+        return answer
+    return _with_summary(answer, await asummarize_trend(answer["product_name"], answer["monthly_sales"]))
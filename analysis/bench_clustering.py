@@ -0,0 +1,75 @@
+import argparse
+import time
+import numpy as np
+from sklearn.metrics import adjusted_rand_score
+from bench_data import make_sales_frame
+from clustering_features import extract_features
+from product_clustering import fit_clusters
+
+# ------------------ BENCHMARK ------------------
+# Segmentation at scale: full-batch KMeans vs. MiniBatchKMeans (in memory and
+# partial_fit over chunks), cold vs. warm-started refits.
+#   python bench_clustering.py --series 300000
+#
+# Feature rows are bootstrapped (with jitter) from a synthetic catalog to
+# simulate SKU x region series. Label stability is the adjusted Rand index
+# (1.0 = identical partition) against full-batch KMeans, and between a run and
+# a refit on the same data plus 5% new series.
+
+def make_features(n_series: int, seed: int = 0):
+    base = extract_features(make_sales_frame(n_products=2000, n_days=365, seed=seed)).drop(columns=["product"])
+    base = base.fillna(0.0)
+    rng = np.random.default_rng(seed)
+    rows = base.iloc[rng.integers(0, len(base), n_series)].reset_index(drop=True)
+    jitter = rng.normal(1.0, 0.05, size=rows.shape)
+    return rows * jitter
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def carried_labels(prev_labels, X, grown):
+    """Labels of the previous run mapped onto the rows of the grown table (identical feature rows)."""
+    lookup = dict(zip(map(tuple, X.to_numpy()), prev_labels))
+    return np.array([lookup[tuple(row)] for row in grown.to_numpy()])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="KMeans vs. MiniBatchKMeans / partial_fit / warm start")
+    parser.add_argument("--series", type=int, default=300000)
+    parser.add_argument("--chunk-rows", type=int, default=50000)
+    args = parser.parse_args()
+
+    X = make_features(args.series)
+    print(f"Feature table: {len(X):,} series x {X.shape[1]} features\n")
+
+    (ref_labels, ref_centers, _), t_ref = timed(lambda: fit_clusters(X, backend="kmeans"))
+    (mb_labels, mb_centers, _), t_mb = timed(lambda: fit_clusters(X, backend="minibatch"))
+    (pf_labels, _, _), t_pf = timed(lambda: fit_clusters(X, backend="minibatch", chunk_rows=args.chunk_rows))
+
+    print(f"{'backend':<48} {'fit':>8} {'ARI vs kmeans':>14}")
+    for label, elapsed, labels in [
+        ("kmeans (current)", t_ref, ref_labels),
+        ("minibatch", t_mb, mb_labels),
+        (f"minibatch partial_fit ({args.chunk_rows:,}-row chunks)", t_pf, pf_labels),
+    ]:
+        print(f"{label:<48} {elapsed:>7.2f}s {adjusted_rand_score(ref_labels, labels):>14.4f}")
+
+    # Refit after 5% more series: do existing series keep their cluster?
+    grown = X.sample(frac=1.05, replace=True, random_state=1).reset_index(drop=True)
+    print(f"\nRefit on {len(grown):,} series (5% resampled on top):")
+    print(f"{'backend':<48} {'fit':>8} {'ARI vs prev':>14}")
+    for backend, prev_labels, prev_centers in [("kmeans", ref_labels, ref_centers), ("minibatch", mb_labels, mb_centers)]:
+        previous = carried_labels(prev_labels, X, grown)
+        for mode, init in [("cold", None), ("warm start", prev_centers)]:
+            (labels, _, _), elapsed = timed(
+                lambda: fit_clusters(grown, backend=backend, init_centers=init, random_state=7)
+            )
+            print(f"{backend + ' ' + mode:<48} {elapsed:>7.2f}s {adjusted_rand_score(previous, labels):>14.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+# ------------------ SYNTHETIC SALES ------------------
+def make_sales_frame(n_products=2000, n_days=365, end_date="2025-04-30", seed=42):
+    """
+    Builds a synthetic daily sales frame shaped like sales.xlsx
+    (date, product, total_orders) with a mix of growing, decaying,
+    seasonal, flat and near-dead products.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(end=pd.to_datetime(end_date), periods=n_days)
+    t = np.arange(n_days)
+
+    base = rng.gamma(2.0, 5.0, size=(n_products, 1))
+    slope = rng.normal(0, 0.02, size=(n_products, 1)) * base
+    season = rng.uniform(0, 0.5, size=(n_products, 1)) * base * np.sin(2 * np.pi * t / 7)
+    level = np.clip(base + slope * t + season, 0, None)
+    dead = rng.random(n_products) < 0.2
+    level[dead] *= 0.05
+
+    orders = rng.poisson(level)
+    products = np.array([f"product_{i:05d}" for i in range(n_products)])
+
+    return pd.DataFrame({
+        "date": np.tile(dates.values, n_products),
+        "product": np.repeat(products, n_days),
+        "total_orders": orders.ravel(),
+    })
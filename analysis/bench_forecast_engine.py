@@ -0,0 +1,47 @@
+import argparse
+import os
+import time
+import logging
+from bench_data import make_sales_frame
+from forecast_engine import run_forecasts
+
+# ------------------ BENCHMARK ------------------
+# Wall-clock scaling of the per-product forecast engine from 1 to N cores.
+#   python bench_forecast_engine.py --products 2000 --days 365 --workers 1,2,4,8
+
+def main():
+    parser = argparse.ArgumentParser(description="Forecast engine core-scaling benchmark")
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--workers", default=None, help="Comma-separated worker counts (default: 1,2,4,... up to all cores)")
+    parser.add_argument("--chunksize", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=None)
+    args = parser.parse_args()
+
+    # Prophet / cmdstanpy log every fit; keep the benchmark output readable
+    logging.getLogger("cmdstanpy").disabled = True
+    logging.getLogger("prophet").disabled = True
+
+    if args.workers:
+        worker_counts = [int(w) for w in args.workers.split(",")]
+    else:
+        cores = os.cpu_count() or 1
+        worker_counts = sorted({2 ** i for i in range(cores.bit_length()) if 2 ** i <= cores} | {cores})
+
+    df = make_sales_frame(n_products=args.products, n_days=args.days)
+    df.rename(columns={"date": "ds", "total_orders": "y", "product": "product_name"}, inplace=True)
+    print(f"Dataset: {args.products} products x {args.days} days = {len(df):,} rows")
+
+    baseline = None
+    print(f"{'workers':>8} {'seconds':>10} {'speed-up':>9} {'products/s':>11}")
+    for workers in worker_counts:
+        start = time.perf_counter()
+        df_all_forecasts = run_forecasts(df, workers=workers, chunksize=args.chunksize, timeout=args.timeout)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        n_products = df_all_forecasts["product_name"].nunique()
+        print(f"{workers:>8} {elapsed:>10.2f} {baseline / elapsed:>8.2f}x {n_products / elapsed:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import argparse
+import time
+import numpy as np
+from sklearn.linear_model import LinearRegression
+from sklearn.metrics import r2_score
+from bench_data import make_sales_frame
+from partitioning import ProductPartitions
+from grouped_ols import grouped_ols
+
+# ------------------ BENCHMARK ------------------
+# Per-product slope / R²: LinearRegression + predict + r2_score per product vs. grouped_ols.
+#   python bench_grouped_ols.py --products 10000 --days 120
+#
+# The per-product loop is timed on a sample of products and extrapolated to the
+# full catalog; the sampled slopes and R² are checked against grouped_ols.
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-product LinearRegression vs. grouped closed-form OLS")
+    parser.add_argument("--products", type=int, default=10000)
+    parser.add_argument("--days", type=int, default=120)
+    parser.add_argument("--loop-sample", type=int, default=1000, help="Products fitted one by one (0 = all)")
+    args = parser.parse_args()
+
+    df = make_sales_frame(n_products=args.products, n_days=args.days)
+    partitions = ProductPartitions(df, key="product", sort_by="date")
+    print(f"Dataset: {len(partitions):,} products, {len(df):,} rows")
+
+    sample = len(partitions) if not args.loop_sample else min(args.loop_sample, len(partitions))
+    start = time.perf_counter()
+    loop_fits = []
+    for i, (product, rows) in enumerate(partitions.items()):
+        if i == sample:
+            break
+        X = (rows["date"] - rows["date"].min()).dt.days.to_frame()
+        y = rows["total_orders"]
+        model = LinearRegression().fit(X, y)
+        loop_fits.append((model.coef_[0], r2_score(y, model.predict(X))))
+    loop_elapsed = (time.perf_counter() - start) * len(partitions) / sample
+
+    start = time.perf_counter()
+    dates = partitions.frame["date"].to_numpy()
+    codes = partitions.codes
+    x = (dates - dates[partitions.offsets[:-1]][codes]) / np.timedelta64(1, "D")
+    fit = grouped_ols(codes, x, partitions.frame["total_orders"], n_groups=len(partitions))
+    grouped_elapsed = time.perf_counter() - start
+
+    loop_slope, loop_r2 = np.array(loop_fits).T
+    slope_err = np.max(np.abs(loop_slope - fit["slope"][:sample]))
+    r2_err = np.nanmax(np.abs(loop_r2 - fit["r2"][:sample]))
+
+    label = "LinearRegression loop" + ("" if sample == len(partitions) else f" (extrapolated from {sample})")
+    print(f"{label:<50} {loop_elapsed:>9.3f}s")
+    print(f"{'grouped_ols (incl. x construction)':<50} {grouped_elapsed:>9.3f}s")
+    print(f"{'speed-up':<50} {loop_elapsed / grouped_elapsed:>9.0f}x")
+    print(f"{'max |slope diff| / |R² diff| on the sample':<50} {slope_err:>9.2e} / {r2_err:.2e}")
+    assert slope_err < 1e-8 and r2_err < 1e-8
+
+
+if __name__ == "__main__":
+    main()
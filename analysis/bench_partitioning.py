@@ -0,0 +1,50 @@
+import argparse
+import time
+from bench_data import make_sales_frame
+from partitioning import ProductPartitions
+
+# ------------------ BENCHMARK ------------------
+# Per-product access: repeated boolean-mask filtering vs. ProductPartitions.
+#   python bench_partitioning.py --products 10000 --days 120
+#
+# The mask approach is O(products x rows), so by default it is timed on a
+# sample of products and extrapolated to the full catalog.
+
+def main():
+    parser = argparse.ArgumentParser(description="Boolean-mask vs. partitioned per-product access")
+    parser.add_argument("--products", type=int, default=10000)
+    parser.add_argument("--days", type=int, default=120)
+    parser.add_argument("--mask-sample", type=int, default=500, help="Products timed with the mask filter (0 = all)")
+    args = parser.parse_args()
+
+    df = make_sales_frame(n_products=args.products, n_days=args.days)
+    products = df["product"].unique()
+    print(f"Dataset: {len(products):,} products, {len(df):,} rows")
+
+    sample = products if not args.mask_sample else products[:args.mask_sample]
+    start = time.perf_counter()
+    mask_rows = 0
+    for product in sample:
+        mask_rows += len(df[df["product"] == product])
+    mask_elapsed = (time.perf_counter() - start) * len(products) / len(sample)
+
+    start = time.perf_counter()
+    partitions = ProductPartitions(df, key="product", sort_by="date")
+    build_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    part_rows = 0
+    for product, rows in partitions.items():
+        part_rows += len(rows)
+    iter_elapsed = time.perf_counter() - start
+
+    label = "mask filter" + ("" if len(sample) == len(products) else f" (extrapolated from {len(sample)})")
+    print(f"{label:<45} {mask_elapsed:>9.2f}s")
+    print(f"{'partitions: build (factorize + sort)':<45} {build_elapsed:>9.2f}s")
+    print(f"{'partitions: iterate all slices':<45} {iter_elapsed:>9.2f}s")
+    print(f"{'speed-up':<45} {mask_elapsed / (build_elapsed + iter_elapsed):>9.1f}x")
+    assert part_rows == len(df)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import os
+import time
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+from bench_data import make_sales_frame
+from sales_store import write_artifact, source_signature, _normalize_sales
+from monthly_rollup import load_rollup
+from product_stats import load_product_stats
+from trend_results import load_trend_results
+from sales_append import append_sales
+
+# ------------------ BENCHMARK ------------------
+# Picking up one new day of orders: full refresh of the derived tables vs. append_sales.
+#   python bench_sales_append.py --products 2000 --days 730 --new-days 5
+#   python bench_sales_append.py --products 200 --days 800 --new-days 5 --staggered
+#
+# --staggered gives each product its own first sale date (spread over the
+# history), so the products' midpoints are spread out as well.
+#
+# The workbook's columnar copy is written directly (no Excel parsing), so the
+# full refresh below is a lower bound of what re-reading sales.xlsx costs.
+
+def refresh_all(source_path):
+    load_rollup(source_path)
+    load_trend_results(source_path)
+    load_product_stats(source_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full refresh vs. incremental daily append")
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--new-days", type=int, default=5)
+    parser.add_argument("--staggered", action="store_true", help="Spread the products' first sale dates")
+    args = parser.parse_args()
+
+    df = make_sales_frame(n_products=args.products, n_days=args.days + args.new_days)
+    if args.staggered:
+        products = df["product"].unique()
+        offsets = np.random.default_rng(0).integers(0, args.days - 30, size=len(products))
+        launch = df["date"].min() + pd.to_timedelta(pd.Series(offsets, index=products), unit="D")
+        df = df[df["date"] >= df["product"].map(launch)].reset_index(drop=True)
+    cutoff = df["date"].max() - pd.Timedelta(days=args.new_days)
+    history, new_days = df[df["date"] <= cutoff], df[df["date"] > cutoff]
+
+    with tempfile.TemporaryDirectory() as folder:
+        source_path = os.path.join(folder, "sales.xlsx")
+        with open(source_path, "wb") as f:
+            f.write(b"placeholder")
+        write_artifact(source_path, _normalize_sales(history.copy()), source_signature(source_path))
+        print(f"History: {len(history):,} rows, {args.products:,} products\n")
+
+        start = time.perf_counter()
+        refresh_all(source_path)
+        full = time.perf_counter() - start
+        print(f"{'full refresh (rollup + trends + product stats)':<48} {full:>8.3f}s")
+
+        for date, rows in new_days.groupby("date"):
+            summary = append_sales(source_path, rows)
+            print(f"{'append ' + str(date.date()) + f' ({len(rows):,} rows)':<48} {summary['seconds']:>8.3f}s"
+                  f"  ({full / summary['seconds']:.0f}x)")
+
+        start = time.perf_counter()
+        refresh_all(source_path)
+        print(f"{'loaders afterwards (all tables up to date)':<48} {time.perf_counter() - start:>8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import numpy as np
+import pandas as pd
+from sales_store import iter_sales_chunks
+
+# ------------------ FEATURE CONFIG ------------------
+RECENT_DAYS = 90
+FEATURE_COLUMNS = [
+    "slope",
+    "total_sales",
+    "avg_monthly_sales",
+    "sales_volatility",
+    "zero_sales_days_pct",
+    "recent_sales_avg",
+    "sales_acceleration",
+]
+_MOMENTS = ["n", "mean_x", "mean_y", "cxx", "cxy", "cyy"]
+_COUNTS = ["total", "zero", "recent_sum", "recent_n", "first_sum", "first_n", "second_sum", "second_n"]
+
+
+# ------------------ PASS 1: DATE BOUNDS ------------------
+def _clean(chunk: pd.DataFrame, key: str) -> pd.DataFrame:
+    return chunk.dropna(subset=[key, "date"])
+
+
+def _date_bounds(chunks, key: str):
+    """Products in first-appearance order with their first and last sale date."""
+    parts = [
+        _clean(chunk, key).groupby(key, sort=False, observed=True)["date"].agg(["min", "max"])
+        for chunk in chunks
+    ]
+    bounds = pd.concat(parts).groupby(level=0, sort=False).agg({"min": "min", "max": "max"})
+    return pd.Index(bounds.index), bounds["min"].to_numpy(), bounds["max"].to_numpy()
+
+
+# ------------------ PASS 2: GROUPED STATISTICS ------------------
+def _chunk_stats(chunk, key, products, first, last):
+    """Per-product moments and window counts of one chunk (arrays of len(products))."""
+    n_groups = len(products)
+    codes = products.get_indexer(chunk[key].to_numpy())
+    dates = chunk["date"].to_numpy()
+    y = chunk["total_orders"].to_numpy(dtype=float)
+    x = (dates - first[codes]) / np.timedelta64(1, "D")
+
+    def group_sum(values):
+        return np.bincount(codes, weights=values, minlength=n_groups)
+
+    n = np.bincount(codes, minlength=n_groups).astype(float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_x = np.nan_to_num(group_sum(x) / n)
+        mean_y = np.nan_to_num(group_sum(y) / n)
+    dx = x - mean_x[codes]
+    dy = y - mean_y[codes]
+    moments = {"n": n, "mean_x": mean_x, "mean_y": mean_y,
+               "cxx": group_sum(dx * dx), "cxy": group_sum(dx * dy), "cyy": group_sum(dy * dy)}
+
+    recent = dates >= (last - np.timedelta64(RECENT_DAYS, "D"))[codes]
+    mid = first + (last - first) / 2
+    first_half = dates <= mid[codes]
+    counts = {
+        "total": group_sum(y),
+        "zero": group_sum((y == 0).astype(float)),
+        "recent_sum": group_sum(y * recent), "recent_n": group_sum(recent.astype(float)),
+        "first_sum": group_sum(y * first_half), "first_n": group_sum(first_half.astype(float)),
+        "second_sum": group_sum(y * ~first_half), "second_n": group_sum((~first_half).astype(float)),
+    }
+    months = np.unique(codes.astype(np.int64) * 100_000 + dates.astype("datetime64[M]").astype(np.int64))
+    return moments, counts, months
+
+
+def merge_moments(a: dict, b: dict) -> dict:
+    """Combines per-group means and co-moments of two row sets (Chan et al.'s pairwise update)."""
+    n = a["n"] + b["n"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weight = np.where(n > 0, a["n"] * b["n"] / n, 0.0)
+        share_b = np.where(n > 0, b["n"] / n, 0.0)
+    delta_x = b["mean_x"] - a["mean_x"]
+    delta_y = b["mean_y"] - a["mean_y"]
+    return {
+        "n": n,
+        "mean_x": a["mean_x"] + delta_x * share_b,
+        "mean_y": a["mean_y"] + delta_y * share_b,
+        "cxx": a["cxx"] + b["cxx"] + delta_x * delta_x * weight,
+        "cxy": a["cxy"] + b["cxy"] + delta_x * delta_y * weight,
+        "cyy": a["cyy"] + b["cyy"] + delta_y * delta_y * weight,
+    }
+
+
+def _finalize(products, moments, counts, months) -> pd.DataFrame:
+    n = moments["n"]
+    month_count = np.bincount(np.unique(months) // 100_000, minlength=len(products))
+    total = counts["total"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        features = {
+            "slope": np.where(moments["cxx"] > 0, moments["cxy"] / moments["cxx"], 0.0),
+            "total_sales": total,
+            "avg_monthly_sales": total / month_count,
+            "sales_volatility": np.sqrt(moments["cyy"] / (n - 1)),
+            "zero_sales_days_pct": counts["zero"] / n,
+            "recent_sales_avg": counts["recent_sum"] / counts["recent_n"],
+            "sales_acceleration": counts["second_sum"] / counts["second_n"] - counts["first_sum"] / counts["first_n"],
+        }
+    features["sales_volatility"] = np.where(n > 1, features["sales_volatility"], np.nan)
+    return pd.DataFrame({"product": products, **features})
+
+
+# ------------------ PUBLIC API ------------------
+def extract_features_chunked(make_chunks, key: str = "product") -> pd.DataFrame:
+    """
+    Clustering features from a sales history read in chunks (e.g. iter_sales_chunks).
+
+    make_chunks() must return a fresh iterable of frames (key, date, total_orders)
+    each time it is called; it is consumed twice: once for each product's first and
+    last date, once for the grouped statistics. Only per-product accumulators are
+    kept between chunks, so memory is bounded by the chunk size and catalog size.
+    """
+    products, first, last = _date_bounds(make_chunks(), key)
+    n_groups = len(products)
+    moments = {name: np.zeros(n_groups) for name in _MOMENTS}
+    counts = {name: np.zeros(n_groups) for name in _COUNTS}
+    months = []
+    for chunk in make_chunks():
+        chunk = _clean(chunk, key)
+        if chunk.empty:
+            continue
+        chunk_moments, chunk_counts, chunk_months = _chunk_stats(chunk, key, products, first, last)
+        moments = merge_moments(moments, chunk_moments)
+        for name in _COUNTS:
+            counts[name] += chunk_counts[name]
+        months.append(chunk_months)
+    months = np.concatenate(months) if months else np.array([], dtype=np.int64)
+    return _finalize(products, moments, counts, months)
+
+
+def extract_features(df: pd.DataFrame, key: str = "product") -> pd.DataFrame:
+    """
+    features_df for clustering from an in-memory sales frame, in one grouped pass.
+
+    Columns: product + FEATURE_COLUMNS, one row per product in first-appearance
+    order (same values as the old per-product loop; rows without a product or
+    date are ignored).
+    """
+    return extract_features_chunked(lambda: [df], key=key)
+
+
+def extract_features_from_store(source_path: str, chunk_rows: int = 1_000_000, key: str = "product") -> pd.DataFrame:
+    """Chunked feature extraction straight from a sales file's columnar copy."""
+    columns = [key, "date", "total_orders"]
+    return extract_features_chunked(lambda: iter_sales_chunks(source_path, chunk_rows, columns=columns), key=key)
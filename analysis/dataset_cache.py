@@ -0,0 +1,126 @@
+import os
+import threading
+from collections import OrderedDict
+from sales_store import load_sales, dataset_signature
+from tracing import span
+
+# ------------------ CACHE CONFIG ------------------
+DATASET_CACHE_MB = 512
+
+
+# ------------------ DATASET CACHE ------------------
+class DatasetCache:
+    """
+    Thread-safe in-process cache of parsed sales frames (or anything else the
+    loader builds from a source file), keyed by source path.
+
+    Entries are evicted least-recently-used first once the summed in-memory
+    size of the cached values exceeds max_bytes, and dropped as soon as the
+    source file's mtime/size changes or rows are appended to it. Cached values
+    are shared between callers and must be treated as read-only. Concurrent
+    misses on the same path load it once: later callers wait for the load in
+    flight (e.g. a background warm-up) instead of parsing the file again.
+    """
+
+    def __init__(self, max_bytes: int = DATASET_CACHE_MB * 2**20, loader=load_sales, sizeof=None, name: str = "dataset"):
+        """
+        :param loader: Builds the cached value from a source path
+        :param sizeof: Bytes held by a cached value (default: deep DataFrame memory usage)
+        :param name: Traced as the "cache.<name>" stage
+        """
+        self.name = name
+        self.max_bytes = max_bytes
+        self.loader = loader
+        self.sizeof = sizeof or (lambda df: int(df.memory_usage(deep=True).sum()))
+        self._entries = OrderedDict()  # path -> (signature, value, nbytes)
+        self._lock = threading.Lock()
+        self._loading = {}  # path -> Event set when its in-flight load finishes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def current_bytes(self) -> int:
+        return sum(nbytes for _, _, nbytes in self._entries.values())
+
+    def get(self, source_path: str):
+        """Returns the cached value for a source file, loading it on a miss."""
+        with span(f"cache.{self.name}", source=os.path.basename(source_path)) as s:
+            waited = False
+            while True:
+                signature = dataset_signature(source_path)
+
+                with self._lock:
+                    entry = self._entries.get(source_path)
+                    if entry is not None:
+                        if entry[0] == signature:
+                            self._entries.move_to_end(source_path)
+                            self.hits += 1
+                            s.set(cache_hit=True, waited=waited)
+                            return entry[1]
+                        del self._entries[source_path]
+                        self.invalidations += 1
+                    loading = self._loading.get(source_path)
+                    if loading is None:
+                        loading = self._loading[source_path] = threading.Event()
+                        self.misses += 1
+                        break
+
+                # Another caller is loading this path; look again once it is done
+                loading.wait()
+                waited = True
+
+            # Load outside the lock so other datasets stay readable meanwhile
+            try:
+                value = self.loader(source_path)
+                nbytes = self.sizeof(value)
+
+                with self._lock:
+                    if nbytes <= self.max_bytes:
+                        self._entries[source_path] = (signature, value, nbytes)
+                        self._entries.move_to_end(source_path)
+                        self._evict()
+            finally:
+                with self._lock:
+                    del self._loading[source_path]
+                loading.set()
+            s.set(cache_hit=False, waited=waited, bytes=nbytes)
+            return value
+
+    def _evict(self):
+        while self.current_bytes > self.max_bytes and len(self._entries) > 1:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, source_path: str = None):
+        """Drops one dataset (or everything when no path is given)."""
+        with self._lock:
+            if source_path is None:
+                self.invalidations += len(self._entries)
+                self._entries.clear()
+            elif self._entries.pop(source_path, None) is not None:
+                self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Shared by every tool module in the process
+DATASET_CACHE = DatasetCache()
+
+
+def get_dataset(source_path: str):
+    """Parsed sales frame for a source file, served from the shared cache."""
+    return DATASET_CACHE.get(source_path)
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+from partitioning import ProductPartitions
+
+# ------------------ FALLBACK CONFIG ------------------
+FALLBACK_METHODS = ["moving_average", "exponential_smoothing", "seasonal_naive"]
+DEFAULT_METHOD = "moving_average"
+MA_WINDOW = 30
+SES_ALPHA = 0.3
+SEASON_LENGTH = 7
+BAND_WIDTH = 0.1  # yhat_lower / yhat_upper = yhat * (1 -/+ BAND_WIDTH)
+
+
+# ------------------ PER-METHOD LEVELS ------------------
+def _moving_average(cumsum, starts, ends, window):
+    """Mean of the trailing `window` rows (or the whole series when shorter)."""
+    window_starts = np.maximum(ends - window, starts)
+    lengths = ends - window_starts
+    return np.divide(cumsum[ends] - cumsum[window_starts], lengths,
+                     out=np.zeros(len(ends)), where=lengths > 0)
+
+
+def _exponential_smoothing(partitions, y, alpha):
+    """Final simple-exponential-smoothing level of every product, seeded with its first value."""
+    codes = partitions.codes
+    offsets = partitions.offsets
+    age = offsets[codes + 1] - 1 - np.arange(len(y))
+    weights = alpha * (1 - alpha) ** age
+    first = offsets[:-1][partitions.sizes() > 0]
+    weights[first] = (1 - alpha) ** age[first]
+    return np.bincount(codes, weights=weights * y, minlength=len(partitions))
+
+
+# ------------------ BATCH FALLBACK ------------------
+def batch_fallback_forecast(
+    history,
+    products=None,
+    periods=30,
+    methods=DEFAULT_METHOD,
+    window=MA_WINDOW,
+    alpha=SES_ALPHA,
+    season=SEASON_LENGTH,
+    default_last_date="2025-04-30",
+):
+    """
+    Cheap flat/seasonal forecasts for many low-volume products at once.
+
+    :param history: ProductPartitions over (ds, y) sorted by ds, or a raw Prophet-ready frame
+    :param products: Products to forecast (default: every product in history);
+                     unknown products get a zero forecast from default_last_date
+    :param methods: One method name for all products, or a dict / Series mapping
+                    product -> "moving_average" | "exponential_smoothing" | "seasonal_naive"
+    :return: Columnar frame (ds, yhat, yhat_lower, yhat_upper, product_name),
+             `periods` rows per product in the requested order
+    """
+    partitions = history if isinstance(history, ProductPartitions) else ProductPartitions(history, sort_by="ds")
+    products = np.asarray(partitions.products if products is None else products, dtype=object)
+
+    if isinstance(methods, str):
+        method_per_product = np.full(len(products), methods, dtype=object)
+    else:
+        method_per_product = pd.Series(products).map(methods).fillna(DEFAULT_METHOD).to_numpy(dtype=object)
+    unknown_methods = set(method_per_product) - set(FALLBACK_METHODS)
+    if unknown_methods:
+        raise ValueError(f"Unknown fallback method(s): {sorted(unknown_methods)}")
+
+    y = partitions.frame["y"].to_numpy(dtype=float)
+    ds = partitions.frame["ds"].to_numpy(dtype="datetime64[ns]")
+    positions = partitions.positions(products)
+    known = positions >= 0
+    starts = np.where(known, partitions.offsets[np.maximum(positions, 0)], 0)
+    ends = np.where(known, partitions.offsets[np.maximum(positions, 0) + 1], 0)
+    has_history = ends > starts
+
+    # Flat level from the trailing window -> (products x periods)
+    cumsum = np.concatenate([[0.0], np.cumsum(y)])
+    level = _moving_average(cumsum, starts, ends, window)
+
+    use_ses = (method_per_product == "exponential_smoothing") & has_history
+    if use_ses.any():
+        level[use_ses] = _exponential_smoothing(partitions, y, alpha)[positions[use_ses]]
+
+    yhat = np.repeat(level[:, None], periods, axis=1)
+
+    # Seasonal naive repeats the last full season; shorter series keep the flat level
+    use_seasonal = (method_per_product == "seasonal_naive") & (ends - starts >= season)
+    if use_seasonal.any():
+        lags = np.arange(periods) % season
+        yhat[use_seasonal] = y[ends[use_seasonal, None] - season + lags[None, :]]
+
+    last_dates = np.full(len(products), np.datetime64(pd.to_datetime(default_last_date), "ns"))
+    if has_history.any():
+        last_dates[has_history] = ds[ends[has_history] - 1]
+    future_dates = last_dates[:, None] + np.arange(1, periods + 1) * np.timedelta64(1, "D")
+
+    yhat = yhat.ravel()
+    return pd.DataFrame({
+        "ds": future_dates.ravel(),
+        "yhat": yhat,
+        "yhat_lower": yhat * (1 - BAND_WIDTH),
+        "yhat_upper": yhat * (1 + BAND_WIDTH),
+        "product_name": np.repeat(products, periods),
+    })
@@ -1,56 +1,33 @@
-import pandas as pd
-from prophet import Prophet
-from datetime import timedelta
-import plotly.graph_objects as go
 import streamlit as st
 
+# Worker processes used for the per-product fits (None = all cores)
+FORECAST_WORKERS = None
+
 st.set_page_config(page_title="30-Day Sales Forecast", layout="wide")
 st.title("📈 30-Day Sales Forecast (Prophet + Fallback)")
 
+# Streamlit renders as the script runs: the page is up before pandas / plotly load
+# (Prophet itself is only imported by the forecast workers)
+with st.spinner("Loading forecasting libraries..."):
+    import pandas as pd
+    import plotly.graph_objects as go
+    from forecast_engine import run_forecasts
+    from sales_store import load_sales
+    from model_store import ModelStore
+
 # --- Step 1: Forecast for all products once and cache it ---
 @st.cache_data
 def run_forecasting():
     file_path = "sales.xlsx"  # Make sure this file is in the same directory
-    df = pd.read_excel(file_path)
+    df = load_sales(file_path)
 
     df.rename(columns={"date": "ds", "total_orders": "y", "product": "product_name"}, inplace=True)
     df["ds"] = pd.to_datetime(df["ds"])
 
-    forecast_dfs = []
-
-    for product in df["product_name"].unique():
-        df_prod = df[df["product_name"] == product][["ds", "y"]].copy()
-
-        if df_prod.shape[0] >= 60 and df_prod["y"].sum() >= 10:
-            model = Prophet(daily_seasonality=True, yearly_seasonality=True)
-            model.fit(df_prod)
-
-            future = model.make_future_dataframe(periods=30)
-            forecast = model.predict(future)
-
-            forecast = forecast[["ds", "yhat", "yhat_lower", "yhat_upper"]].copy()
-            forecast["product_name"] = product
-        else:
-            if not df_prod.empty:
-                mean_y = df_prod.tail(30)["y"].mean() if df_prod.shape[0] >= 30 else df_prod["y"].mean()
-                last_date = df_prod["ds"].max()
-            else:
-                mean_y = 0
-                last_date = pd.to_datetime("2025-01-01")
-
-            future_dates = pd.date_range(start=last_date + timedelta(days=1), periods=30)
-
-            forecast = pd.DataFrame({
-                "ds": future_dates,
-                "yhat": [mean_y] * 30,
-                "yhat_lower": [mean_y * 0.9] * 30,
-                "yhat_upper": [mean_y * 1.1] * 30,
-                "product_name": product
-            })
-
-        forecast_dfs.append(forecast)
-
-    df_all_forecasts = pd.concat(forecast_dfs, ignore_index=True)
+    # Fitted models persist across cache invalidations; only changed products are refit
+    df_all_forecasts = run_forecasts(
+        df, workers=FORECAST_WORKERS, default_last_date="2025-01-01", model_store=ModelStore()
+    )
     return df_all_forecasts
 
 # --- Load precomputed forecast ---
@@ -0,0 +1,216 @@
+import os
+import signal
+import threading
+import multiprocessing
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from partitioning import ProductPartitions
+from fallback_forecast import batch_fallback_forecast, DEFAULT_METHOD
+
+# ------------------ ENGINE CONFIG ------------------
+FORECAST_PERIODS = 30
+FORECAST_COLUMNS = ["ds", "yhat", "yhat_lower", "yhat_upper"]
+MIN_HISTORY_DAYS = 60
+MIN_TOTAL_SALES = 10
+DEFAULT_LAST_DATE = "2025-04-30"
+
+# The forecasting scripts run their pipeline at module level, so their workers
+# are forked rather than spawned (spawn would re-execute the calling script in
+# every worker). Forking a multithreaded process such as the Streamlit server can
+# leave a child stuck on a lock another thread held, so there a forkserver (a
+# fresh single-threaded process) starts the workers instead; Streamlit's own
+# entry point is guarded, so the server importing it runs nothing. Without
+# either start method (Windows), run_forecasts fits in-process.
+_START_METHODS = multiprocessing.get_all_start_methods()
+
+
+class ForecastTimeout(BaseException):
+    """
+    Raised inside a worker when a single product exceeds its time budget.
+    Derives from BaseException so Prophet's own `except Exception` blocks can't swallow it.
+    """
+
+
+def _mp_context():
+    """Start method for forecast workers from the calling process, or None to fit in-process."""
+    if "fork" in _START_METHODS and threading.active_count() == 1:
+        return multiprocessing.get_context("fork")
+    if "forkserver" in _START_METHODS:
+        return multiprocessing.get_context("forkserver")
+    return None
+
+
+# ------------------ PER-PRODUCT TIMEOUT ------------------
+def _alarms_available() -> bool:
+    """SIGALRM works only on POSIX and only in the main thread."""
+    return hasattr(signal, "SIGALRM") and threading.current_thread() is threading.main_thread()
+
+
+class _time_limit:
+    """
+    SIGALRM-based time budget for one product fit.
+    Disabled where alarms are unavailable (Windows, non-main threads such as
+    the Streamlit script runner); run_forecasts then fits in worker processes,
+    whose main thread can use alarms.
+    """
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.enabled = bool(seconds) and _alarms_available()
+
+    def _raise(self, signum, frame):
+        raise ForecastTimeout()
+
+    def __enter__(self):
+        if self.enabled:
+            self._previous = signal.signal(signal.SIGALRM, self._raise)
+            signal.setitimer(signal.ITIMER_REAL, self.seconds)
+        return self
+
+    def __exit__(self, *exc):
+        if self.enabled:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, self._previous)
+        return False
+
+
+# ------------------ SINGLE PRODUCT ------------------
+def prophet_forecast(product, df_prod, periods=FORECAST_PERIODS, columns=FORECAST_COLUMNS, model_store=None):
+    """
+    Fits one Prophet model and returns the requested forecast columns.
+    With a model_store, unchanged histories reuse the stored forecast and
+    histories with only appended days are warm-started from the stored params.
+    """
+    from prophet import Prophet
+
+    fingerprint = f"periods={periods}|columns={columns}"
+    status, entry = model_store.lookup(product, df_prod, fingerprint) if model_store else ("miss", None)
+    if status == "hit":
+        return entry["forecast"]
+
+    model = Prophet(daily_seasonality=True, yearly_seasonality=True)
+    if status == "append":
+        model.fit(df_prod, init=entry["params"])
+    else:
+        model.fit(df_prod)
+
+    future = model.make_future_dataframe(periods=periods)
+    forecast = model.predict(future)
+
+    forecast = forecast[[col for col in columns if col in forecast.columns]].copy()
+    forecast["product_name"] = product
+
+    if model_store:
+        model_store.save(product, df_prod, model, forecast, fingerprint)
+    return forecast
+
+
+def forecast_product(product, df_prod, options):
+    """
+    Prophet forecast for one product, or None if it runs past
+    options["timeout"] seconds (the caller then routes it to the fallback).
+    """
+    # Import before arming the alarm so a timeout never interrupts a half-done import
+    import prophet  # noqa: F401
+    try:
+        with _time_limit(options["timeout"]):
+            return prophet_forecast(
+                product, df_prod, options["periods"], options["columns"], options["model_store"]
+            )
+    except ForecastTimeout:
+        print(f"⏱️ Prophet timed out for '{product}' after {options['timeout']}s")
+        return None
+
+
+def _forecast_chunk(chunk, options):
+    """Worker entry point: forecasts a list of (product, df_prod) pairs."""
+    return [forecast_product(product, df_prod, options) for product, df_prod in chunk]
+
+
+# ------------------ ENGINE ------------------
+def run_forecasts(
+    df,
+    periods=FORECAST_PERIODS,
+    workers=None,
+    chunksize=None,
+    timeout=None,
+    min_history=MIN_HISTORY_DAYS,
+    min_total=MIN_TOTAL_SALES,
+    fallback=True,
+    columns=FORECAST_COLUMNS,
+    default_last_date=DEFAULT_LAST_DATE,
+    model_store=None,
+    fallback_methods=DEFAULT_METHOD,
+):
+    """
+    Forecasts every product in a Prophet-ready frame (ds, y, product_name) and
+    returns the combined df_all_forecasts frame, in the same product order as
+    df["product_name"].unique().
+
+    Products with enough history are fitted with Prophet in worker processes;
+    the long tail (and any Prophet fit that timed out) is forecast in one
+    vectorized batch_fallback_forecast call.
+
+    :param workers: Process count; None uses every core, 1 runs in-process.
+                    Workers are forked from single-threaded callers (the scripts)
+                    and started by a forkserver from multithreaded ones, e.g. the
+                    Streamlit page, which passes None (one worker per core).
+                    Without fork or forkserver (Windows) fits always run in-process.
+    :param chunksize: Products per task sent to a worker (default: ~4 tasks per worker)
+    :param timeout: Seconds allowed per Prophet fit before falling back. In-process
+                    fits called off the main thread (Streamlit) go to a worker
+                    process so the budget still applies; where neither alarms nor
+                    workers are available (Windows) no timeout is enforced.
+    :param model_store: Optional ModelStore so unchanged products skip refitting
+    :param fallback_methods: Fallback method name, or a product -> method mapping
+    """
+    options = {
+        "periods": periods,
+        "timeout": timeout,
+        "columns": columns,
+        "model_store": model_store,
+    }
+    partitions = ProductPartitions(df, sort_by="ds")
+    eligible = (partitions.sizes() >= min_history) & (partitions.sums("y") >= min_total)
+    items = [(product, partitions.get(product, columns=["ds", "y"])) for product in partitions.products[eligible]]
+    mp_context = _mp_context()
+    workers = workers or os.cpu_count() or 1
+    if mp_context is None:
+        workers = 1
+    in_process = workers == 1 or len(items) == 1
+    if items and in_process and timeout and not _alarms_available():
+        if mp_context is not None:
+            in_process = False  # the budget is enforced in the worker's main thread
+        else:
+            print(f"⚠️ No per-product timeout on this platform; the {timeout}s budget is not enforced")
+
+    if not items:
+        results = []
+    elif in_process:
+        results = _forecast_chunk(items, options)
+    else:
+        chunksize = chunksize or max(1, len(items) // (workers * 4))
+        chunks = [items[i:i + chunksize] for i in range(0, len(items), chunksize)]
+        results = []
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context) as pool:
+            for chunk_result in pool.map(_forecast_chunk, chunks, [options] * len(chunks)):
+                results.extend(chunk_result)
+
+    forecast_dfs = [forecast for forecast in results if forecast is not None]
+    if fallback:
+        timed_out = [product for (product, _), forecast in zip(items, results) if forecast is None]
+        fallback_products = list(partitions.products[~eligible]) + timed_out
+        if fallback_products:
+            forecast_dfs.append(batch_fallback_forecast(
+                partitions, fallback_products, periods, fallback_methods, default_last_date=default_last_date
+            ))
+
+    if not forecast_dfs:
+        return pd.DataFrame(columns=columns + ["product_name"])
+
+    # Restore the original product order across the Prophet and fallback parts
+    df_all_forecasts = pd.concat(forecast_dfs, ignore_index=True)
+    positions = pd.Categorical(df_all_forecasts["product_name"], categories=partitions.products).codes
+    order = np.argsort(positions, kind="stable")
+    return df_all_forecasts.iloc[order].reset_index(drop=True)
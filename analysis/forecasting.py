@@ -1,11 +1,13 @@
 import pandas as pd
-from prophet import Prophet
 from datetime import timedelta
-import matplotlib.pyplot as plt
+from forecast_engine import run_forecasts
+from sales_store import load_sales
+from partitioning import ProductPartitions
+from model_store import ModelStore
 
 # Load your Excel file (replace with actual path)
 file_path = "sales.xlsx"  # Example filename
-df = pd.read_excel(file_path)
+df = load_sales(file_path)
 
 # Rename for Prophet
 df.rename(columns={"date": "ds", "total_orders": "y", "product": "product_name"}, inplace=True)
@@ -13,24 +15,25 @@ df.rename(columns={"date": "ds", "total_orders": "y", "product": "product_name"}
 # Ensure date is datetime
 df["ds"] = pd.to_datetime(df["ds"])
 
+# Fit every product with enough activity in parallel (low-activity SKUs with
+# fewer than 10 total orders are skipped, as before)
+df_all_forecasts = run_forecasts(
+    df,
+    min_history=0,
+    min_total=10,
+    fallback=False,
+    columns=["ds", "yhat", "trend", "weekly", "yearly", "daily"],
+    model_store=ModelStore(),
+)
+forecasts_by_product = ProductPartitions(df_all_forecasts)
+history_by_product = ProductPartitions(df)
+
 # Store results
 results = []
 
-# Iterate over each product
-for product in df["product_name"].unique():
-    df_prod = df[df["product_name"] == product][["ds", "y"]].copy()
-
-    # Skip very low-activity SKUs
-    if df_prod["y"].sum() < 10:
-        continue
-
-    # Initialize and train model
-    model = Prophet(daily_seasonality=True, yearly_seasonality=True)
-    model.fit(df_prod)
-
-    # Forecast next 30 days
-    future = model.make_future_dataframe(periods=30)
-    forecast = model.predict(future)
+# Iterate over each forecasted product
+for product, forecast in forecasts_by_product.items():
+    df_prod = history_by_product.get(product, columns=["ds", "y"])
 
     # Compute metrics
     forecast_next_30 = forecast.tail(30)["yhat"].mean()
@@ -38,7 +41,7 @@ for product in df["product_name"].unique():
     past_60_avg = recent_past["y"].mean()
     trend_slope = forecast["trend"].tail(30).diff().mean()
     seasonal_cols = [col for col in forecast.columns if col in ["weekly", "yearly", "daily"] and col in forecast]
-    seasonality_strength = forecast[seasonal_cols].sum(axis=1).std() if seasonal_cols else 0
+    seasonal_strength = forecast[seasonal_cols].sum(axis=1).std() if seasonal_cols else 0
 
 
     # Insight tagging
@@ -0,0 +1,50 @@
+import numpy as np
+
+# ------------------ GROUPED LEAST SQUARES ------------------
+def grouped_ols(codes, x, y, n_groups: int = None, return_residuals: bool = False) -> dict:
+    """
+    Simple linear regression y ~ a + b·x fitted separately for every group, all at once.
+
+    Replaces one scikit-learn LinearRegression (+ predict + r2_score) per product:
+    every statistic comes from grouped sums (bincount over the group codes), so the
+    cost is a handful of passes over the rows regardless of the number of groups.
+    Sums are taken over group-centred x and y, which keeps Sxx / Syy accurate when
+    x is large (e.g. day numbers).
+
+    :param codes: Group index (0..n_groups-1) of every row, e.g. ProductPartitions.codes
+    :param n_groups: Number of groups (default: codes.max() + 1)
+    :param return_residuals: Also return the per-row residuals y - (a + b·x)
+    :return: {"slope", "intercept", "r2", "count", "ss_res"} arrays of length n_groups
+             (+ "residuals" of length len(y)). r2 follows sklearn's r2_score: NaN for
+             fewer than 2 rows, 1.0 / 0.0 for a constant y fitted exactly / not exactly.
+    """
+    codes = np.asarray(codes)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n_groups = int(codes.max()) + 1 if n_groups is None else n_groups
+
+    def group_sum(values):
+        return np.bincount(codes, weights=values, minlength=n_groups)
+
+    count = np.bincount(codes, minlength=n_groups).astype(float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_x = group_sum(x) / count
+        mean_y = group_sum(y) / count
+    dx = x - mean_x[codes]
+    dy = y - mean_y[codes]
+    sxx = group_sum(dx * dx)
+    sxy = group_sum(dx * dy)
+    syy = group_sum(dy * dy)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = np.where(sxx > 0, sxy / sxx, 0.0)
+        # Residual sum of squares without a second pass: Syy - b·Sxy (clipped at 0 for rounding)
+        ss_res = np.clip(syy - slope * sxy, 0.0, None)
+        r2 = np.where(syy > 0, 1 - ss_res / syy, np.where(ss_res == 0, 1.0, 0.0))
+    r2 = np.where(count < 2, np.nan, r2)
+    intercept = mean_y - slope * mean_x
+
+    result = {"slope": slope, "intercept": intercept, "r2": r2, "count": count, "ss_res": ss_res}
+    if return_residuals:
+        result["residuals"] = dy - slope[codes] * dx
+    return result
@@ -0,0 +1,113 @@
+import os
+import pickle
+import hashlib
+import tempfile
+import numpy as np
+import pandas as pd
+
+# ------------------ STORE CONFIG ------------------
+MODEL_STORE_DIR = "model_store"
+
+
+# ------------------ HISTORY HASHING ------------------
+def _row_hashes(history: pd.DataFrame) -> np.ndarray:
+    """One uint64 per (ds, y) row, in date order."""
+    history = history.sort_values("ds")
+    return pd.util.hash_pandas_object(history[["ds", "y"]], index=False).to_numpy()
+
+
+def _digest(row_hashes: np.ndarray) -> str:
+    return hashlib.sha1(row_hashes.tobytes()).hexdigest()
+
+
+def _n_changepoints(rows: int, n_changepoints: int = 25, changepoint_range: float = 0.8) -> int:
+    """Mirrors Prophet's changepoint count so warm starts only reuse same-shaped params."""
+    return max(0, min(n_changepoints, int(np.floor(rows * changepoint_range)) - 1))
+
+
+def warm_start_params(model) -> dict:
+    """Fitted parameters in the shape Prophet.fit(init=...) expects."""
+    params = {}
+    for name in ["k", "m", "sigma_obs"]:
+        params[name] = model.params[name][0][0] if model.mcmc_samples == 0 else np.mean(model.params[name])
+    for name in ["delta", "beta"]:
+        params[name] = model.params[name][0] if model.mcmc_samples == 0 else np.mean(model.params[name], axis=0)
+    return params
+
+
+# ------------------ MODEL STORE ------------------
+class ModelStore:
+    """
+    On-disk store of fitted Prophet models and their forecasts, one file per
+    (forecast config, product), keyed by a hash of the product's history.
+
+    lookup() tells the caller what a refresh needs for one product:
+      - "hit":    history unchanged, reuse the stored forecast as-is
+      - "append": only new days were appended, warm-start from the stored params
+      - "miss":   no usable entry, fit from scratch
+    """
+
+    def __init__(self, root: str = MODEL_STORE_DIR):
+        self.root = root
+
+    def _path(self, product, fingerprint: str) -> str:
+        key = hashlib.sha1(f"{fingerprint}|{product}".encode("utf-8")).hexdigest()
+        return os.path.join(self.root, key[:2], f"{key}.pkl")
+
+    def load(self, product, fingerprint: str):
+        path = self._path(product, fingerprint)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def lookup(self, product, history: pd.DataFrame, fingerprint: str):
+        """Returns (status, entry) for the product's current history."""
+        entry = self.load(product, fingerprint)
+        if entry is None:
+            return "miss", None
+
+        row_hashes = _row_hashes(history)
+        if len(row_hashes) == entry["rows"] and _digest(row_hashes) == entry["history_hash"]:
+            return "hit", entry
+
+        if (
+            len(row_hashes) > entry["rows"]
+            and _digest(row_hashes[:entry["rows"]]) == entry["history_hash"]
+            and _n_changepoints(len(row_hashes)) == _n_changepoints(entry["rows"])
+        ):
+            return "append", entry
+
+        return "miss", entry
+
+    def save(self, product, history: pd.DataFrame, model, forecast: pd.DataFrame, fingerprint: str):
+        """Atomically writes the fitted model, its warm-start params and forecast."""
+        from prophet.serialize import model_to_json
+
+        row_hashes = _row_hashes(history)
+        entry = {
+            "product": product,
+            "rows": len(row_hashes),
+            "history_hash": _digest(row_hashes),
+            "last_ds": history["ds"].max(),
+            "model_json": model_to_json(model),
+            "params": warm_start_params(model),
+            "forecast": forecast,
+        }
+
+        path = self._path(product, fingerprint)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def load_model(self, product, fingerprint: str):
+        """Deserializes the stored Prophet model (e.g. to predict a different horizon)."""
+        from prophet.serialize import model_from_json
+
+        entry = self.load(product, fingerprint)
+        return model_from_json(entry["model_json"]) if entry else None
@@ -0,0 +1,124 @@
+import pandas as pd
+from partitioning import ProductPartitions
+from dataset_cache import DatasetCache, get_dataset
+from sales_store import is_fresh, dataset_signature, write_artifact, read_artifact
+from tracing import span
+
+# ------------------ ROLLUP CONFIG ------------------
+ROLLUP_KIND = "monthly_v2"  # bumped when the layout changes, so stored rollups get rebuilt
+ROLLUP_CACHE_MB = 128
+
+
+def normalize_product(name) -> str:
+    """Key used for product lookups (the tools matched on lower().strip())."""
+    return str(name).lower().strip()
+
+
+# ------------------ BUILD ------------------
+def build_rollup(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Monthly totals per normalized product from a sales frame.
+
+    Columns: product_key, product, month (month start), month_label ("%B %Y"),
+    total_orders. Rows are sorted by product_key, month. product is one display
+    name per product_key (the first spelling seen), the same in every month;
+    group by product_key, not by product.
+    """
+    if not all(col in df.columns for col in ["product", "date", "total_orders"]):
+        raise ValueError("Missing one or more required columns.")
+
+    df = df.dropna(subset=["date", "product"])
+    sales = pd.DataFrame({
+        "product_key": df["product"].astype(str).str.lower().str.strip(),
+        "product": df["product"].astype(str),
+        "month": df["date"].dt.to_period("M").dt.to_timestamp(),
+        "total_orders": df["total_orders"],
+    })
+
+    rollup = (
+        sales.groupby(["product_key", "month"], sort=True)
+        .agg(total_orders=("total_orders", "sum"))
+        .reset_index()
+    )
+    rollup["product"] = _display_names(sales, rollup["product_key"])
+    rollup["month_label"] = rollup["month"].dt.strftime("%B %Y")
+    return rollup[["product_key", "product", "month", "month_label", "total_orders"]]
+
+
+def _display_names(frame: pd.DataFrame, keys: pd.Series) -> pd.Series:
+    """Display name of each key: the first `product` spelling of that key in frame's row order."""
+    names = frame.groupby("product_key", sort=False)["product"].first()
+    return keys.map(names)
+
+
+def update_rollup(rollup: pd.DataFrame, new_rows: pd.DataFrame) -> pd.DataFrame:
+    """
+    Folds newly appended sales rows into an existing rollup: product-months that
+    gain orders are summed, new ones are inserted, the rest is kept as is. Same
+    result as build_rollup over the old and new rows together, without rescanning
+    the old rows.
+    """
+    delta = build_rollup(new_rows)
+    if delta.empty:
+        return rollup
+    combined = pd.concat([rollup, delta], ignore_index=True)
+    rollup = (
+        combined.groupby(["product_key", "month"], sort=True)
+        .agg(month_label=("month_label", "first"), total_orders=("total_orders", "sum"))
+        .reset_index()
+    )
+    rollup["product"] = _display_names(combined, rollup["product_key"])  # existing names win
+    return rollup[["product_key", "product", "month", "month_label", "total_orders"]]
+
+
+def load_rollup(source_path: str) -> pd.DataFrame:
+    """Monthly rollup of a sales file, rebuilt only when the source file changes."""
+    if not is_fresh(source_path, ROLLUP_KIND):
+        signature = dataset_signature(source_path)
+        df = get_dataset(source_path)
+        with span("aggregate.monthly_rollup", rows=len(df)) as s:
+            rollup = build_rollup(df)
+            s.set(rollup_rows=len(rollup))
+        write_artifact(source_path, rollup, signature, ROLLUP_KIND)
+    return read_artifact(source_path, ROLLUP_KIND)
+
+
+# ------------------ LOOKUP INDEX ------------------
+class MonthlyRollupIndex:
+    """Per-product offsets into a rollup, so a lookup only touches that product's months."""
+
+    def __init__(self, rollup: pd.DataFrame):
+        self.rollup = rollup
+        self.partitions = ProductPartitions(rollup, key="product_key", sort_by="month")
+        frame = self.partitions.frame
+        self._labels = frame["month_label"].tolist()
+        self._totals = frame["total_orders"].tolist()
+
+    @property
+    def nbytes(self) -> int:
+        # Rollup frame plus the label / total lists kept for lookups (roughly the same again)
+        return int(self.rollup.memory_usage(deep=True).sum()) * 2
+
+    def lookup(self, product_name: str) -> dict:
+        """{"January 2025": total, ...} in chronological order ({} if unknown)."""
+        key = normalize_product(product_name)
+        if key not in self.partitions:
+            return {}
+        start, stop = self.partitions.bounds(key)
+        return dict(zip(self._labels[start:stop], self._totals[start:stop]))
+
+
+def _load_index(source_path: str) -> MonthlyRollupIndex:
+    rollup = load_rollup(source_path)
+    with span("index.monthly_rollup", rows=len(rollup)):
+        return MonthlyRollupIndex(rollup)
+
+
+ROLLUP_CACHE = DatasetCache(
+    max_bytes=ROLLUP_CACHE_MB * 2**20, loader=_load_index, sizeof=lambda index: index.nbytes, name="rollup_index"
+)
+
+
+def get_rollup_index(source_path: str) -> MonthlyRollupIndex:
+    """Rollup index for a sales file, served from the shared in-process cache."""
+    return ROLLUP_CACHE.get(source_path)
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+
+# ------------------ PRODUCT PARTITIONS ------------------
+class ProductPartitions:
+    """
+    Sorts a sales frame by product once and hands out per-product row ranges.
+
+    Replaces the `df[df["product_name"] == product]` pattern, which rescans the
+    whole frame for every product (O(products x rows)). Building the index is a
+    single factorize + stable sort; each lookup afterwards is a positional slice
+    of the sorted frame, so no rows are scanned or copied.
+    """
+
+    def __init__(self, df: pd.DataFrame, key: str = "product_name", sort_by: str = None):
+        """
+        :param key: Column holding the product identifier
+        :param sort_by: Optional column to order rows by within each product (e.g. date)
+        """
+        codes, products = pd.factorize(df[key], sort=False)  # first-appearance order, like .unique()
+        valid = codes >= 0  # rows with a missing key never matched the old mask filter either
+        rows = np.flatnonzero(valid)
+        codes = codes[valid]
+
+        if sort_by is None:
+            order = np.argsort(codes, kind="stable")
+        else:
+            order = np.lexsort((df[sort_by].to_numpy()[rows], codes))
+
+        self.key = key
+        self.products = products
+        self.frame = df.iloc[rows[order]]
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(products)))])
+        self._position = {product: i for i, product in enumerate(products)}
+
+    def __len__(self):
+        return len(self.products)
+
+    def __contains__(self, product):
+        return product in self._position
+
+    def __iter__(self):
+        return iter(self.products)
+
+    @property
+    def codes(self) -> np.ndarray:
+        """Product position of every row in the sorted frame."""
+        return np.repeat(np.arange(len(self.products)), np.diff(self.offsets))
+
+    def sizes(self) -> np.ndarray:
+        """Row count per product, in self.products order."""
+        return np.diff(self.offsets)
+
+    def sums(self, column: str) -> np.ndarray:
+        """Column total per product, in self.products order."""
+        values = self.frame[column].to_numpy(dtype=float)
+        return np.bincount(self.codes, weights=values, minlength=len(self.products))
+
+    def positions(self, products) -> np.ndarray:
+        """Index of each product in self.products (-1 if unknown)."""
+        return np.array([self._position.get(product, -1) for product in products], dtype=int)
+
+    def bounds(self, product):
+        """Returns the (start, stop) row offsets of a product in the sorted frame."""
+        i = self._position[product]
+        return int(self.offsets[i]), int(self.offsets[i + 1])
+
+    def get(self, product, columns=None) -> pd.DataFrame:
+        """Rows for one product (empty frame if the product is unknown)."""
+        frame = self.frame if columns is None else self.frame[columns]
+        if product not in self._position:
+            return frame.iloc[0:0]
+        start, stop = self.bounds(product)
+        return frame.iloc[start:stop]
+
+    def items(self, columns=None):
+        """Yields (product, rows) pairs in first-appearance order."""
+        frame = self.frame if columns is None else self.frame[columns]
+        for i, product in enumerate(self.products):
+            yield product, frame.iloc[self.offsets[i]:self.offsets[i + 1]]
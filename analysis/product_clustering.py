@@ -0,0 +1,122 @@
+import os
+import pickle
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.preprocessing import StandardScaler
+
+# ------------------ CLUSTERING CONFIG ------------------
+N_CLUSTERS = 3
+BACKENDS = ["kmeans", "minibatch"]
+BATCH_SIZE = 4096
+PARTIAL_FIT_EPOCHS = 3  # passes over the chunks in partial_fit mode
+SLOPE_CUTOFF = 0.01  # standardized center slope above / below which a cluster is growing / decaying
+
+
+def _chunks(X: np.ndarray, chunk_rows: int):
+    for start in range(0, len(X), chunk_rows):
+        yield X[start:start + chunk_rows]
+
+
+# ------------------ WARM-START STATE ------------------
+def save_cluster_state(path: str, centers: pd.DataFrame):
+    """Stores cluster centers (in original feature units) for the next run's warm start."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(centers, f)
+    os.replace(tmp_path, path)
+
+
+def load_cluster_state(path: str):
+    """Previous run's centers, or None if there is no usable state file."""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+
+# ------------------ FITTING ------------------
+def fit_clusters(
+    X: pd.DataFrame,
+    backend: str = "kmeans",
+    n_clusters: int = N_CLUSTERS,
+    batch_size: int = BATCH_SIZE,
+    chunk_rows: int = None,
+    init_centers: pd.DataFrame = None,
+    random_state: int = 42,
+):
+    """
+    Fits the segmentation model on a feature table (one row per product / series).
+
+    backend="kmeans" is the original full-batch KMeans; "minibatch" uses
+    MiniBatchKMeans, and with chunk_rows the scaler and model are trained with
+    partial_fit over row chunks (PARTIAL_FIT_EPOCHS passes) so only one chunk
+    is transformed at a time. init_centers (a previous run's centers, in
+    original feature units) seed the fit instead of k-means++.
+
+    Returns (labels, centers, scaled_centers): centers in original feature units
+    (what the warm-start state stores) and in standardized units (what clusters
+    are labelled by).
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown clustering backend: {backend} (expected one of {BACKENDS})")
+
+    columns = list(X.columns)
+    values = X.to_numpy(dtype=float)
+    scaler = StandardScaler()
+    if chunk_rows:
+        for chunk in _chunks(values, chunk_rows):
+            scaler.partial_fit(chunk)
+    else:
+        scaler.fit(values)
+
+    init, n_init = "k-means++", "auto"
+    if init_centers is not None and len(init_centers) == n_clusters:
+        init, n_init = scaler.transform(init_centers[columns].to_numpy(dtype=float)), 1
+
+    if backend == "kmeans":
+        model = KMeans(n_clusters=n_clusters, init=init, n_init=n_init, random_state=random_state)
+        labels = model.fit_predict(scaler.transform(values))
+    else:
+        model = MiniBatchKMeans(n_clusters=n_clusters, init=init, n_init=n_init if n_init == 1 else 3,
+                                batch_size=batch_size, random_state=random_state)
+        if chunk_rows:
+            for _ in range(PARTIAL_FIT_EPOCHS):
+                for chunk in _chunks(values, chunk_rows):
+                    model.partial_fit(scaler.transform(chunk))
+            labels = np.concatenate([model.predict(scaler.transform(chunk)) for chunk in _chunks(values, chunk_rows)])
+        else:
+            labels = model.fit_predict(scaler.transform(values))
+
+    scaled_centers = pd.DataFrame(model.cluster_centers_, columns=columns)
+    centers = pd.DataFrame(scaler.inverse_transform(model.cluster_centers_), columns=columns)
+    return labels, centers, scaled_centers
+
+
+def label_centers(scaled_centers: pd.DataFrame) -> dict:
+    """cluster -> growing / decaying / obsolete by standardized center slope (the original mapping)."""
+    return {
+        cluster: "growing" if slope > SLOPE_CUTOFF else ("decaying" if slope < -SLOPE_CUTOFF else "obsolete")
+        for cluster, slope in scaled_centers["slope"].items()
+    }
+
+
+def cluster_products(features_df: pd.DataFrame, state_path: str = None, key: str = "product", **fit_options):
+    """
+    Adds cluster and category columns to a features table.
+
+    With state_path, the previous run's centers (if any) warm-start the fit and
+    this run's centers are saved back. Returns (features_df, centers).
+    """
+    X = features_df.drop(columns=[key])
+    labels, centers, scaled_centers = fit_clusters(X, init_centers=load_cluster_state(state_path), **fit_options)
+    if state_path:
+        save_cluster_state(state_path, centers)
+
+    features_df = features_df.assign(cluster=labels)
+    features_df["category"] = features_df["cluster"].map(label_centers(scaled_centers))
+    return features_df, centers
@@ -0,0 +1,122 @@
+from collections import defaultdict
+from difflib import SequenceMatcher
+import numpy as np
+from dataset_cache import DatasetCache, get_dataset
+from monthly_rollup import normalize_product
+from tracing import span
+
+# ------------------ MATCHER CONFIG ------------------
+MATCH_CUTOFF = 0.6  # same threshold the tools used with difflib.get_close_matches
+CANDIDATE_POOL = 15  # best trigram candidates re-scored with SequenceMatcher
+COMMON_GRAM_SHARE = 0.05  # trigrams in more than this share of products are skipped when rarer ones exist
+MATCHER_CACHE_MB = 128
+
+
+def _trigrams(key: str) -> set:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+# ------------------ MATCHER INDEX ------------------
+class ProductMatcher:
+    """
+    Product-name lookup index for one catalog.
+
+    Exact matches are a dict lookup on the normalized name. Everything else
+    goes through a trigram inverted index: the products sharing the most
+    trigrams with the query (by Dice coefficient) form a small candidate pool,
+    which is then scored with difflib's ratio so results line up with the old
+    get_close_matches behaviour.
+    """
+
+    def __init__(self, products):
+        self.products = list(products)
+        self.keys = [normalize_product(p) for p in self.products]
+        self._exact = {}
+        for i, key in enumerate(self.keys):
+            self._exact.setdefault(key, i)
+
+        postings = defaultdict(list)
+        gram_counts = np.zeros(len(self.keys), dtype=np.int32)
+        for i, key in enumerate(self.keys):
+            grams = _trigrams(key)
+            gram_counts[i] = len(grams)
+            for gram in grams:
+                postings[gram].append(i)
+        self._postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+        self._gram_counts = gram_counts
+
+    def __len__(self):
+        return len(self.products)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(ids.nbytes for ids in self._postings.values()) + 200 * len(self.products)
+
+    def exact(self, product_name: str):
+        """Canonical product name for a case/whitespace-insensitive match, else None."""
+        i = self._exact.get(normalize_product(product_name))
+        return None if i is None else self.products[i]
+
+    def suggest(self, product_name: str, k: int = 5, cutoff: float = MATCH_CUTOFF) -> list:
+        """Top-k [(product, score)] with score >= cutoff, best first."""
+        key = normalize_product(product_name)
+        grams = _trigrams(key)
+        hits = [self._postings[g] for g in grams if g in self._postings]
+        if not hits:
+            return []
+        rare = [ids for ids in hits if len(ids) <= COMMON_GRAM_SHARE * len(self.products)]
+        if len(rare) >= 3:
+            hits = rare
+
+        overlap = np.bincount(np.concatenate(hits), minlength=len(self.products))
+        ids = np.flatnonzero(overlap)
+        dice = 2.0 * overlap[ids] / (len(grams) + self._gram_counts[ids])
+        if len(ids) > CANDIDATE_POOL:
+            ids = ids[np.argpartition(-dice, CANDIDATE_POOL - 1)[:CANDIDATE_POOL]]
+
+        # Same cheap-bound-first scoring as get_close_matches (seq2 is the query, analysed once)
+        matcher = SequenceMatcher()
+        matcher.set_seq2(key)
+        scored = []
+        for i in ids:
+            matcher.set_seq1(self.keys[i])
+            if matcher.real_quick_ratio() >= cutoff and matcher.quick_ratio() >= cutoff:
+                score = matcher.ratio()
+                if score >= cutoff:
+                    scored.append((self.products[i], round(score, 4)))
+        scored.sort(key=lambda item: -item[1])
+        return scored[:k]
+
+    def match(self, product_name: str, k: int = 5) -> dict:
+        """validate_product_name-style result: valid / suggest (+ scored candidates) / invalid."""
+        exact = self.exact(product_name)
+        if exact is not None:
+            return {"status": "valid", "product_name": exact}
+
+        suggestions = self.suggest(product_name, k=k)
+        if suggestions:
+            return {
+                "status": "suggest",
+                "suggestion": suggestions[0][0],
+                "candidates": [{"product_name": p, "score": s} for p, s in suggestions],
+            }
+        return {"status": "invalid", "suggestion": None}
+
+
+def _load_matcher(source_path: str) -> ProductMatcher:
+    df = get_dataset(source_path)
+    with span("index.product_matcher") as s:
+        products = sorted(df["product"].dropna().unique())
+        s.set(products=len(products))
+        return ProductMatcher(products)
+
+
+MATCHER_CACHE = DatasetCache(
+    max_bytes=MATCHER_CACHE_MB * 2**20, loader=_load_matcher, sizeof=lambda m: m.nbytes, name="product_matcher"
+)
+
+
+def get_matcher(source_path: str) -> ProductMatcher:
+    """Matcher for a sales file's catalog, rebuilt only when the file changes."""
+    return MATCHER_CACHE.get(source_path)
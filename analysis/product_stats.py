@@ -0,0 +1,272 @@
+import numpy as np
+import pandas as pd
+from clustering_features import RECENT_DAYS, merge_moments
+from dataset_cache import get_dataset
+from sales_store import is_fresh, dataset_signature, write_artifact, read_artifact
+
+# ------------------ STATS CONFIG ------------------
+STATS_KIND = "product_stats_v2"
+TAIL_KIND = "product_tail_v2"  # each product's rows inside its longest window and just past its midpoint
+WINDOWS = [30, 60, RECENT_DAYS]  # days, ending at the product's last sale (as in the clustering features)
+MID_DAYS = max(WINDOWS)  # days of rows kept past each product's midpoint, so the half split slides without a read
+_MOMENTS = ["rows", "mean_x", "mean_y", "cxx", "cxy", "cyy"]
+
+
+def _group_sum(codes, values, n_groups):
+    return np.bincount(codes, weights=values, minlength=n_groups)
+
+
+def _group_dates(codes, dates, n_groups, how):
+    """Per-group min / max of a datetime64 array (NaT for groups without rows)."""
+    out = pd.Series(dates).groupby(codes).agg(how)
+    return out.reindex(range(n_groups)).to_numpy(dtype="datetime64[ns]")
+
+
+def _rows(df: pd.DataFrame, key: str):
+    df = df.dropna(subset=[key, "date"])
+    return (
+        df[key].astype(str).to_numpy(),
+        df["date"].to_numpy(dtype="datetime64[ns]"),
+        df["total_orders"].to_numpy(dtype=float),
+    )
+
+
+# ------------------ GROUPED STATISTICS ------------------
+def _moments(codes, dates, y, first, n_groups) -> dict:
+    """Row count, means and co-moments of (days since first sale, orders) per product."""
+    x = (dates - first[codes]) / np.timedelta64(1, "D")
+    n = np.bincount(codes, minlength=n_groups).astype(float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_x = np.nan_to_num(_group_sum(codes, x, n_groups) / n)
+        mean_y = np.nan_to_num(_group_sum(codes, y, n_groups) / n)
+    dx = x - mean_x[codes]
+    dy = y - mean_y[codes]
+    return {"n": n, "mean_x": mean_x, "mean_y": mean_y, "cxx": _group_sum(codes, dx * dx, n_groups),
+            "cxy": _group_sum(codes, dx * dy, n_groups), "cyy": _group_sum(codes, dy * dy, n_groups)}
+
+
+def _months(codes, dates, n_groups):
+    """Distinct months per product and each product's latest month (as month ordinals)."""
+    month = dates.astype("datetime64[M]").astype(np.int64)
+    pairs = np.unique(codes.astype(np.int64) * 100_000 + month)
+    count = np.bincount(pairs // 100_000, minlength=n_groups)
+    latest = np.full(n_groups, -1, dtype=np.int64)
+    np.maximum.at(latest, codes, month)
+    return count, latest
+
+
+def _windows(codes, dates, y, last, n_groups) -> dict:
+    """Orders and row counts of the last WINDOWS days before each product's last sale."""
+    out = {}
+    for days in WINDOWS:
+        inside = dates >= (last - np.timedelta64(days, "D"))[codes]
+        out[f"sales_{days}d"] = _group_sum(codes, y * inside, n_groups)
+        out[f"rows_{days}d"] = _group_sum(codes, inside.astype(float), n_groups)
+    return out
+
+
+def _midpoint(first, last):
+    return first + (last - first) / 2
+
+
+def _in_tail(codes, dates, last, mid, mid_until):
+    """Rows the tail keeps: the longest window, plus the rows in (mid, mid_until] for the half split."""
+    in_window = dates >= (last - np.timedelta64(max(WINDOWS), "D"))[codes]
+    return in_window | ((dates > mid[codes]) & (dates <= mid_until[codes]))
+
+
+# ------------------ BUILD ------------------
+def build_product_stats(df: pd.DataFrame, key: str = "product"):
+    """
+    Running statistics of every product from a full sales frame, in one grouped pass.
+
+    Returns (stats, tail). stats has one row per product in first-appearance
+    order: first/last sale date, row / month counts, order totals, the moments
+    the slope and volatility come from, first-half orders (for the acceleration
+    feature) and orders / rows over the last 30, 60 and 90 days. tail holds each
+    product's rows inside its 90-day window and its first MID_DAYS days past the
+    midpoint (up to stats["mid_until"]), which is what update_product_stats
+    needs to slide the windows and the half split forward.
+    """
+    names, dates, y = _rows(df, key)
+    codes, products = pd.factorize(names, sort=False)
+    n_groups = len(products)
+    first = _group_dates(codes, dates, n_groups, "min")
+    last = _group_dates(codes, dates, n_groups, "max")
+
+    moments = _moments(codes, dates, y, first, n_groups)
+    months, last_month = _months(codes, dates, n_groups)
+    mid = _midpoint(first, last)
+    mid_until = mid + np.timedelta64(MID_DAYS, "D")
+    first_half = dates <= mid[codes]
+    stats = pd.DataFrame({
+        "product": products,
+        "first_date": first,
+        "last_date": last,
+        "last_month": last_month,
+        "months": months,
+        "total_orders": _group_sum(codes, y, n_groups),
+        "zero_rows": _group_sum(codes, (y == 0).astype(float), n_groups),
+        **{name: moments["n" if name == "rows" else name] for name in _MOMENTS},
+        "first_half_sum": _group_sum(codes, y * first_half, n_groups),
+        "first_half_rows": _group_sum(codes, first_half.astype(float), n_groups),
+        **_windows(codes, dates, y, last, n_groups),
+        "mid_until": mid_until,
+        "updated_at": pd.Timestamp.now().floor("s"),
+    })
+
+    in_tail = _in_tail(codes, dates, last, mid, mid_until)
+    tail = pd.DataFrame({"product": names[in_tail], "date": dates[in_tail], "total_orders": y[in_tail]})
+    return stats, tail
+
+
+# ------------------ INCREMENTAL UPDATE ------------------
+def _refill(stats, moved, window_start, new_mid, mid_until, read_range, key):
+    """
+    Stored rows that extend the midpoint buffer of the moved products that have
+    used up half of it, up to MID_DAYS past their new midpoint. Rows already in
+    the tail (inside the buffer or the old window) are left out. Products whose
+    buffers end within MID_DAYS of each other share one read_range call, so a
+    read spans a few months even when the midpoints are spread over years.
+
+    Returns (rows or None, refilled product codes).
+    """
+    low = moved[(mid_until[moved] < window_start[moved])
+                & (new_mid[moved] + np.timedelta64(MID_DAYS // 2, "D") > mid_until[moved])]
+    if not len(low):
+        return None, low
+
+    until = new_mid + np.timedelta64(MID_DAYS, "D")
+    products = stats["product"].to_numpy()
+    bins = (mid_until[low] - mid_until[low].min()) // np.timedelta64(MID_DAYS, "D")
+    rows = pd.concat([read_range(mid_until[group].min(), until[group].max(), products=list(products[group]))
+                      for group in (low[bins == b] for b in np.unique(bins))], ignore_index=True)
+    r_names, r_dates, r_y = _rows(rows, key)
+    r_codes = pd.Index(stats["product"]).get_indexer(r_names)
+    inside = np.isin(r_codes, low)
+    r_names, r_dates, r_y, r_codes = r_names[inside], r_dates[inside], r_y[inside], r_codes[inside]
+    missing = ((r_dates > mid_until[r_codes]) & (r_dates <= until[r_codes])
+               & (r_dates < window_start[r_codes]))
+    return pd.DataFrame({"product": r_names[missing], "date": r_dates[missing], "total_orders": r_y[missing]}), low
+
+
+def update_product_stats(stats: pd.DataFrame, tail: pd.DataFrame, new_rows: pd.DataFrame, read_range, key: str = "product"):
+    """
+    Folds rows dated after the last stored date into (stats, tail) and returns
+    (stats, tail, touched products). Products without new rows keep their row as is.
+
+    Totals, counts and moments are merged from the new rows alone, the windows
+    are recomputed from the tail. The first-half split moves with a product's
+    last date; the rows crossing its old → new midpoint come from the tail,
+    which keeps MID_DAYS of rows past each midpoint. When half of a product's
+    buffer is used up, its next rows are read back with read_range(start, end,
+    products=...), which returns the stored rows of those products dated in
+    (start, end] (e.g. functools.partial(sales_store.read_sales_range, source_path)).
+    """
+    names, dates, y = _rows(new_rows, key)
+    if not len(names):
+        return stats, tail, []
+
+    known = pd.Index(stats["product"])
+    added = [name for name in pd.unique(names) if name not in known]
+    if added:
+        stats = pd.concat([stats, pd.DataFrame({"product": added})], ignore_index=True)
+    stats = stats.copy()
+    n_groups = len(stats)
+    codes = pd.Index(stats["product"]).get_indexer(names)
+    touched = np.unique(codes)
+    is_new = np.zeros(n_groups, dtype=bool)
+    is_new[len(known):] = True
+
+    old_last = stats["last_date"].to_numpy(dtype="datetime64[ns]", copy=True)
+    first = stats["first_date"].to_numpy(dtype="datetime64[ns]", copy=True)
+    first[is_new] = _group_dates(codes, dates, n_groups, "min")[is_new]
+    last = old_last.copy()
+    last[touched] = _group_dates(codes, dates, n_groups, "max")[touched]
+
+    # Additive statistics (products without new rows get a zero contribution)
+    old = {"n" if name == "rows" else name: stats[name].fillna(0.0).to_numpy(dtype=float) for name in _MOMENTS}
+    merged = merge_moments(old, _moments(codes, dates, y, first, n_groups))
+    new_months, new_last_month = _months(codes, dates, n_groups)
+    last_month = stats["last_month"].fillna(-1).to_numpy(dtype=np.int64)
+    months = stats["months"].fillna(0).to_numpy(dtype=np.int64) + new_months - (new_last_month == last_month) * (new_months > 0)
+    stats["first_date"] = first
+    stats["last_date"] = last
+    stats["last_month"] = np.maximum(last_month, new_last_month)
+    stats["months"] = months
+    stats["total_orders"] = stats["total_orders"].fillna(0.0) + _group_sum(codes, y, n_groups)
+    stats["zero_rows"] = stats["zero_rows"].fillna(0.0) + _group_sum(codes, (y == 0).astype(float), n_groups)
+    for name in _MOMENTS:
+        stats[name] = merged["n" if name == "rows" else name]
+
+    # Tail: the new rows, plus stored rows for products whose midpoint buffer runs low
+    window = np.timedelta64(max(WINDOWS), "D")
+    old_mid, new_mid = _midpoint(first, old_last), _midpoint(first, last)
+    mid_until = stats["mid_until"].to_numpy(dtype="datetime64[ns]", copy=True)
+    moved = touched[~is_new[touched]]
+    refill, refilled = _refill(stats, moved, old_last - window, new_mid, mid_until, read_range, key)
+    tail = pd.concat([tail, pd.DataFrame({"product": names, "date": dates, "total_orders": y}), refill],
+                     ignore_index=True)
+    t_codes = pd.Index(stats["product"]).get_indexer(tail["product"])
+    t_dates = tail["date"].to_numpy(dtype="datetime64[ns]")
+    t_y = tail["total_orders"].to_numpy(dtype=float)
+
+    # First half: new products from their new rows, known ones by the tail rows crossing the midpoint
+    first_half_sum = stats["first_half_sum"].fillna(0.0).to_numpy(dtype=float, copy=True)
+    first_half_rows = stats["first_half_rows"].fillna(0.0).to_numpy(dtype=float, copy=True)
+    below = (dates <= new_mid[codes]) & is_new[codes]
+    first_half_sum += _group_sum(codes, y * below, n_groups)
+    first_half_rows += _group_sum(codes, below.astype(float), n_groups)
+    is_moved = np.zeros(n_groups, dtype=bool)
+    is_moved[moved] = True
+    crossed = is_moved[t_codes] & (t_dates > old_mid[t_codes]) & (t_dates <= new_mid[t_codes])
+    first_half_sum += _group_sum(t_codes, t_y * crossed, n_groups)
+    first_half_rows += _group_sum(t_codes, crossed.astype(float), n_groups)
+    stats["first_half_sum"] = first_half_sum
+    stats["first_half_rows"] = first_half_rows
+
+    # The tail now holds every row past the old midpoint of new, refilled and window-adjacent products
+    contiguous = is_new[touched] | (mid_until[touched] >= (old_last - window)[touched])
+    reset = np.union1d(touched[contiguous], refilled)
+    mid_until[reset] = new_mid[reset] + np.timedelta64(MID_DAYS, "D")
+    stats["mid_until"] = mid_until
+
+    # Windows: slide each touched product's tail forward, recompute from it
+    kept = _in_tail(t_codes, t_dates, last, new_mid, mid_until)
+    tail = tail[kept].reset_index(drop=True)
+    windows = _windows(t_codes[kept], t_dates[kept], t_y[kept], last, n_groups)
+    for name, values in windows.items():
+        stats.loc[touched, name] = values[touched]
+
+    stats.loc[touched, "updated_at"] = pd.Timestamp.now().floor("s")
+    return stats, tail, list(stats["product"].to_numpy()[touched])
+
+
+# ------------------ FEATURES ------------------
+def features_from_stats(stats: pd.DataFrame) -> pd.DataFrame:
+    """The clustering feature table (same columns and order as extract_features) from running statistics."""
+    n = stats["rows"].to_numpy(dtype=float)
+    first_sum, first_n = stats["first_half_sum"], stats["first_half_rows"]
+    total = stats["total_orders"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        features = {
+            "slope": np.where(stats["cxx"] > 0, stats["cxy"] / stats["cxx"], 0.0),
+            "total_sales": total.to_numpy(),
+            "avg_monthly_sales": (total / stats["months"]).to_numpy(),
+            "sales_volatility": np.where(n > 1, np.sqrt(stats["cyy"] / (n - 1)), np.nan),
+            "zero_sales_days_pct": (stats["zero_rows"] / n).to_numpy(),
+            "recent_sales_avg": (stats[f"sales_{RECENT_DAYS}d"] / stats[f"rows_{RECENT_DAYS}d"]).to_numpy(),
+            "sales_acceleration": ((total - first_sum) / (n - first_n) - first_sum / first_n).to_numpy(),
+        }
+    return pd.DataFrame({"product": stats["product"].to_numpy(), **features})
+
+
+# ------------------ STORED STATS ------------------
+def load_product_stats(source_path: str) -> pd.DataFrame:
+    """Running statistics of a sales file, fully rebuilt only when they are stale (see sales_append)."""
+    if not (is_fresh(source_path, STATS_KIND) and is_fresh(source_path, TAIL_KIND)):
+        signature = dataset_signature(source_path)
+        stats, tail = build_product_stats(get_dataset(source_path))
+        write_artifact(source_path, tail, signature, TAIL_KIND)
+        write_artifact(source_path, stats, signature, STATS_KIND)
+    return read_artifact(source_path, STATS_KIND)
@@ -0,0 +1,85 @@
+import os
+import time
+import argparse
+from functools import partial
+import pandas as pd
+from monthly_rollup import ROLLUP_KIND, normalize_product, update_rollup
+from product_stats import STATS_KIND, TAIL_KIND, update_product_stats
+from trend_results import TRENDS_KIND, update_trend_results
+from sales_store import append_rows, dataset_signature, is_fresh, read_artifact, read_sales_range, write_artifact
+
+# ------------------ DAILY APPEND ------------------
+def append_sales(source_path: str, new_rows: pd.DataFrame) -> dict:
+    """
+    Ingests new sales rows (typically one day of orders) without re-reading the
+    history of source_path.
+
+    Rows dated after the dataset's watermark are stored as an appended part
+    (sales_store.append_rows); the monthly rollup, the per-product running
+    statistics (which the clustering features come from) and the trend table
+    are then updated from those rows alone, and only the products that appear
+    in them change. Artifacts that were already stale before the append are
+    left alone and get fully rebuilt by their loader on next use, as before.
+
+    Returns a summary: rows stored, new watermark, products touched, artifacts
+    updated in place and seconds taken.
+    """
+    start = time.perf_counter()
+    current = {kind: is_fresh(source_path, kind) for kind in [ROLLUP_KIND, TRENDS_KIND, STATS_KIND, TAIL_KIND]}
+    stored = append_rows(source_path, new_rows)
+    summary = {"rows": len(stored), "watermark": None, "products": 0, "updated": []}
+    if stored.empty:
+        summary["seconds"] = round(time.perf_counter() - start, 3)
+        return summary
+    signature = dataset_signature(source_path)
+    summary["watermark"] = str(stored["date"].max())
+
+    if current[ROLLUP_KIND]:
+        rollup = update_rollup(read_artifact(source_path, ROLLUP_KIND), stored)
+        write_artifact(source_path, rollup, signature, ROLLUP_KIND)
+        summary["updated"].append(ROLLUP_KIND)
+        if current[TRENDS_KIND]:
+            keys = stored["product"].dropna().astype(str).map(normalize_product).unique()
+            results = update_trend_results(read_artifact(source_path, TRENDS_KIND), rollup, keys)
+            write_artifact(source_path, results, signature, TRENDS_KIND)
+            summary["updated"].append(TRENDS_KIND)
+
+    if current[STATS_KIND] and current[TAIL_KIND]:
+        stats, tail, touched = update_product_stats(
+            read_artifact(source_path, STATS_KIND),
+            read_artifact(source_path, TAIL_KIND),
+            stored,
+            read_range=partial(read_sales_range, source_path, columns=["product", "date", "total_orders"]),
+        )
+        write_artifact(source_path, tail, signature, TAIL_KIND)
+        write_artifact(source_path, stats, signature, STATS_KIND)
+        summary["updated"] += [STATS_KIND, TAIL_KIND]
+        summary["products"] = len(touched)
+    else:
+        summary["products"] = stored["product"].nunique()
+
+    summary["seconds"] = round(time.perf_counter() - start, 3)
+    return summary
+
+
+def read_new_rows(path: str) -> pd.DataFrame:
+    """New orders from a .csv or Excel file (same columns as the sales workbook)."""
+    if os.path.splitext(path)[1].lower() == ".csv":
+        return pd.read_csv(path)
+    return pd.read_excel(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Append new days of orders to a sales dataset")
+    parser.add_argument("source", help="Sales workbook, e.g. sales.xlsx")
+    parser.add_argument("new_rows", nargs="+", help=".csv / .xlsx files with the new rows, oldest first")
+    args = parser.parse_args()
+
+    for path in args.new_rows:
+        summary = append_sales(args.source, read_new_rows(path))
+        print(f"{os.path.basename(path):<24} {summary['rows']:>7,} rows  {summary['products']:>6,} products  "
+              f"watermark {summary['watermark']}  {summary['seconds']:>6.2f}s  updated: {', '.join(summary['updated']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+import os
+import json
+import tempfile
+import pandas as pd
+from tracing import span
+
+try:
+    import pyarrow  # noqa: F401
+    STORE_FORMAT = "parquet"
+except ImportError:  # pickle keeps the categorical / datetime dtypes too, just less compactly
+    STORE_FORMAT = "pickle"
+
+# ------------------ STORE CONFIG ------------------
+STORE_SUBDIR = ".sales_store"  # created next to each source workbook
+APPEND_KIND = "appended"  # manifest of the rows appended on top of the workbook
+
+
+# ------------------ NORMALIZATION ------------------
+def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Same header cleanup the tools applied after every pd.read_excel."""
+    df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_")
+    return df
+
+
+def _normalize_sales(df: pd.DataFrame) -> pd.DataFrame:
+    """Typed, dictionary-encoded version of a raw sales sheet."""
+    df = normalize_columns(df)
+    if "product" in df.columns:
+        product = df["product"].where(df["product"].isna(), df["product"].astype(str).str.strip())
+        df["product"] = product.astype("category")
+    if "date" in df.columns:
+        df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    if "total_orders" in df.columns:
+        df["total_orders"] = pd.to_numeric(df["total_orders"], errors="coerce")
+    return df
+
+
+# ------------------ COLUMNAR COPY ------------------
+def columnar_path(source_path: str, kind: str = None) -> str:
+    """
+    Location of the columnar copy of a workbook, or of a derived artifact
+    (e.g. kind="monthly" for the monthly rollup) built from it.
+    """
+    folder, name = os.path.split(os.path.abspath(source_path))
+    stem = os.path.splitext(name)[0]
+    if kind:
+        stem = f"{stem}.{kind}"
+    return os.path.join(folder, STORE_SUBDIR, f"{stem}.{STORE_FORMAT}")
+
+
+def source_signature(source_path: str) -> dict:
+    """mtime + size of the source file; any change triggers a reconversion."""
+    stat = os.stat(source_path)
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def dataset_signature(source_path: str) -> dict:
+    """
+    Version of the whole dataset: the workbook's signature plus the number of
+    appended parts. Derived artifacts (rollups, trend tables, ...) are tagged
+    with it, so they go stale on an append as well as on a workbook change.
+    """
+    return {**source_signature(source_path), "appended": len(appended_parts(source_path))}
+
+
+def _read_signature(store_path: str):
+    try:
+        with open(store_path + ".json", "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _atomic_write(path: str, write):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def is_fresh(source_path: str, kind: str = None) -> bool:
+    """True when the columnar copy (or derived artifact) matches the current source file (and appends)."""
+    store_path = columnar_path(source_path, kind)
+    expected = source_signature(source_path) if kind is None else dataset_signature(source_path)
+    return os.path.exists(store_path) and _read_signature(store_path) == expected
+
+
+def write_artifact(source_path: str, df: pd.DataFrame, signature: dict, kind: str = None) -> str:
+    """Atomically stores a frame derived from source_path, tagged with the source signature it was built from."""
+    store_path = columnar_path(source_path, kind)
+    os.makedirs(os.path.dirname(store_path), exist_ok=True)
+    if STORE_FORMAT == "parquet":
+        _atomic_write(store_path, lambda tmp: df.to_parquet(tmp, index=False))
+    else:
+        _atomic_write(store_path, lambda tmp: df.to_pickle(tmp))
+
+    def write_signature(tmp):
+        with open(tmp, "w") as f:
+            json.dump(signature, f)
+    _atomic_write(store_path + ".json", write_signature)
+    return store_path
+
+
+def read_artifact(source_path: str, kind: str = None, columns=None, filters=None) -> pd.DataFrame:
+    """
+    Reads the columnar copy or a derived artifact.
+
+    :param filters: Optional pyarrow-style row filters, e.g. [("date", ">", ts)]; with
+                    parquet, row groups whose statistics rule them out are skipped
+    """
+    store_path = columnar_path(source_path, kind)
+    with span("data.read_artifact", source=os.path.basename(source_path), kind=kind or "sales") as s:
+        if STORE_FORMAT == "parquet":
+            df = pd.read_parquet(store_path, columns=columns, filters=filters)
+        else:
+            df = pd.read_pickle(store_path)
+            for column, op, value in filters or []:
+                df = df[_FILTER_OPS[op](df[column], value)]
+            df = df[columns] if columns is not None else df
+        s.set(rows=len(df), file_bytes=os.path.getsize(store_path))
+        return df
+
+
+_FILTER_OPS = {
+    ">": lambda s, v: s > v, ">=": lambda s, v: s >= v,
+    "<": lambda s, v: s < v, "<=": lambda s, v: s <= v,
+    "in": lambda s, v: s.isin(v),
+}
+
+
+def convert_workbook(source_path: str) -> str:
+    """Parses the workbook once and writes its columnar copy. Returns the copy's path."""
+    signature = source_signature(source_path)
+    with span("data.read_excel", source=os.path.basename(source_path), file_bytes=signature["size"]) as s:
+        df = _normalize_sales(pd.read_excel(source_path))
+        s.set(rows=len(df))
+    store_path = write_artifact(source_path, df, signature)
+    _reconcile_appends(source_path, df, signature)
+    return store_path
+
+
+# ------------------ APPENDS ------------------
+def _manifest_path(source_path: str) -> str:
+    return os.path.splitext(columnar_path(source_path, APPEND_KIND))[0] + ".json"
+
+
+def _read_manifest(source_path: str):
+    try:
+        with open(_manifest_path(source_path), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(source_path: str, manifest: dict):
+    def write(tmp):
+        with open(tmp, "w") as f:
+            json.dump(manifest, f)
+    _atomic_write(_manifest_path(source_path), write)
+
+
+_appended = {}  # manifest path -> (inode, mtime_ns, size), parts
+
+
+def appended_parts(source_path: str) -> list:
+    """
+    Artifact kinds of the parts appended on top of the workbook, oldest first.
+    Every dataset_signature needs this, so the manifest is parsed again only
+    when its file changes (each write replaces it); otherwise it costs one stat.
+    """
+    path = _manifest_path(source_path)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return []
+    version = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    cached = _appended.get(path)
+    if cached is None or cached[0] != version:
+        manifest = _read_manifest(source_path)
+        cached = _appended[path] = (version, manifest["parts"] if manifest else [])
+    return list(cached[1])
+
+
+def _reconcile_appends(source_path: str, base: pd.DataFrame, signature: dict):
+    """
+    After a reconversion, drops appended rows the workbook now covers itself
+    (dated on or before its last date), so nothing is counted twice.
+    """
+    manifest = _read_manifest(source_path)
+    if not manifest or manifest["source"] == signature:
+        return
+    base_watermark = base["date"].max()
+    parts, watermark = [], base_watermark
+    for kind in manifest["parts"]:
+        part = read_artifact(source_path, kind)
+        kept = part[part["date"] > base_watermark] if pd.notna(base_watermark) else part
+        if kept.empty:
+            os.remove(columnar_path(source_path, kind))
+            os.remove(columnar_path(source_path, kind) + ".json")
+            continue
+        if len(kept) < len(part):
+            write_artifact(source_path, kept.reset_index(drop=True), signature, kind)
+        part = kept
+        parts.append(kind)
+        watermark = part["date"].max() if pd.isna(watermark) else max(watermark, part["date"].max())
+    manifest.update(source=signature, parts=parts, watermark=None if pd.isna(watermark) else str(watermark))
+    _write_manifest(source_path, manifest)
+
+
+def _stored_columns(source_path: str) -> list:
+    if STORE_FORMAT == "parquet":
+        import pyarrow.parquet as pq
+        return pq.read_schema(columnar_path(source_path)).names
+    return list(read_artifact(source_path).columns)
+
+
+def sales_watermark(source_path: str):
+    """Latest date in the stored dataset (workbook + appends), or None when it has no dated rows."""
+    manifest = _read_manifest(source_path)
+    if manifest is not None:
+        return pd.Timestamp(manifest["watermark"]) if manifest["watermark"] else None
+    latest = read_artifact(source_path, columns=["date"])["date"].max()
+    return None if pd.isna(latest) else latest
+
+
+def append_rows(source_path: str, new_rows: pd.DataFrame) -> pd.DataFrame:
+    """
+    Stores the rows of new_rows dated after the dataset's watermark as a new
+    appended part, leaving the workbook and its columnar copy untouched.
+
+    Rows on or before the watermark (already ingested) and rows without a
+    date are dropped. Returns the normalized rows that were stored.
+    """
+    if not os.path.exists(source_path):
+        raise FileNotFoundError(f"Sales file not found: {source_path}")
+    if not is_fresh(source_path):
+        convert_workbook(source_path)
+
+    manifest = _read_manifest(source_path)
+    if manifest is None:
+        watermark = sales_watermark(source_path)
+        manifest = {
+            "source": source_signature(source_path),
+            "columns": _stored_columns(source_path),
+            "parts": [],
+            "watermark": None if watermark is None else str(watermark),
+        }
+
+    new_rows = _normalize_sales(new_rows.copy()).reindex(columns=manifest["columns"])
+    new_rows = new_rows.dropna(subset=["date"])
+    if manifest["watermark"]:
+        new_rows = new_rows[new_rows["date"] > pd.Timestamp(manifest["watermark"])]
+    new_rows = new_rows.reset_index(drop=True)
+    if new_rows.empty:
+        return new_rows
+
+    number = int(manifest["parts"][-1].rsplit("-", 1)[1]) + 1 if manifest["parts"] else 1
+    kind = f"{APPEND_KIND}-{number:05d}"
+    write_artifact(source_path, new_rows, manifest["source"], kind)
+    manifest["parts"].append(kind)
+    manifest["watermark"] = str(new_rows["date"].max())
+    _write_manifest(source_path, manifest)
+    return new_rows
+
+
+def _with_appends(source_path: str, df: pd.DataFrame, columns=None, filters=None) -> pd.DataFrame:
+    parts = [read_artifact(source_path, kind, columns=columns, filters=filters) for kind in appended_parts(source_path)]
+    if not parts:
+        return df
+    df = pd.concat([df, *parts], ignore_index=True)
+    if "product" in df.columns:
+        df["product"] = df["product"].astype("category")
+    return df
+
+
+# ------------------ READ API ------------------
+def load_sales(source_path: str, columns=None) -> pd.DataFrame:
+    """
+    Reads a sales workbook through its columnar copy, converting it first if the
+    copy is missing or the workbook changed since the last conversion.
+
+    Columns come back normalized (lower-case, underscores), `product` stripped and
+    categorical, `date` as datetime64 (unparseable dates become NaT). Rows added
+    with append_rows follow the workbook's rows.
+    """
+    if not os.path.exists(source_path):
+        raise FileNotFoundError(f"Sales file not found: {source_path}")
+
+    with span("data.load_sales", source=os.path.basename(source_path)) as s:
+        converted = not is_fresh(source_path)
+        if converted:
+            convert_workbook(source_path)
+        df = _with_appends(source_path, read_artifact(source_path, columns=columns), columns)
+        s.set(converted=converted, rows=len(df))
+        return df
+
+
+def read_sales_range(source_path: str, start, end, columns=None, products=None) -> pd.DataFrame:
+    """
+    Rows dated in (start, end] from the workbook and its appends. With parquet the
+    filters are pushed down to the reader, so only matching rows are materialized.
+
+    :param products: Optional product names; only their rows are returned
+    """
+    if not is_fresh(source_path):
+        convert_workbook(source_path)
+    filters = [("date", ">", pd.Timestamp(start)), ("date", "<=", pd.Timestamp(end))]
+    if products is not None:
+        filters.append(("product", "in", list(products)))
+    return _with_appends(source_path, read_artifact(source_path, columns=columns, filters=filters), columns, filters)
+
+
+def iter_sales_chunks(source_path: str, chunk_rows: int = 1_000_000, columns=None):
+    """
+    Yields a sales workbook's rows in chunks of about chunk_rows, read from its
+    columnar copy (converted first if stale). With parquet only one batch is in
+    memory at a time; the pickle fallback has to load the frame and slice it.
+    Appended parts come last, one chunk each.
+    """
+    if not os.path.exists(source_path):
+        raise FileNotFoundError(f"Sales file not found: {source_path}")
+
+    if not is_fresh(source_path):
+        convert_workbook(source_path)
+    if STORE_FORMAT == "parquet":
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(columnar_path(source_path)).iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+    else:
+        df = read_artifact(source_path, columns=columns)
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows]
+    for kind in appended_parts(source_path):
+        yield read_artifact(source_path, kind, columns=columns)
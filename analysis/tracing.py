@@ -0,0 +1,385 @@
+import os
+import json
+import time
+import queue
+import atexit
+import random
+import argparse
+import functools
+import statistics
+import threading
+import contextvars
+from collections import defaultdict
+
+# ------------------ TRACING CONFIG ------------------
+SERVICE_NAME = "sales-agent"
+OTLP_ENDPOINT = "http://localhost:4318/v1/traces"  # OpenTelemetry Collector, OTLP/HTTP
+OTLP_BATCH_SIZE = 256
+OTLP_FLUSH_SECONDS = 2.0
+OTLP_QUEUE_SIZE = 10_000  # spans beyond this are dropped (and counted) rather than blocking callers
+
+_exporters = []  # empty: tracing is off and span() costs one list check
+_current = contextvars.ContextVar("current_span", default=None)
+
+
+# ------------------ SPANS ------------------
+class Span:
+    """
+    One timed stage (LLM call, tool, data load, aggregation) with its attributes.
+
+    As a context manager the span becomes the parent of the spans opened inside
+    it (per thread / asyncio task) and records the exception that ends it, if
+    any. Spans that can't nest lexically (a generator streaming a response) are
+    opened without `with` and closed with end().
+    """
+
+    recording = True
+
+    def __init__(self, name: str, attrs: dict, parent):
+        self.name = name
+        self.attrs = attrs
+        self.trace_id = parent.trace_id if parent is not None else f"{random.getrandbits(128):032x}"
+        self.parent_id = parent.span_id if parent is not None else None
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.start = time.time()
+        self.error = None
+        self._t0 = time.perf_counter()
+        self._token = None
+        self._ended = False
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+        return self
+
+    def __enter__(self):
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current.reset(self._token)
+        if exc_type is not None and self.error is None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        self.end()
+        return False
+
+    def end(self):
+        if self._ended:
+            return
+        self._ended = True
+        record = {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": round(self.start, 6),
+            "duration_ms": round((time.perf_counter() - self._t0) * 1000, 3),
+            "attrs": self.attrs,
+            "error": self.error,
+            "thread": threading.current_thread().name,
+        }
+        for exporter in _exporters:
+            exporter.export(record)
+
+
+class _NoopSpan:
+    recording = False
+
+    def set(self, **attrs):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def end(self):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name: str, **attrs):
+    """
+    Starts a span under the current one (a new trace if there is none).
+    Attributes that are costly to compute should be set only `if s.recording`.
+    """
+    if not _exporters:
+        return _NOOP
+    return Span(name, attrs, _current.get())
+
+
+def traced(name: str = None, record_size: bool = True, **attrs):
+    """
+    Decorator: runs the function inside a span (default name: the function's).
+    With record_size, len(result) is kept as result_size (rows, products, months...).
+    """
+    def decorate(fn):
+        stage = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _exporters:
+                return fn(*args, **kwargs)
+            with Span(stage, dict(attrs), _current.get()) as s:
+                result = fn(*args, **kwargs)
+                if record_size and hasattr(result, "__len__"):
+                    s.set(result_size=len(result))
+                return result
+        return wrapper
+    return decorate
+
+
+# ------------------ EXPORTERS ------------------
+class JsonlExporter:
+    """Appends one JSON object per finished span to a file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8", buffering=1)
+        self._lock = threading.Lock()
+
+    def export(self, record: dict):
+        line = json.dumps(record, default=str)
+        with self._lock:
+            if not self._file.closed:  # spans still ending while tracing shuts down
+                self._file.write(line + "\n")
+
+    def shutdown(self):
+        with self._lock:
+            self._file.close()
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def otlp_span(record: dict) -> dict:
+    """A span record in the OTLP/JSON encoding."""
+    start_ns = int(record["start"] * 1e9)
+    encoded = {
+        "traceId": record["trace_id"],
+        "spanId": record["span_id"],
+        "name": record["name"],
+        "kind": 1,  # SPAN_KIND_INTERNAL
+        "startTimeUnixNano": str(start_ns),
+        "endTimeUnixNano": str(start_ns + int(record["duration_ms"] * 1e6)),
+        "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in record["attrs"].items()]
+                      + [{"key": "thread.name", "value": {"stringValue": record["thread"]}}],
+        "status": {"code": 2, "message": record["error"]} if record["error"] else {"code": 0},
+    }
+    if record["parent_id"]:
+        encoded["parentSpanId"] = record["parent_id"]
+    return encoded
+
+
+class OtlpExporter:
+    """
+    Sends spans to an OpenTelemetry collector over OTLP/HTTP (JSON encoding),
+    batched on a background thread so traced code never waits on the network.
+    Needs no OpenTelemetry packages. Spans are dropped (and counted) when the
+    queue is full or the collector can't be reached.
+    """
+
+    def __init__(self, endpoint: str = OTLP_ENDPOINT, service_name: str = SERVICE_NAME,
+                 batch_size: int = OTLP_BATCH_SIZE, flush_seconds: float = OTLP_FLUSH_SECONDS):
+        self.endpoint = endpoint
+        self.resource = {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]}
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._queue = queue.Queue(maxsize=OTLP_QUEUE_SIZE)
+        self.sent = 0
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name="otlp-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, record: dict):
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            batch, stop = [], False
+            deadline = time.monotonic() + self.flush_seconds
+            while len(batch) < self.batch_size:
+                try:
+                    record = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if record is None:  # shutdown
+                    stop = True
+                    break
+                batch.append(record)
+            if batch:
+                self._send(batch)
+            if stop:
+                return
+
+    def _send(self, records: list):
+        import urllib.request  # exporter thread only; keeps `import tracing` light
+        payload = {"resourceSpans": [{
+            "resource": self.resource,
+            "scopeSpans": [{"scope": {"name": "tracing"}, "spans": [otlp_span(r) for r in records]}],
+        }]}
+        request = urllib.request.Request(self.endpoint, data=json.dumps(payload, default=str).encode(),
+                                         headers={"Content-Type": "application/json"}, method="POST")
+        try:
+            urllib.request.urlopen(request, timeout=5).close()
+            self.sent += len(records)
+        except OSError:
+            self.dropped += len(records)
+
+    def shutdown(self, timeout: float = 5.0):
+        """Sends what is still queued."""
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+
+def configure_tracing(jsonl_path: str = None, otlp_endpoint: str = None, service_name: str = SERVICE_NAME):
+    """
+    Turns tracing on for the process (off again when neither target is given).
+
+    :param jsonl_path: File that gets one JSON line per span (see summarize / `python tracing.py`)
+    :param otlp_endpoint: OTLP/HTTP traces URL of a collector, e.g. OTLP_ENDPOINT
+    """
+    global _exporters
+    shutdown_tracing()
+    exporters = []
+    if jsonl_path:
+        exporters.append(JsonlExporter(jsonl_path))
+    if otlp_endpoint:
+        exporters.append(OtlpExporter(otlp_endpoint, service_name))
+    _exporters = exporters
+
+
+def shutdown_tracing():
+    """Flushes and closes the exporters; tracing is off afterwards."""
+    global _exporters
+    exporters, _exporters = _exporters, []
+    for exporter in exporters:
+        exporter.shutdown()
+
+
+atexit.register(shutdown_tracing)
+
+
+# ------------------ SUMMARY ------------------
+def read_spans(path: str) -> list:
+    spans = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                spans.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue  # a line cut short by a crash
+    return spans
+
+
+def _percentile(sorted_values: list, q: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def summarize(spans: list) -> list:
+    """
+    Per-stage statistics, slowest total first: count, p50 / p95 / max duration,
+    total and self time (minus child spans), share of the traced wall time
+    (root spans), error count, cache hit rate and mean payload sizes where the
+    spans carry them.
+    """
+    children_ms = defaultdict(float)
+    for s in spans:
+        if s["parent_id"]:
+            children_ms[s["parent_id"]] += s["duration_ms"]
+    root_ms = sum(s["duration_ms"] for s in spans if not s["parent_id"]) or 1.0
+
+    stages = defaultdict(list)
+    for s in spans:
+        stages[s["name"]].append(s)
+
+    rows = []
+    for name, group in stages.items():
+        durations = sorted(s["duration_ms"] for s in group)
+        total = sum(durations)
+        hits = [s["attrs"]["cache_hit"] for s in group if "cache_hit" in s["attrs"]]
+        row = {
+            "stage": name,
+            "count": len(group),
+            "p50_ms": statistics.median(durations),
+            "p95_ms": _percentile(durations, 0.95),
+            "max_ms": durations[-1],
+            "total_ms": total,
+            "self_ms": sum(max(0.0, s["duration_ms"] - children_ms[s["span_id"]]) for s in group),
+            "share": total / root_ms,
+            "errors": sum(1 for s in group if s["error"]),
+            "cache_hit_rate": sum(hits) / len(hits) if hits else None,
+        }
+        for key in ("request_bytes", "response_bytes"):
+            sizes = [s["attrs"][key] for s in group if key in s["attrs"]]
+            row[key] = statistics.mean(sizes) if sizes else None
+        rows.append(row)
+    return sorted(rows, key=lambda row: -row["total_ms"])
+
+
+def format_tree(spans: list, trace_id: str) -> str:
+    """One trace as an indented tree of stages with durations and attributes."""
+    trace = sorted((s for s in spans if s["trace_id"] == trace_id), key=lambda s: s["start"])
+    children = defaultdict(list)
+    for s in trace:
+        children[s["parent_id"]].append(s)
+    known = {s["span_id"] for s in trace}
+    lines = []
+
+    def walk(s, depth):
+        attrs = " ".join(f"{k}={v}" for k, v in s["attrs"].items())
+        error = f"  ERROR {s['error']}" if s["error"] else ""
+        lines.append(f"{'  ' * depth}{s['name']:<{40 - 2 * depth}} {s['duration_ms']:>9.1f}ms  {attrs}{error}")
+        for child in children[s["span_id"]]:
+            walk(child, depth + 1)
+
+    for s in trace:
+        if s["parent_id"] is None or s["parent_id"] not in known:
+            walk(s, 0)
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage latency summary of a JSON-lines trace file")
+    parser.add_argument("trace_file")
+    parser.add_argument("--stage", help="Only stages whose name starts with this prefix (e.g. llm.)")
+    parser.add_argument("--slowest", type=int, default=0, help="Also print the N slowest traces as trees")
+    args = parser.parse_args()
+
+    spans = read_spans(args.trace_file)
+    traces = len({s["trace_id"] for s in spans})
+    print(f"{len(spans):,} spans in {traces:,} traces from {os.path.basename(args.trace_file)}\n")
+    print(f"{'stage':<32} {'count':>6} {'p50':>9} {'p95':>9} {'max':>9} {'self total':>11} {'share':>6} "
+          f"{'errors':>6} {'cache hit':>9} {'req B':>8} {'resp B':>8}")
+    for row in summarize(spans):
+        if args.stage and not row["stage"].startswith(args.stage):
+            continue
+        hit = f"{row['cache_hit_rate']:.0%}" if row["cache_hit_rate"] is not None else "-"
+        req = f"{row['request_bytes']:.0f}" if row["request_bytes"] is not None else "-"
+        resp = f"{row['response_bytes']:.0f}" if row["response_bytes"] is not None else "-"
+        print(f"{row['stage']:<32} {row['count']:>6} {row['p50_ms']:>7.1f}ms {row['p95_ms']:>7.1f}ms "
+              f"{row['max_ms']:>7.1f}ms {row['self_ms']:>9.0f}ms {row['share']:>6.1%} {row['errors']:>6} "
+              f"{hit:>9} {req:>8} {resp:>8}")
+
+    roots = sorted((s for s in spans if not s["parent_id"]), key=lambda s: -s["duration_ms"])
+    for root in roots[:args.slowest]:
+        print(f"\ntrace {root['trace_id']}\n{format_tree(spans, root['trace_id'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import numpy as np
+import pandas as pd
+from partitioning import ProductPartitions
+from grouped_ols import grouped_ols
+from tracing import traced
+
+# ------------------ CLASSIFIER CONFIG ------------------
+# Same monthly-level thresholds trend_growth.py used
+SLOPE_THRESHOLD = 5  # orders per day of month_index
+R2_THRESHOLD = 0.3
+RECENT_MONTHS = 3  # recent window: last month and the 3 before it
+MIN_RECENT_AVG = 1
+MAX_ZERO_SHARE = 0.5
+# Extensions
+SEASONAL_MIN_MONTHS = 24  # two yearly cycles before seasonality is judged
+SEASONAL_AUTOCORR = 0.3  # minimum lag-12 autocorrelation of the detrended series
+SEASONAL_CONTRAST = 0.5  # lag-12 minus lag-6 autocorrelation (curved trends score ~0 here)
+SEASONAL_MIN_CV = 0.15  # residual swings must be material, not noise around a clean trend
+VOLATILE_CV = 0.5  # residual std / mean monthly orders
+
+TREND_LABELS = ["Growing", "Decaying", "Seasonal", "Volatile", "Flat", "Obsolete", "Unclassified"]
+
+
+def _group_sum(codes, values, n_groups):
+    return np.bincount(codes, weights=values, minlength=n_groups)
+
+
+def _lag_autocorr(codes, month_ord, residual, lag, n_groups):
+    """Per-group correlation of residuals `lag` months apart (months may have gaps)."""
+    pairs = pd.DataFrame({"code": codes, "month": month_ord, "r": residual})
+    lagged = pairs.merge(pairs.assign(month=pairs["month"] + lag), on=["code", "month"], suffixes=("", "_lag"))
+    lag_codes = lagged["code"].to_numpy()
+    a, b = lagged["r"].to_numpy(), lagged["r_lag"].to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = _group_sum(lag_codes, a * b, n_groups) / np.sqrt(
+            _group_sum(lag_codes, a * a, n_groups) * _group_sum(lag_codes, b * b, n_groups)
+        )
+    return np.where(np.isfinite(corr), corr, 0.0)
+
+
+# ------------------ VECTORIZED CLASSIFIER ------------------
+def classify_trends(monthly_df: pd.DataFrame, key: str = "product_name", extended: bool = True) -> pd.DataFrame:
+    """
+    Labels every product of a monthly sales frame (key, month, total_orders) in one pass.
+
+    Per product: least-squares slope and R² of total_orders against days since
+    the product's first month, recent average and zero-sales share over the
+    last RECENT_MONTHS months, lag-12 minus lag-6 autocorrelation of the
+    detrended series (seasonality) and residual coefficient of variation
+    (volatility).
+
+    Labels follow trend_growth.py's rules (Growing / Decaying / Flat / Obsolete /
+    Unclassified). With extended=True, active products that are neither growing
+    nor decaying are labelled Seasonal or Volatile first when the series shows it.
+
+    Returns one row per product: product, slope, r_squared, recent_avg_sales,
+    zero_sales_pct_last_3m, seasonality, volatility, category.
+    """
+    partitions = ProductPartitions(monthly_df, key=key, sort_by="month")
+    frame = partitions.frame
+    n = len(partitions)
+    codes = partitions.codes
+    y = frame["total_orders"].to_numpy(dtype=float)
+    month = frame["month"].to_numpy(dtype="datetime64[M]")
+    month_ord = month.astype(np.int64)
+
+    # Days since each product's first month (trend_growth's month_index)
+    first_row = partitions.offsets[:-1]
+    x = (month.astype("datetime64[D]") - month[first_row][codes].astype("datetime64[D]")).astype(float)
+
+    # Closed-form regression for every product at once
+    fit = grouped_ols(codes, x, y, n_groups=n, return_residuals=True)
+    slope, r2, count, ss_res, residual = fit["slope"], fit["r2"], fit["count"], fit["ss_res"], fit["residuals"]
+    mean_y = np.bincount(codes, weights=y, minlength=n) / count
+
+    # Recent activity window
+    last_ord = month_ord[partitions.offsets[1:] - 1]
+    recent = month_ord >= last_ord[codes] - RECENT_MONTHS
+    recent_count = _group_sum(codes, recent.astype(float), n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        recent_avg = np.where(recent_count > 0, _group_sum(codes, y * recent, n) / recent_count, 0.0)
+        zero_share = np.where(recent_count > 0, _group_sum(codes, (recent & (y == 0)).astype(float), n) / recent_count, 1.0)
+
+    # Volatility: residual spread relative to the average level
+    with np.errstate(divide="ignore", invalid="ignore"):
+        volatility = np.where(mean_y > 0, np.sqrt(ss_res / count) / mean_y, 0.0)
+
+    # Seasonality: material detrended swings that repeat a year apart but not half a year apart
+    autocorr_12 = _lag_autocorr(codes, month_ord, residual, 12, n)
+    autocorr_6 = _lag_autocorr(codes, month_ord, residual, 6, n)
+    seasonality = np.where(count >= SEASONAL_MIN_MONTHS, autocorr_12 - autocorr_6, 0.0)
+    seasonal = (
+        (count >= SEASONAL_MIN_MONTHS) & (autocorr_12 >= SEASONAL_AUTOCORR)
+        & (seasonality >= SEASONAL_CONTRAST) & (volatility >= SEASONAL_MIN_CV)
+    )
+
+    growing = (slope > SLOPE_THRESHOLD) & (r2 > R2_THRESHOLD)
+    decaying = (slope < -SLOPE_THRESHOLD) & (r2 > R2_THRESHOLD)
+    flat = (np.abs(slope) <= SLOPE_THRESHOLD) & (r2 < R2_THRESHOLD) & (recent_avg >= MIN_RECENT_AVG)
+    obsolete = (recent_avg < MIN_RECENT_AVG) | (zero_share > MAX_ZERO_SHARE)
+    conditions, labels = [growing, decaying], ["Growing", "Decaying"]
+    if extended:
+        active = ~obsolete
+        conditions += [active & seasonal, active & (r2 < R2_THRESHOLD) & (volatility >= VOLATILE_CV)]
+        labels += ["Seasonal", "Volatile"]
+    category = np.select(conditions + [flat, obsolete], labels + ["Flat", "Obsolete"], default="Unclassified")
+
+    return pd.DataFrame({
+        "product": partitions.products,
+        "slope": np.round(slope, 4),
+        "r_squared": np.round(r2, 4),
+        "recent_avg_sales": np.round(recent_avg, 2),
+        "zero_sales_pct_last_3m": np.round(zero_share, 2),
+        "seasonality": np.round(seasonality, 4),
+        "volatility": np.round(volatility, 4),
+        "category": category,
+    })
+
+
+def _parse_months(keys: list) -> pd.DatetimeIndex:
+    """
+    Month of each key. get_monthly_sales writes "January 2025", but the keys
+    can come back from an LLM as "2025-01", "Jan 2025", ... so other formats are
+    parsed too; keys that still don't parse (or collide) are taken as
+    consecutive months in the order given.
+    """
+    for fmt in ["%B %Y", "mixed"]:
+        try:
+            months = pd.to_datetime(keys, format=fmt).to_period("M").to_timestamp()
+        except (ValueError, TypeError):
+            continue
+        if months.is_unique:
+            return months
+    return pd.date_range("2000-01-01", periods=len(keys), freq="MS")
+
+
+@traced("aggregate.classify", record_size=False)
+def classify_monthly_sales(monthly_sales: dict, extended: bool = True) -> dict:
+    """
+    Label for one product's {"January 2025": total, ...} series (get_monthly_sales
+    output). Returns the classify_trends row as a dict; a series whose totals
+    aren't numbers is labelled Unclassified instead of raising.
+    """
+    if not monthly_sales:
+        return {"category": "Obsolete", "slope": 0.0, "r_squared": float("nan"), "recent_avg_sales": 0.0,
+                "zero_sales_pct_last_3m": 1.0, "seasonality": 0.0, "volatility": 0.0}
+
+    try:
+        totals = [float(v) for v in monthly_sales.values()]
+    except (TypeError, ValueError):
+        return {"category": "Unclassified", "slope": float("nan"), "r_squared": float("nan"),
+                "recent_avg_sales": float("nan"), "zero_sales_pct_last_3m": float("nan"),
+                "seasonality": 0.0, "volatility": 0.0}
+
+    monthly_df = pd.DataFrame({
+        "product_name": "series",
+        "month": _parse_months([str(k) for k in monthly_sales.keys()]),
+        "total_orders": totals,
+    })
+    row = classify_trends(monthly_df, extended=extended).iloc[0].to_dict()
+    row.pop("product")
+    return row
@@ -0,0 +1,149 @@
+import os
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from dataset_cache import DatasetCache
+from monthly_rollup import load_rollup
+from trend_classifier import classify_trends
+from sales_store import is_fresh, dataset_signature, write_artifact, read_artifact
+from tracing import span
+
+# ------------------ RESULTS CONFIG ------------------
+TRENDS_KIND = "trends_v2"  # bumped when the layout changes, so stored tables get rebuilt
+TREND_CACHE_MB = 64
+_MP_CONTEXT = multiprocessing.get_context("fork") if "fork" in multiprocessing.get_all_start_methods() else None
+
+
+# ------------------ MATERIALIZED TABLE ------------------
+def _classify_rollup(monthly_df: pd.DataFrame) -> pd.DataFrame:
+    """classify_trends per product_key; product is the rollup's display name, stamped with classified_at."""
+    results = classify_trends(monthly_df[["product_key", "month", "total_orders"]], key="product_key")
+    results = results.rename(columns={"product": "product_key"})
+    names = monthly_df.drop_duplicates("product_key").set_index("product_key")["product"]
+    results.insert(0, "product", results["product_key"].map(names))
+    results["classified_at"] = pd.Timestamp.now().floor("s")
+    return results
+
+
+def build_trend_results(source_path: str) -> pd.DataFrame:
+    """classify_trends over a sales file's monthly rollup (one row per product_key)."""
+    return _classify_rollup(load_rollup(source_path))
+
+
+def update_trend_results(results: pd.DataFrame, rollup: pd.DataFrame, product_keys) -> pd.DataFrame:
+    """
+    Reclassifies only the products whose months changed (product_keys, as in the
+    rollup's product_key) and keeps every other row, classified_at included.
+    Rows stay in the order build_trend_results would produce.
+    """
+    touched = rollup[rollup["product_key"].isin(product_keys)]
+    updated = _classify_rollup(touched)
+
+    combined = pd.concat([results[~results["product_key"].isin(product_keys)], updated], ignore_index=True)
+    order = pd.Index(rollup["product_key"].unique()).get_indexer(combined["product_key"])
+    return combined.iloc[np.argsort(order, kind="stable")].reset_index(drop=True)
+
+
+def load_trend_results(source_path: str) -> pd.DataFrame:
+    """Materialized trend table of a sales file, rebuilt only when the source file changes."""
+    if not is_fresh(source_path, TRENDS_KIND):
+        signature = dataset_signature(source_path)
+        with span("aggregate.trend_results", source=os.path.basename(source_path)) as s:
+            results = build_trend_results(source_path)
+            s.set(products=len(results))
+        write_artifact(source_path, results, signature, TRENDS_KIND)
+    return read_artifact(source_path, TRENDS_KIND)
+
+
+TREND_CACHE = DatasetCache(max_bytes=TREND_CACHE_MB * 2**20, loader=load_trend_results, name="trend_results")
+
+
+# ------------------ BATCH JOB ------------------
+def _refresh_source(item):
+    name, source_path = item
+    start = time.perf_counter()
+    fresh = is_fresh(source_path, TRENDS_KIND)
+    results = load_trend_results(source_path)
+    return {
+        "database": name,
+        "products": len(results),
+        "rebuilt": not fresh,
+        "categories": results["category"].value_counts().to_dict(),
+        "seconds": round(time.perf_counter() - start, 2),
+    }
+
+
+def run_trend_batch(sources: dict, workers: int = None) -> list:
+    """
+    Classifies every product of every source ({name: path}) and materializes one
+    trend table per source, one worker process per source. Sources whose table
+    is already up to date are skipped. Returns a summary per source.
+    """
+    items = list(sources.items())
+    workers = min(workers or os.cpu_count() or 1, len(items))
+    if workers <= 1:
+        return [_refresh_source(item) for item in items]
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_MP_CONTEXT) as pool:
+        return list(pool.map(_refresh_source, items))
+
+
+# ------------------ QUERIES ------------------
+# Columns a trend query can be sorted by
+TREND_SORT_COLUMNS = ["slope", "r_squared", "recent_avg_sales", "product", "category", "database"]
+
+
+def query_trends(
+    sources: dict,
+    database: str = None,
+    category=None,
+    sort_by: str = "slope",
+    ascending: bool = True,
+    limit: int = None,
+) -> pd.DataFrame:
+    """
+    Filters the materialized trend tables, e.g. every Decaying product in telecom
+    sorted by slope. Tables are served from TREND_CACHE, so repeated queries only
+    filter in-memory frames.
+
+    :param database: One source name (default: all sources)
+    :param category: A label or list of labels (case-insensitive)
+    """
+    if sort_by is not None and sort_by not in TREND_SORT_COLUMNS:
+        raise ValueError(f"Invalid sort_by: {sort_by} (one of {', '.join(TREND_SORT_COLUMNS)})")
+    names = [database] if database else list(sources)
+    categories = [category] if isinstance(category, str) else category
+    wanted = {c.lower() for c in categories} if categories else None
+
+    frames = []
+    for name in names:
+        results = TREND_CACHE.get(sources[name])
+        if wanted is not None:
+            results = results[results["category"].str.lower().isin(wanted)]
+        frames.append(results.assign(database=name))
+
+    table = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    if sort_by and not table.empty:
+        table = table.sort_values(sort_by, ascending=ascending, kind="stable")
+    if limit:
+        table = table.head(limit)
+    return table.reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Materialize trend classifications for every product")
+    parser.add_argument("sources", nargs="+", help="name=path pairs, e.g. eon=data/eon.xlsx")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    sources = dict(pair.split("=", 1) for pair in args.sources)
+    for summary in run_trend_batch(sources, workers=args.workers):
+        status = "rebuilt" if summary["rebuilt"] else "up to date"
+        print(f"{summary['database']:<12} {summary['products']:>7,} products  {status:<10} "
+              f"{summary['seconds']:>6.2f}s  {summary['categories']}")
+
+
+if __name__ == "__main__":
+    main()